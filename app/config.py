@@ -0,0 +1,228 @@
+"""
+Runtime settings, read once from the environment at import time.
+"""
+import os
+
+
+def _env_str(name, default, choices=None):
+    value = os.getenv(name, default).strip().lower()
+    if choices and value not in choices:
+        raise ValueError(f"{name} must be one of {sorted(choices)}, got '{value}'")
+    return value
+
+
+def _env_list(name, default):
+    value = os.getenv(name)
+    if value is None:
+        return tuple(default)
+    return tuple(item.strip() for item in value.split(",") if item.strip())
+
+
+def _env_bool(name, default):
+    value = os.getenv(name)
+    if value in (None, ""):
+        return default
+    return value.strip().lower() in {"1", "true", "yes", "on"}
+
+
+def _env_float(name, default):
+    value = os.getenv(name)
+    return default if value in (None, "") else float(value)
+
+
+def _env_int(name, default):
+    value = os.getenv(name)
+    return default if value in (None, "") else int(value)
+
+
+def _cpu_list(name, default=()):
+    """Core ids from a list like 0-3,8,10-11"""
+    cpus = []
+    for item in _env_list(name, default):
+        first, _, last = item.partition("-")
+        cpus.extend(range(int(first), int(last or first) + 1))
+    return tuple(cpus)
+
+
+def _available_cpus():
+    """Cores this process may run on: affinity mask, capped by a cgroup v2 CPU quota"""
+    cpus = len(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else (os.cpu_count() or 1)
+    try:
+        with open("/sys/fs/cgroup/cpu.max") as f:
+            quota, period = f.read().split()
+        if quota != "max":
+            cpus = min(cpus, max(1, int(int(quota) / int(period))))
+    except (OSError, ValueError):
+        pass
+    return cpus
+
+
+# ================= CPU budget =================
+# Applied at startup by app/utils/resources.py. Every thread pool below
+# is sized from the cores one worker process may keep busy: by default
+# the available cores split evenly across WEB_CONCURRENCY workers.
+AVAILABLE_CPUS = _available_cpus()
+WEB_CONCURRENCY = _env_int("WEB_CONCURRENCY", 1)
+WORKER_CPUS = _env_int("WORKER_CPUS", 0) or max(1, AVAILABLE_CPUS // max(1, WEB_CONCURRENCY))
+# Check executor threads (asyncio's default formula over the worker's
+# share); mostly blocked in native code, hence more than WORKER_CPUS
+CHECK_THREADS = _env_int("CHECK_THREADS", 0) or min(32, WORKER_CPUS + 4)
+# OpenCV's parallel_for pool and OpenMP (Tesseract) threads per call:
+# checks already run in parallel, so nested pools only oversubscribe
+CV2_THREADS = _env_int("CV2_THREADS", 1)
+OMP_THREADS = _env_int("OMP_THREADS", 1)
+# "worker": pin each gunicorn worker to its own WORKER_CPUS cores
+# (see gunicorn.conf.py); "off": leave scheduling to the kernel
+CPU_AFFINITY = _env_str("CPU_AFFINITY", "off", {"off", "worker"})
+
+
+# ================= YOLO detection stage =================
+# "mask": filter objects by segmentation-mask area (yolov8n-seg)
+# "box":  filter by bounding-box area (yolov8n, no segmentation head)
+YOLO_AREA_FILTER = _env_str("YOLO_AREA_FILTER", "mask", {"mask", "box"})
+YOLO_SEG_MODEL = os.getenv("YOLO_SEG_MODEL", "yolov8n-seg.pt")
+YOLO_DET_MODEL = os.getenv("YOLO_DET_MODEL", "yolov8n.pt")
+
+# ================= Detector runtime =================
+# "torch":    Ultralytics PyTorch checkpoint, eager mode
+# "onnx":     ONNX Runtime on the model exported to ONNX (exported and
+#             cached next to the .pt on first load, or a .onnx model path)
+# "openvino": OpenVINO on the same ONNX export (optional dependency)
+DETECTOR_BACKEND = _env_str("DETECTOR_BACKEND", "torch", {"torch", "onnx", "openvino"})
+# Square model input size; exported models are fixed to it
+DETECTOR_IMGSZ = _env_int("DETECTOR_IMGSZ", 640)
+# Intra-op threads for the detector runtime (default: the worker's CPU
+# budget); 0 keeps the runtime default of one thread per core
+DETECTOR_THREADS = _env_int("DETECTOR_THREADS", WORKER_CPUS)
+# Dynamic int8 weight quantization (onnx backend only)
+DETECTOR_INT8 = _env_bool("DETECTOR_INT8", False)
+
+# ================= Startup =================
+# Load every model, cascade and graph at startup and run one warm-up
+# verification on a synthetic frame; /ready reports 503 until it is done
+PRELOAD_MODELS = _env_bool("PRELOAD_MODELS", True)
+
+# ================= MediaPipe =================
+# Max pre-initialized FaceMesh / Hands graphs per worker. Each check
+# thread holds at most one, so more than CHECK_THREADS is waste.
+MP_POOL_SIZE = _env_int("MP_POOL_SIZE", CHECK_THREADS)
+
+# ================= Early decision mode =================
+# Checks run concurrently while an early-decision request is in flight
+EARLY_DECISION_PARALLELISM = _env_int("EARLY_DECISION_PARALLELISM", 4)
+
+# ================= Upload limits =================
+# Enforced while the upload is read in chunks, before anything is decoded
+UPLOAD_MAX_BYTES = _env_int("UPLOAD_MAX_BYTES", 15 * 1024 * 1024)
+UPLOAD_MAX_PIXELS = _env_int("UPLOAD_MAX_PIXELS", 50_000_000)
+UPLOAD_MIN_SIDE = _env_int("UPLOAD_MIN_SIDE", 64)
+UPLOAD_CHUNK_BYTES = _env_int("UPLOAD_CHUNK_BYTES", 256 * 1024)
+
+# ================= Auth =================
+# Verified bearer tokens kept per worker (0 disables the cache); entries
+# live until the token's exp, at most TOKEN_CACHE_TTL seconds
+TOKEN_CACHE_SIZE = _env_int("TOKEN_CACHE_SIZE", 4096)
+TOKEN_CACHE_TTL = _env_float("TOKEN_CACHE_TTL", 3600.0)
+
+# ================= Check profiles =================
+# Profile used when a request does not pick one (?profile=fast|standard|strict,
+# see app/verifier/profiles.py)
+CHECK_PROFILE = _env_str("CHECK_PROFILE", "standard")
+
+# ================= Admission control =================
+# Per worker: at most ADMISSION_MAX_IN_FLIGHT verify-face / batch requests
+# run at once and ADMISSION_QUEUE_SIZE more wait up to
+# ADMISSION_QUEUE_TIMEOUT seconds; beyond that, 503 with Retry-After.
+# ADMISSION_MAX_IN_FLIGHT=0 turns admission control off.
+ADMISSION_MAX_IN_FLIGHT = _env_int("ADMISSION_MAX_IN_FLIGHT", max(2, WORKER_CPUS))
+ADMISSION_QUEUE_SIZE = _env_int("ADMISSION_QUEUE_SIZE", 4 * ADMISSION_MAX_IN_FLIGHT)
+ADMISSION_QUEUE_TIMEOUT = _env_float("ADMISSION_QUEUE_TIMEOUT", 10.0)
+# From this many waiting requests on, requests without ?profile= run
+# ADMISSION_DEGRADE_PROFILE instead of CHECK_PROFILE (0: never degrade)
+ADMISSION_DEGRADE_DEPTH = _env_int("ADMISSION_DEGRADE_DEPTH", 0)
+ADMISSION_DEGRADE_PROFILE = _env_str("ADMISSION_DEGRADE_PROFILE", "fast")
+# Deadline applied when a request sends no X-Deadline-Ms header, and cap
+# on the ones it sends, in milliseconds (0: none)
+REQUEST_DEADLINE_MS = _env_float("REQUEST_DEADLINE_MS", 0.0)
+
+# ================= Live capture =================
+# WebSocket sessions per worker, and the bounds of one session: frames
+# accepted and seconds before the server gives up on a passing frame
+LIVE_MAX_SESSIONS = _env_int("LIVE_MAX_SESSIONS", 8)
+LIVE_MAX_FRAMES = _env_int("LIVE_MAX_FRAMES", 600)
+LIVE_SESSION_SECONDS = _env_float("LIVE_SESSION_SECONDS", 60.0)
+
+# ================= Batch verification =================
+BATCH_MAX_IMAGES = _env_int("BATCH_MAX_IMAGES", 16)
+
+# ================= Async jobs =================
+# POST /api/v1/jobs queues a verification and returns a job id at once;
+# JOB_WORKERS tasks per worker process drain a queue of at most
+# JOB_QUEUE_SIZE images (503 beyond it)
+JOB_WORKERS = _env_int("JOB_WORKERS", 2)
+JOB_QUEUE_SIZE = _env_int("JOB_QUEUE_SIZE", 64)
+# Seconds a finished job (and its result) can still be polled
+JOB_RESULT_TTL = _env_float("JOB_RESULT_TTL", 3600.0)
+JOB_CLEANUP_INTERVAL = _env_float("JOB_CLEANUP_INTERVAL", 60.0)
+# SQLite file shared by all workers on the host; empty keeps jobs in the
+# accepting worker's memory (only that worker can answer polls), so with
+# several workers it defaults to a file under /tmp
+JOB_STORE_PATH = os.getenv(
+    "JOB_STORE_PATH", "/tmp/verification-jobs/jobs.sqlite3" if WEB_CONCURRENCY > 1 else ""
+)
+# Result callbacks: POSTed when a job finishes, retried with backoff.
+# JOB_CALLBACK_HOSTS restricts callback URLs to these hosts (empty: any
+# host that resolves to public addresses only)
+JOB_CALLBACK_TIMEOUT = _env_float("JOB_CALLBACK_TIMEOUT", 10.0)
+JOB_CALLBACK_RETRIES = _env_int("JOB_CALLBACK_RETRIES", 3)
+JOB_CALLBACK_HOSTS = _env_list("JOB_CALLBACK_HOSTS", ())
+
+# ================= Check execution =================
+# "thread": every stage runs on the asyncio thread pool (one GIL)
+# "process": stages in CHECK_PROCESS_STAGES run on a persistent process
+#            pool whose workers preload the models; the rest stay on threads
+CHECK_EXECUTOR = _env_str("CHECK_EXECUTOR", "thread", {"thread", "process"})
+CHECK_PROCESS_WORKERS = _env_int("CHECK_PROCESS_WORKERS", WORKER_CPUS)
+CHECK_PROCESS_STAGES = _env_list(
+    "CHECK_PROCESS_STAGES",
+    ("detections", "ocr_data", "text", "face_landmarks", "hand_landmarks")
+)
+# Cores the process pool workers are pinned to, e.g. "4-7" (empty: any)
+CHECK_PROCESS_CPUS = _cpu_list("CHECK_PROCESS_CPUS")
+
+# ================= Result cache =================
+# Keyed by image hash + check-configuration fingerprint. Set
+# RESULT_CACHE_PATH to a SQLite file to share results across workers.
+RESULT_CACHE_ENABLED = _env_bool("RESULT_CACHE_ENABLED", True)
+RESULT_CACHE_SIZE = _env_int("RESULT_CACHE_SIZE", 1024)
+RESULT_CACHE_TTL = _env_float("RESULT_CACHE_TTL", 600.0)
+RESULT_CACHE_PATH = os.getenv("RESULT_CACHE_PATH", "")
+
+# ================= Near-duplicate reuse =================
+# Reuse the result of a visually near-identical earlier upload (same
+# selfie re-encoded, resized or slightly re-cropped): its 64-bit pHash
+# within NEAR_DUP_MAX_DISTANCE bits (dHash within twice that). Share
+# NEAR_DUP_AUDIT_RATE of the matches is recomputed anyway to measure
+# verdict drift.
+NEAR_DUP_ENABLED = _env_bool("NEAR_DUP_ENABLED", False)
+NEAR_DUP_MAX_DISTANCE = _env_int("NEAR_DUP_MAX_DISTANCE", 4)
+NEAR_DUP_SIZE = _env_int("NEAR_DUP_SIZE", 4096)
+NEAR_DUP_TTL = _env_float("NEAR_DUP_TTL", 600.0)
+NEAR_DUP_AUDIT_RATE = _env_float("NEAR_DUP_AUDIT_RATE", 0.05)
+
+# ================= Working resolution =================
+# Serve each check at the resolution it declares (see pipeline.py)
+# instead of the full upload; False runs every check at full resolution
+RESOLUTION_AWARE = _env_bool("RESOLUTION_AWARE", True)
+
+# ================= OCR =================
+# "tesserocr": in-process Tesseract API, one warm handle per thread
+# "pytesseract": spawn the tesseract CLI per call
+# "auto": tesserocr when installed, else pytesseract
+OCR_BACKEND = _env_str("OCR_BACKEND", "auto", {"auto", "tesserocr", "pytesseract"})
+# Skip OCR on frames without text-like regions and only recognize the
+# candidate regions otherwise
+OCR_PREFILTER = _env_bool("OCR_PREFILTER", True)
+# With tesserocr, above this many candidate regions, OCR one crop around
+# all of them (pytesseract, a process per call, always uses one crop)
+OCR_MAX_REGIONS = _env_int("OCR_MAX_REGIONS", 8)
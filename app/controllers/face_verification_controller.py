@@ -1,64 +1,290 @@
 from fastapi import UploadFile
 from app.utils.response import success, error
-from app.utils.json_safe import to_python
+from app.utils.uploads import is_allowed_image, read_image_upload, UploadRejected
+from app.utils.metrics import VERDICTS
 import asyncio
+import time
 
-from app.verifier.face_detector import detect_face
-from app.verifier.eye_checker import check_eyes
-from app.verifier.quality_checker import check_quality
-from app.verifier.pose_checker import check_head_pose
-from app.verifier.lighting_checker import check_lighting
-from app.verifier.background_checker import check_background
-from app.verifier.geometry_checker import check_face_geometry
-from app.verifier.response_builder import build_response
-from app.verifier.text_checker import check_text_presence
-from app.verifier.object_detector import check_non_human_object_yolo
-from app.verifier.human_only_detector import check_human_only
-from app.verifier.hand_detector import check_hands
-
-
-async def verify_face_image(image: UploadFile):
+from app import config
+from app.config import EARLY_DECISION_PARALLELISM
+from app.utils.result_cache import ResultCache, MemoryLRU, SQLiteStore, cache_key, config_fingerprint
+from app.utils.near_duplicate import NearDuplicateIndex, image_hashes
+from app.verifier.image_context import ImageContext
+from app.verifier.ocr_engine import get_backend as ocr_backend
+from app.verifier.pipeline import VERIFICATION_GRAPH, CHECK_ORDER
+from app.verifier.profiles import PROFILES, DEFAULT_PROFILE
+from app.verifier.response_builder import build_response, verdict_decided
+from app.verifier.text_checker import TEXT_AREA_THRESHOLD
+from app.verifier.yolo_detector import detect_objects_batch
+
+# Everything that can change a verification result for the same bytes
+CONFIG_FINGERPRINT = config_fingerprint({
+    "checks": CHECK_ORDER,
+    "profiles": {name: [p.checks, p.passing_threshold] for name, p in PROFILES.items()},
+    "text_area_threshold": TEXT_AREA_THRESHOLD,
+    "yolo_area_filter": config.YOLO_AREA_FILTER,
+    "yolo_seg_model": config.YOLO_SEG_MODEL,
+    "yolo_det_model": config.YOLO_DET_MODEL,
+    "detector_backend": config.DETECTOR_BACKEND,
+    "detector_imgsz": config.DETECTOR_IMGSZ,
+    "detector_int8": config.DETECTOR_INT8,
+    "ocr_prefilter": config.OCR_PREFILTER,
+    # "auto" resolves per host, so record the backend actually used
+    "ocr_backend": ocr_backend().name,
+    "ocr_max_regions": config.OCR_MAX_REGIONS,
+    "resolution_aware": config.RESOLUTION_AWARE,
+    "stage_max_sides": {name: stage.max_side for name, stage in VERIFICATION_GRAPH.stages.items()},
+})
+
+RESULT_CACHE = ResultCache(
+    MemoryLRU(config.RESULT_CACHE_SIZE, config.RESULT_CACHE_TTL),
+    SQLiteStore(config.RESULT_CACHE_PATH, config.RESULT_CACHE_TTL) if config.RESULT_CACHE_PATH else None
+) if config.RESULT_CACHE_ENABLED else None
+
+NEAR_DUPLICATES = NearDuplicateIndex(
+    config.NEAR_DUP_SIZE,
+    config.NEAR_DUP_TTL,
+    max_distance=config.NEAR_DUP_MAX_DISTANCE,
+    audit_rate=config.NEAR_DUP_AUDIT_RATE
+) if config.NEAR_DUP_ENABLED else None
+
+
+async def verify_face_image(image: UploadFile, early_decision: bool = False, timings: bool = False,
+                            profile=DEFAULT_PROFILE):
+    """
+    Run the checks of `profile` and score the image against them; the
+    other checks never run.
+
+    With `early_decision`, cheap checks run first and the remaining ones
+    are skipped as soon as the verdict can no longer change; skipped
+    checks are listed under "skipped_checks" in the result.
+
+    With `timings`, the result carries a "timings" block: total and
+    decode time plus execution / queue-wait time per stage (empty stages
+    when the result came from the cache).
+    """
     try:
-        # Read image
-        img = await image.read()
-        if not img:
+        # Read image (chunked, size/type/dimension limits before decoding)
+        try:
+            img, header = await read_image_upload(image)
+        except UploadRejected as e:
+            VERDICTS.labels("rejected").inc()
             return error(
-                msg="Empty image file",
+                msg=e.msg,
                 response_type="FACE_VERIFY",
-                status_code=400
+                status_code=e.status_code
             )
 
-        # Run all checks in parallel (async)
-        face, eyes, quality, pose, lighting, bg, geometry, text, obj_detect, human, hands = await asyncio.gather(
-            asyncio.to_thread(detect_face, img),
-            asyncio.to_thread(check_eyes, img),
-            asyncio.to_thread(check_quality, img),
-            asyncio.to_thread(check_head_pose, img),
-            asyncio.to_thread(check_lighting, img),
-            asyncio.to_thread(check_background, img),
-            asyncio.to_thread(check_face_geometry, img),
-            asyncio.to_thread(check_text_presence, img),
-            asyncio.to_thread(check_non_human_object_yolo, img),
-            asyncio.to_thread(check_human_only, img),
-            asyncio.to_thread(check_hands, img)
-        )
-        
-        result = build_response(
-            face, eyes, quality, pose, lighting, bg, geometry, text, obj_detect, human, hands
-        )
+        result = await verify_image_bytes(img, header, early_decision, timings, profile)
 
         # Success response
         return success(
-            data=to_python(result),
+            data=result,
             msg="Face verification completed",
             response_type="FACE_VERIFY"
         )
 
     except Exception as e:
         # Any unexpected error
+        VERDICTS.labels("error").inc()
         return error(
             msg="Face verification failed",
             data={"error": str(e)},
             response_type="FACE_VERIFY",
             status_code=500
         )
+
+
+async def verify_image_bytes(img, header, early_decision=False, timings=False, profile=DEFAULT_PROFILE):
+    """
+    Verify an upload already read by read_image_upload; returns the
+    JSON-safe result dict (the "data" of a verify-face response).
+    """
+    started = time.perf_counter()
+    timing = {"decode_ms": 0.0, "stages": {}}
+    variant = f"{CONFIG_FINGERPRINT}:{profile.name}:{int(early_decision)}"
+
+    async def compute():
+        # Decode once; every checker shares the same frames
+        ctx = ImageContext(img, size=header.size)
+
+        hashes = match = None
+        if NEAR_DUPLICATES is not None:
+            # Re-encoded / resized copies of an earlier upload reuse its result
+            hashes = await asyncio.to_thread(image_hashes, ctx)
+            if hashes is not None:
+                match = NEAR_DUPLICATES.lookup(variant, hashes)
+            if match is not None and not NEAR_DUPLICATES.should_audit():
+                NEAR_DUPLICATES.reused(match)
+                return {**match.result, "near_duplicate": {"distance": match.distance}}
+
+        compute_started = time.perf_counter()
+        if VERIFICATION_GRAPH.needs_full_frame(profile.checks):
+            decode_started = time.perf_counter()
+            await asyncio.to_thread(ctx.warm)
+            timing["decode_ms"] = round((time.perf_counter() - decode_started) * 1000, 2)
+        result = await _verify_context(ctx, profile, early_decision, timings=timing["stages"])
+
+        if hashes is not None:
+            if match is not None:
+                NEAR_DUPLICATES.record_audit(match, result)
+            NEAR_DUPLICATES.add(variant, hashes, result, time.perf_counter() - compute_started)
+        return result
+
+    if RESULT_CACHE is None:
+        result = await compute()
+    else:
+        # Retries and double-submits of the same upload reuse one run
+        key = cache_key(img, variant)
+        result, status = await RESULT_CACHE.get_or_compute(key, compute)
+        result = {**result, "cached": status != "miss"}
+
+    VERDICTS.labels(result["image_status"]).inc()
+    if timings:
+        result = {
+            **result,
+            "timings": {"total_ms": round((time.perf_counter() - started) * 1000, 2), **timing}
+        }
+    return result
+
+
+async def verify_face_images(images: list[UploadFile], early_decision: bool = False, timings: bool = False,
+                             profile=DEFAULT_PROFILE):
+    """
+    Verify several images in one request against `profile`.
+
+    When the profile needs it, the YOLO stage runs as a single batched
+    forward pass over all decodable images; every other check runs per
+    image as usual. A bad image produces an error entry in "results"
+    without failing the batch.
+    With `timings`, each result and the batch carry a "timings" block.
+    """
+    started = time.perf_counter()
+    try:
+        items = [None] * len(images)
+        contexts = {}
+
+        # Read and decode every upload
+        for i, image in enumerate(images):
+            if not is_allowed_image(image):
+                items[i] = _batch_error(i, image, "Uploaded file must be a JPG or PNG image")
+                continue
+
+            try:
+                img, header = await read_image_upload(image)
+            except UploadRejected as e:
+                items[i] = _batch_error(i, image, e.msg)
+                continue
+            contexts[i] = ImageContext(img, size=header.size)
+
+        decode_started = time.perf_counter()
+        await asyncio.gather(*(asyncio.to_thread(ctx.warm) for ctx in contexts.values()))
+        decode_ms = (time.perf_counter() - decode_started) * 1000
+
+        for i, ctx in list(contexts.items()):
+            if ctx.bgr is None:
+                items[i] = _batch_error(i, images[i], "Image decode failed")
+                del contexts[i]
+
+        # One batched YOLO pass; on failure each image runs its own
+        detections = {}
+        detections_ms = 0.0
+        if contexts and "detections" in VERIFICATION_GRAPH.dependencies(profile.checks):
+            detections_started = time.perf_counter()
+            try:
+                # Same working resolution the graph's detection stage uses
+                max_side = VERIFICATION_GRAPH.stages["detections"].max_side
+                frames = [ctx.at(max_side) for ctx in contexts.values()]
+                batch = await asyncio.to_thread(detect_objects_batch, frames)
+                detections = dict(zip(contexts, batch))
+            except Exception as e:
+                print(f"Batched YOLO pass failed, falling back to per-image: {e}")
+            detections_ms = (time.perf_counter() - detections_started) * 1000
+
+        async def verify_one(i, ctx):
+            artifacts = {"detections": detections[i]} if i in detections else None
+            item_started = time.perf_counter()
+            stages = {}
+            try:
+                result = await _verify_context(ctx, profile, early_decision, artifacts, timings=stages)
+            except Exception as e:
+                return _batch_error(i, images[i], "Face verification failed", error=str(e))
+            data = dict(result)
+            if timings:
+                data["timings"] = {
+                    "total_ms": round((time.perf_counter() - item_started) * 1000, 2),
+                    "stages": stages
+                }
+            return {
+                "index": i,
+                "filename": images[i].filename,
+                "response": "success",
+                "msg": "Face verification completed",
+                "data": data
+            }
+
+        verified = await asyncio.gather(*(verify_one(i, ctx) for i, ctx in contexts.items()))
+        for item in verified:
+            items[item["index"]] = item
+
+        for item in items:
+            VERDICTS.labels(item["data"]["image_status"] if item["response"] == "success" else "error").inc()
+
+        data = {
+            "count": len(items),
+            "passed": sum(
+                1 for item in items
+                if item["response"] == "success" and item["data"]["image_status"] == "passed"
+            ),
+            "results": items
+        }
+        if timings:
+            data["timings"] = {
+                "total_ms": round((time.perf_counter() - started) * 1000, 2),
+                "decode_ms": round(decode_ms, 2),
+                "detections_batch_ms": round(detections_ms, 2)
+            }
+
+        return success(
+            data=data,
+            msg="Batch face verification completed",
+            response_type="FACE_VERIFY"
+        )
+
+    except Exception as e:
+        return error(
+            msg="Batch face verification failed",
+            data={"error": str(e)},
+            response_type="FACE_VERIFY",
+            status_code=500
+        )
+
+
+async def _verify_context(ctx, profile, early_decision=False, artifacts=None, timings=None):
+    """Run the profile's checks on a decoded image and build the scored result"""
+    if early_decision:
+        def decided(results, remaining):
+            return verdict_decided(results, remaining, profile.passing_threshold)
+
+        results, skipped = await VERIFICATION_GRAPH.run_until_decided(
+            ctx, profile.checks, decided, EARLY_DECISION_PARALLELISM, artifacts, timings
+        )
+    else:
+        # Run the selected checks; shared artifacts are computed once and
+        # independent branches run in parallel (async)
+        results = await VERIFICATION_GRAPH.run(ctx, profile.checks, artifacts, timings)
+        skipped = []
+
+    response = build_response(results, profile.checks, profile.passing_threshold, skipped=skipped)
+    response["profile"] = profile.name
+    return response
+
+
+def _batch_error(index, image, msg, error=None):
+    return {
+        "index": index,
+        "filename": image.filename,
+        "response": "error",
+        "msg": msg,
+        "data": {"error": error} if error else None
+    }
@@ -0,0 +1,122 @@
+import asyncio
+import ipaddress
+import socket
+
+from fastapi import UploadFile
+from fastapi.responses import JSONResponse
+from starlette.status import HTTP_503_SERVICE_UNAVAILABLE
+import httpx
+
+from app import config
+from app.controllers.face_verification_controller import verify_image_bytes
+from app.utils.job_queue import JobQueue, QueueFull, public_view
+from app.utils.job_store import MemoryJobStore, SQLiteJobStore
+from app.utils.metrics import VERDICTS
+from app.utils.response import success, error
+from app.utils.uploads import read_image_upload, UploadRejected
+from app.verifier.profiles import DEFAULT_PROFILE, PROFILES
+
+
+async def _verify_job(payload):
+    img, header, profile_name, early_decision = payload
+    return await verify_image_bytes(img, header, early_decision, profile=PROFILES[profile_name])
+
+
+async def _check_callback_url(url):
+    """
+    Error message for an unusable callback URL, else None. Without
+    JOB_CALLBACK_HOSTS, the host must resolve to public addresses only,
+    so a client cannot make the service POST into its own network
+    (loopback, private ranges, link-local metadata endpoints).
+    """
+    try:
+        parsed = httpx.URL(url)
+    except Exception:
+        return "Invalid callback_url"
+    if parsed.scheme not in ("http", "https") or not parsed.host:
+        return "callback_url must be an absolute http(s) URL"
+    if config.JOB_CALLBACK_HOSTS:
+        if parsed.host not in config.JOB_CALLBACK_HOSTS:
+            return f"callback_url host '{parsed.host}' is not allowed"
+        return None
+
+    port = parsed.port or (443 if parsed.scheme == "https" else 80)
+    try:
+        infos = await asyncio.get_running_loop().getaddrinfo(parsed.host, port, type=socket.SOCK_STREAM)
+    except OSError:
+        return f"callback_url host '{parsed.host}' does not resolve"
+    for info in infos:
+        address = ipaddress.ip_address(info[4][0].split("%")[0])
+        if address.version == 6 and address.ipv4_mapped:
+            address = address.ipv4_mapped
+        if not address.is_global:
+            return f"callback_url host '{parsed.host}' is not a public address"
+    return None
+
+
+JOB_QUEUE = JobQueue(
+    SQLiteJobStore(config.JOB_STORE_PATH) if config.JOB_STORE_PATH else MemoryJobStore(),
+    _verify_job,
+    workers=config.JOB_WORKERS,
+    max_queued=config.JOB_QUEUE_SIZE,
+    ttl_seconds=config.JOB_RESULT_TTL,
+    cleanup_interval=config.JOB_CLEANUP_INTERVAL,
+    callback_timeout=config.JOB_CALLBACK_TIMEOUT,
+    callback_retries=config.JOB_CALLBACK_RETRIES,
+    callback_check=_check_callback_url
+)
+
+
+async def submit_job(image: UploadFile, early_decision: bool = False, profile=DEFAULT_PROFILE,
+                     callback_url: str | None = None):
+    """
+    Validate and read the upload, queue it for verification and return
+    the job id without waiting for the checks.
+    """
+    if callback_url:
+        problem = await _check_callback_url(callback_url)
+        if problem:
+            return error(msg=problem, response_type="FACE_VERIFY_JOB", status_code=400)
+
+    try:
+        try:
+            img, header = await read_image_upload(image)
+        except UploadRejected as e:
+            VERDICTS.labels("rejected").inc()
+            return error(msg=e.msg, response_type="FACE_VERIFY_JOB", status_code=e.status_code)
+
+        job = await JOB_QUEUE.submit(
+            (img, header, profile.name, early_decision),
+            callback_url=callback_url or None,
+            profile=profile.name,
+            early_decision=early_decision
+        )
+    except QueueFull as e:
+        response = error(msg=str(e), response_type="FACE_VERIFY_JOB", status_code=HTTP_503_SERVICE_UNAVAILABLE)
+        return JSONResponse(status_code=HTTP_503_SERVICE_UNAVAILABLE, content=response, headers={"Retry-After": "1"})
+    except Exception as e:
+        return error(
+            msg="Job submission failed",
+            data={"error": str(e)},
+            response_type="FACE_VERIFY_JOB",
+            status_code=500
+        )
+
+    return success(
+        data={
+            "job_id": job["job_id"],
+            "status": job["status"],
+            "poll_url": f"/api/v1/jobs/{job['job_id']}"
+        },
+        msg="Job accepted",
+        response_type="FACE_VERIFY_JOB",
+        status_code=202
+    )
+
+
+async def get_job(job_id: str):
+    """Status of a job, with its result once done"""
+    job = await JOB_QUEUE.get(job_id)
+    if job is None:
+        return error(msg="Job not found or expired", response_type="FACE_VERIFY_JOB", status_code=404)
+    return success(data=public_view(job), msg=f"Job {job['status']}", response_type="FACE_VERIFY_JOB")
@@ -0,0 +1,316 @@
+import asyncio
+import threading
+import time
+
+from starlette.websockets import WebSocket, WebSocketDisconnect
+
+from app import config
+from app.utils.json_safe import dumps
+from app.utils.metrics import LIVE_FRAMES, LIVE_SESSIONS, VERDICTS
+from app.utils.response import success, error
+from app.utils.uploads import check_image_bytes, UploadRejected
+from app.verifier.hand_detector import make_hands, hand_landmarks_with
+from app.verifier.image_context import ImageContext
+from app.verifier.pipeline import VERIFICATION_GRAPH
+from app.verifier.pose_checker import make_face_mesh, face_landmarks_with
+from app.verifier.response_builder import build_response, check_passed, score_bounds
+
+# Artifacts too slow to compute on every frame of a stream
+HEAVY_ARTIFACTS = frozenset({"detections", "ocr_data"})
+
+# WebSocket close codes
+CLOSE_NORMAL = 1000
+CLOSE_POLICY_VIOLATION = 1008
+CLOSE_TRY_AGAIN_LATER = 1013
+
+_open_sessions = 0
+_stats = {"sessions": 0, "refused": 0, "passed": 0, "timed_out": 0, "frame_limit": 0, "disconnected": 0,
+          "frames": 0, "dropped": 0, "candidates": 0, "heavy_runs": 0}
+
+
+class LiveSession:
+    """
+    One client's camera stream.
+
+    Holds its own FaceMesh / Hands graphs in tracking mode, fed the
+    session's frames in order, and splits the profile's checks into cheap
+    ones, run on every frame, and heavy ones (YOLO, OCR), run only on
+    candidate frames.
+    """
+
+    def __init__(self, profile):
+        self.profile = profile
+        self.cheap = tuple(
+            name for name in profile.checks
+            if not VERIFICATION_GRAPH.dependencies([name]) & HEAVY_ARTIFACTS
+        )
+        self.heavy = tuple(name for name in profile.checks if name not in self.cheap)
+        needed = VERIFICATION_GRAPH.dependencies(self.cheap)
+        self._graphs = {
+            name: factory(static_image_mode=False)
+            for name, factory in (("face_landmarks", make_face_mesh), ("hand_landmarks", make_hands))
+            if name in needed
+        }
+        self.frames = 0
+        self.dropped = 0
+        # track() may still be running in its thread after the session
+        # task is cancelled; close() must not pull the graphs from under it
+        self._lock = threading.Lock()
+
+    def track(self, ctx):
+        """
+        Landmark artifacts of one decoded frame from the tracking graphs.
+        Frames must come one at a time, in stream order. A graph that
+        fails is rebuilt; for that frame the pipeline's pooled graph takes
+        over.
+        """
+        artifacts = {}
+        with self._lock:
+            for name, graph in list(self._graphs.items()):
+                frame = ctx.at(VERIFICATION_GRAPH.stages[name].max_side)
+                try:
+                    if name == "face_landmarks":
+                        artifacts[name] = face_landmarks_with(graph, frame)
+                    else:
+                        artifacts[name] = hand_landmarks_with(graph, frame)
+                except Exception as e:
+                    print(f"Live tracking graph '{name}' failed, rebuilding: {e}")
+                    graph.close()
+                    factory = make_face_mesh if name == "face_landmarks" else make_hands
+                    self._graphs[name] = factory(static_image_mode=False)
+        return artifacts
+
+    def close(self):
+        """Close the graphs, once any track() call in flight has finished"""
+        with self._lock:
+            for graph in self._graphs.values():
+                graph.close()
+            self._graphs = {}
+
+
+async def live_verify(websocket: WebSocket, profile):
+    """
+    Stream verification over an authenticated WebSocket.
+
+    The client sends encoded JPEG/PNG frames as binary messages. Every
+    frame gets the cheap checks and a LIVE_FEEDBACK message. A frame that
+    can still pass becomes a candidate and gets the heavy checks in the
+    background, one candidate at a time. The first candidate that passes
+    is sent as LIVE_RESULT (the same data verify-face returns, plus
+    "frame") and the session closes. Frames that arrive while one is
+    being checked replace each other, so only the newest is checked.
+    """
+    global _open_sessions
+    if _open_sessions >= config.LIVE_MAX_SESSIONS:
+        _stats["refused"] += 1
+        await websocket.close(code=CLOSE_TRY_AGAIN_LATER, reason="Too many live sessions")
+        return
+
+    _open_sessions += 1
+    LIVE_SESSIONS.inc()
+    session = None
+    receiver = None
+    try:
+        await websocket.accept()
+        _stats["sessions"] += 1
+        session = await asyncio.to_thread(LiveSession, profile)
+
+        frames = asyncio.Queue(maxsize=1)
+        receiver = asyncio.create_task(_receive(websocket, session, frames))
+        try:
+            outcome = await _run(websocket, session, frames)
+        except WebSocketDisconnect:
+            outcome = "disconnected"
+        _stats[outcome] += 1
+    finally:
+        # Bookkeeping first: the awaits below are cut short if the
+        # server cancels this task on disconnect
+        _open_sessions -= 1
+        LIVE_SESSIONS.dec()
+        if receiver is not None:
+            receiver.cancel()
+        if session is not None:
+            await asyncio.to_thread(session.close)
+
+
+async def _receive(websocket, session, frames):
+    # Keep only the newest unchecked frame: a slow check pass skips
+    # frames instead of queueing them
+    try:
+        while True:
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                break
+            data = message.get("bytes")
+            if data is None:
+                continue
+            if frames.full():
+                frames.get_nowait()
+                session.dropped += 1
+                _stats["dropped"] += 1
+                LIVE_FRAMES.labels("dropped").inc()
+            frames.put_nowait(data)
+    finally:
+        # None tells the session loop the client is gone
+        if frames.full():
+            frames.get_nowait()
+        frames.put_nowait(None)
+
+
+async def _run(websocket, session, frames):
+    """Session loop; returns how it ended (a key of _stats)"""
+    profile = session.profile
+    deadline = time.monotonic() + config.LIVE_SESSION_SECONDS
+    next_frame = None
+    candidate = None   # task verifying the current candidate frame
+    pending = None     # newest later candidate, (index, ctx, results), waiting for its verdict
+
+    try:
+        while True:
+            if next_frame is None:
+                next_frame = asyncio.ensure_future(frames.get())
+            waiting = {next_frame} if candidate is None else {next_frame, candidate}
+            done, _ = await asyncio.wait(
+                waiting, timeout=max(0.0, deadline - time.monotonic()), return_when=asyncio.FIRST_COMPLETED
+            )
+
+            if not done:
+                await _send(websocket, error(
+                    msg=f"No passing frame within {config.LIVE_SESSION_SECONDS:g} seconds",
+                    data={"frames": session.frames, "dropped": session.dropped},
+                    response_type="LIVE_TIMEOUT",
+                    status_code=408
+                ))
+                await websocket.close(code=CLOSE_NORMAL)
+                return "timed_out"
+
+            if candidate is not None and candidate in done:
+                task, candidate = candidate, None
+                try:
+                    result = task.result()
+                except Exception as e:
+                    await _send(websocket, error(
+                        msg="Candidate verification failed", data={"error": str(e)}, response_type="LIVE_CANDIDATE",
+                        status_code=500
+                    ))
+                else:
+                    if result["image_status"] == "passed":
+                        VERDICTS.labels("passed").inc()
+                        LIVE_FRAMES.labels("passed").inc()
+                        await _send(websocket, success(
+                            data=result, msg="Passing frame found", response_type="LIVE_RESULT"
+                        ))
+                        await websocket.close(code=CLOSE_NORMAL)
+                        return "passed"
+                    LIVE_FRAMES.labels("failed").inc()
+                    await _send(websocket, success(
+                        data={"frame": result["frame"], "score": result["score"], "max_score": result["max_score"],
+                              "failing": _failing(result["details"])},
+                        msg="Candidate frame did not pass",
+                        response_type="LIVE_CANDIDATE"
+                    ))
+                if pending is not None:
+                    _stats["heavy_runs"] += 1
+                    candidate = asyncio.create_task(_verify_candidate(session, *pending))
+                    pending = None
+
+            if next_frame in done:
+                data, next_frame = next_frame.result(), None
+                if data is None:
+                    return "disconnected"
+                if session.frames >= config.LIVE_MAX_FRAMES:
+                    await _send(websocket, error(
+                        msg=f"No passing frame within {config.LIVE_MAX_FRAMES} frames",
+                        data={"frames": session.frames, "dropped": session.dropped},
+                        response_type="LIVE_TIMEOUT",
+                        status_code=408
+                    ))
+                    await websocket.close(code=CLOSE_NORMAL)
+                    return "frame_limit"
+
+                session.frames += 1
+                _stats["frames"] += 1
+                feedback, checked = await _check_frame(session, session.frames, data)
+                if checked is not None and feedback["data"]["candidate"]:
+                    _stats["candidates"] += 1
+                    LIVE_FRAMES.labels("candidate").inc()
+                    # One candidate at a time; the newest later one waits
+                    # for its verdict and replaces any older waiting one
+                    feedback["data"]["verifying"] = candidate is None
+                    if candidate is None:
+                        _stats["heavy_runs"] += 1
+                        candidate = asyncio.create_task(_verify_candidate(session, session.frames, *checked))
+                    else:
+                        pending = (session.frames, *checked)
+                await _send(websocket, feedback)
+    finally:
+        for task in (next_frame, candidate):
+            if task is not None:
+                task.cancel()
+
+
+async def _check_frame(session, index, data):
+    """Cheap checks on one frame: (feedback message, (ctx, results) or None)"""
+    profile = session.profile
+    try:
+        header = check_image_bytes(data)
+    except UploadRejected as e:
+        LIVE_FRAMES.labels("rejected").inc()
+        return error(msg=e.msg, data={"frame": index}, response_type="LIVE_FEEDBACK", status_code=e.status_code), None
+
+    ctx = ImageContext(data, size=header.size)
+    await asyncio.to_thread(ctx.warm)
+    if ctx.bgr is None:
+        # Never reaches the tracking graphs, so their state is kept
+        LIVE_FRAMES.labels("rejected").inc()
+        return error(msg="Image decode failed", data={"frame": index}, response_type="LIVE_FEEDBACK"), None
+
+    LIVE_FRAMES.labels("checked").inc()
+    try:
+        artifacts = await asyncio.to_thread(session.track, ctx)
+        results = await VERIFICATION_GRAPH.run(ctx, session.cheap, artifacts)
+    except Exception as e:
+        print(f"Live frame {index} check failed: {e}")
+        return error(
+            msg="Frame check failed", data={"frame": index, "error": str(e)}, response_type="LIVE_FEEDBACK",
+            status_code=500
+        ), None
+
+    score, best = score_bounds(results, session.heavy)
+    details = {name: results[name] for name in session.cheap}
+    feedback = success(
+        data={
+            "frame": index,
+            "score": score,
+            "max_score": len(profile.checks),
+            "candidate": best >= profile.passing_threshold,
+            "failing": _failing(details),
+            "details": details,
+            "dropped": session.dropped,
+        },
+        msg="Frame checked",
+        response_type="LIVE_FEEDBACK"
+    )
+    return feedback, (ctx, results)
+
+
+async def _verify_candidate(session, index, ctx, results):
+    """Heavy checks on a candidate frame, scored together with its cheap results"""
+    profile = session.profile
+    heavy = await VERIFICATION_GRAPH.run(ctx, session.heavy) if session.heavy else {}
+    response = build_response({**results, **heavy}, profile.checks, profile.passing_threshold)
+    response["profile"] = profile.name
+    response["frame"] = index
+    return response
+
+
+def _failing(details):
+    return [name for name, result in details.items() if not check_passed(name, result)]
+
+
+async def _send(websocket, message):
+    await websocket.send_text(dumps(message).decode())
+
+
+def live_stats():
+    return {**_stats, "open": _open_sessions}
@@ -1,18 +1,162 @@
-from fastapi import FastAPI, File, UploadFile, Request
+import asyncio
+import time
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, File, Form, UploadFile, Request, WebSocket
 from fastapi.exceptions import RequestValidationError
+from fastapi.responses import JSONResponse, Response
+from starlette.status import (
+    HTTP_400_BAD_REQUEST, HTTP_413_REQUEST_ENTITY_TOO_LARGE, HTTP_503_SERVICE_UNAVAILABLE,
+    HTTP_504_GATEWAY_TIMEOUT
+)
 
-from app.utils.security import verify_api_key_plain
+from app.utils.security import verify_api_key_plain, TOKEN_CACHE
+from app.utils.admission import AdmissionController, DeadlineExceeded, Overloaded, parse_deadline, within_deadline
 from app.utils.exception_handler import validation_exception_handler
-from app.utils.response import error
+from app.utils.response import error, success, serialized, FastJSONResponse
+from app.utils.uploads import is_allowed_image
+from app.utils.memory import worker_memory
+from app.utils.resources import configure_threads, install_executor, resource_report
+from app.utils.metrics import IN_FLIGHT, REQUEST_SECONDS, render as render_metrics
+from app import config
+from app.config import BATCH_MAX_IMAGES, PRELOAD_MODELS, UPLOAD_MAX_BYTES
 
 from app.controllers.auth_controller import TokenRequest, generate_token
-from app.controllers.face_verification_controller import verify_face_image
+from app.controllers.face_verification_controller import (
+    verify_face_image, verify_face_images, RESULT_CACHE, NEAR_DUPLICATES
+)
+from app.controllers.job_controller import JOB_QUEUE, submit_job, get_job
+from app.controllers.live_controller import CLOSE_POLICY_VIOLATION, live_verify, live_stats
+from app.verifier.cascade_registry import cascade_stats
+from app.verifier.mp_pool import pool_stats
+from app.verifier.pipeline import VERIFICATION_GRAPH
+from app.verifier.profiles import get_profile, profile_summary, PROFILES, DEGRADE_PROFILE
+from app.verifier.warmup import STATUS as WARMUP_STATUS, warm_up
 from fastapi import Header, UploadFile, File
 
-app = FastAPI(title="Image Verification Service")
+
+# Thread caps go in before any model or OCR engine starts its pools
+configure_threads()
+
+
+@asynccontextmanager
+async def lifespan(app):
+    install_executor(asyncio.get_running_loop())
+    # Warm up in the background: the server accepts requests right away
+    # (they load models lazily), /ready turns 200 once warm-up is done
+    if PRELOAD_MODELS:
+        warmup_task = asyncio.create_task(warm_up())
+    else:
+        WARMUP_STATUS["ready"] = True
+        warmup_task = None
+    await JOB_QUEUE.start()
+
+    yield
+
+    if warmup_task is not None:
+        warmup_task.cancel()
+    await JOB_QUEUE.stop()
+    VERIFICATION_GRAPH.backend.shutdown()
+
+
+app = FastAPI(title="Image Verification Service", lifespan=lifespan)
+
+# Synchronous verification requests run through admission control; async
+# jobs have their own bounded queue
+ADMITTED_ENDPOINTS = {"/api/v1/verify-face", "/api/v1/verify-face/batch"}
+ADMISSION_CONTROL = AdmissionController(
+    config.ADMISSION_MAX_IN_FLIGHT,
+    max_queued=config.ADMISSION_QUEUE_SIZE,
+    queue_timeout=config.ADMISSION_QUEUE_TIMEOUT,
+    degrade_depth=config.ADMISSION_DEGRADE_DEPTH
+)
+
+
+@app.middleware("http")
+async def admission_control(request: Request, call_next):
+    # Registered first so it runs innermost: oversized bodies are refused
+    # before they take a place in the queue
+    if request.url.path not in ADMITTED_ENDPOINTS:
+        return await call_next(request)
+
+    # Unauthenticated requests must not take slots or queue places from
+    # real clients; answered as the endpoint itself would (token checks
+    # are cached, so the endpoint's own check costs next to nothing)
+    auth_result = verify_api_key_plain(request.headers.get("authorization"))
+    if isinstance(auth_result, dict) and auth_result.get("response") == "error":
+        return FastJSONResponse(auth_result)
+
+    try:
+        deadline = parse_deadline(request.headers.get("x-deadline-ms"), config.REQUEST_DEADLINE_MS)
+    except ValueError as e:
+        response = error(msg=str(e), response_type="FACE_VERIFY", status_code=HTTP_400_BAD_REQUEST)
+        return JSONResponse(status_code=HTTP_400_BAD_REQUEST, content=response)
+    request.state.deadline = deadline
+
+    try:
+        async with ADMISSION_CONTROL.slot(deadline) as degraded:
+            request.state.degraded = degraded
+            return await call_next(request)
+    except Overloaded as e:
+        response = error(msg=e.msg, response_type="FACE_VERIFY", status_code=HTTP_503_SERVICE_UNAVAILABLE)
+        return JSONResponse(
+            status_code=HTTP_503_SERVICE_UNAVAILABLE, content=response,
+            headers={"Retry-After": str(e.retry_after)}
+        )
+    except DeadlineExceeded as e:
+        return _deadline_exceeded(e)
+
+# Multipart framing allowance on top of the per-file byte limit
+FORM_OVERHEAD_BYTES = 64 * 1024
+REQUEST_BYTE_LIMITS = {
+    "/api/v1/verify-face": UPLOAD_MAX_BYTES + FORM_OVERHEAD_BYTES,
+    "/api/v1/verify-face/batch": (UPLOAD_MAX_BYTES + FORM_OVERHEAD_BYTES) * BATCH_MAX_IMAGES,
+    "/api/v1/jobs": UPLOAD_MAX_BYTES + FORM_OVERHEAD_BYTES,
+}
+
+
+@app.middleware("http")
+async def limit_request_size(request: Request, call_next):
+    # Refuse declared-oversized bodies before the multipart parser spools
+    # them; chunked uploads are bounded per file by read_image_upload
+    limit = REQUEST_BYTE_LIMITS.get(request.url.path)
+    length = request.headers.get("content-length", "")
+    if limit is not None and length.isdigit() and int(length) > limit:
+        response = error(
+            msg=f"Request body exceeds {limit} bytes",
+            response_type="FACE_VERIFY",
+            status_code=HTTP_413_REQUEST_ENTITY_TOO_LARGE
+        )
+        return JSONResponse(status_code=HTTP_413_REQUEST_ENTITY_TOO_LARGE, content=response)
+    return await call_next(request)
+
+
+# Routes tracked by the request metrics (fixed set keeps label cardinality bounded)
+TRACKED_ENDPOINTS = {
+    "/api/v1/get-token", "/api/v1/verify-face", "/api/v1/verify-face/batch", "/api/v1/jobs"
+}
+
+
+@app.middleware("http")
+async def track_requests(request: Request, call_next):
+    endpoint = request.url.path
+    if endpoint not in TRACKED_ENDPOINTS:
+        return await call_next(request)
+
+    started = time.perf_counter()
+    status = 500
+    IN_FLIGHT.labels(endpoint).inc()
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        IN_FLIGHT.labels(endpoint).dec()
+        REQUEST_SECONDS.labels(endpoint, str(status)).observe(time.perf_counter() - started)
 
 # ================= Health Check Routes =================
 @app.get("/")
+@serialized
 async def root():
     """
     Root endpoint - Health check
@@ -27,12 +171,79 @@ async def root():
         "redoc": "http://localhost:8000/redoc",
         "endpoints": {
             "get_token": "POST /api/v1/get-token",
-            "verify_face": "POST /api/v1/verify-face"
+            "verify_face": "POST /api/v1/verify-face",
+            "verify_face_batch": "POST /api/v1/verify-face/batch",
+            "verify_face_live": "WS /api/v1/verify-face/live",
+            "submit_job": "POST /api/v1/jobs",
+            "get_job": "GET /api/v1/jobs/{job_id}",
+            "profiles": "GET /api/v1/profiles",
+            "stats": "GET /api/v1/stats",
+            "resources": "GET /api/v1/diagnostics/resources",
+            "metrics": "GET /metrics",
+            "ready": "GET /ready"
         }
     }
 
+@app.get("/ready")
+@serialized
+async def ready():
+    """
+    Readiness probe: 503 until this worker has preloaded its models and
+    run the warm-up inference
+    """
+    if not WARMUP_STATUS["ready"]:
+        response = error(
+            msg="Warming up",
+            data=dict(WARMUP_STATUS),
+            response_type="READY",
+            status_code=HTTP_503_SERVICE_UNAVAILABLE
+        )
+        return JSONResponse(status_code=HTTP_503_SERVICE_UNAVAILABLE, content=response)
+    return success(data=dict(WARMUP_STATUS), msg="Ready", response_type="READY")
+
+@app.get("/metrics")
+async def metrics():
+    """Prometheus metrics (latency histograms, verdicts, in-flight requests)"""
+    body, content_type = render_metrics()
+    return Response(content=body, media_type=content_type)
+
+@app.get("/api/v1/stats")
+@serialized
+async def stats():
+    """
+    Per-worker runtime counters: model/graph loading, pool usage,
+    result cache, measured stage costs and memory
+    """
+    return success(
+        data={
+            "cascades": cascade_stats(),
+            "mediapipe_pools": pool_stats(),
+            "result_cache": RESULT_CACHE.stats() if RESULT_CACHE else None,
+            "near_duplicates": NEAR_DUPLICATES.stats() if NEAR_DUPLICATES else None,
+            "admission": ADMISSION_CONTROL.stats(),
+            "live": live_stats(),
+            "jobs": JOB_QUEUE.stats(),
+            "token_cache": TOKEN_CACHE.stats(),
+            "stage_cost_ms": VERIFICATION_GRAPH.cost_estimates(),
+            "executor": VERIFICATION_GRAPH.backend.name,
+            "memory_mb": worker_memory()
+        },
+        msg="Service stats",
+        response_type="STATS"
+    )
+
+@app.get("/api/v1/diagnostics/resources")
+@serialized
+async def resources():
+    """
+    Effective CPU budget of this worker: core affinity, executor size and
+    the thread counts of OpenCV, OpenMP (Tesseract) and the detector
+    """
+    return success(data=resource_report(), msg="Resource settings", response_type="DIAGNOSTICS")
+
 # ================= Auth Routes =================
 @app.post("/api/v1/get-token")
+@serialized
 async def get_token(request: Request,req: TokenRequest):
     # For debugging purposes: log raw body and headers
     # body = await request.body()
@@ -44,17 +255,17 @@ async def get_token(request: Request,req: TokenRequest):
 
 # ================= Face Verification =================
 @app.post("/api/v1/verify-face")
+@serialized
 async def verify_face(
+    request: Request,
     image: UploadFile = File(...),
-    authorization: str | None = Header(default=None)
+    authorization: str | None = Header(default=None),
+    early_decision: bool = False,
+    timings: bool = False,
+    profile: str | None = None
 ):
     # Validate uploaded file is JPG/JPEG/PNG
-    allowed_exts = {"jpg", "jpeg", "png"}
-    filename = (image.filename or "").lower()
-    ext = filename.rsplit('.', 1)[-1] if '.' in filename else ''
-    content_type = (getattr(image, "content_type", "") or "").lower()
-
-    if ext not in allowed_exts or not content_type.startswith("image/"):
+    if not is_allowed_image(image):
         return error(msg="Uploaded file must be a JPG or PNG image", status_code=400)
 
     auth_result = verify_api_key_plain(authorization)
@@ -63,8 +274,141 @@ async def verify_face(
     if isinstance(auth_result, dict) and auth_result.get("response") == "error":
         return auth_result
 
+    check_profile, degraded = _request_profile(request, profile)
+    if check_profile is None:
+        return _unknown_profile(profile)
+
     # Token valid → continue
-    return await verify_face_image(image)
+    try:
+        response = await within_deadline(
+            verify_face_image(image, early_decision=early_decision, timings=timings, profile=check_profile),
+            request.state.deadline
+        )
+    except DeadlineExceeded as e:
+        return _deadline_exceeded(e)
+    return _mark_degraded(response) if degraded else response
+
+@app.post("/api/v1/verify-face/batch")
+@serialized
+async def verify_face_batch(
+    request: Request,
+    images: list[UploadFile] = File(...),
+    authorization: str | None = Header(default=None),
+    early_decision: bool = False,
+    timings: bool = False,
+    profile: str | None = None
+):
+    auth_result = verify_api_key_plain(authorization)
+
+    # If auth failed → response engine returned
+    if isinstance(auth_result, dict) and auth_result.get("response") == "error":
+        return auth_result
+
+    check_profile, degraded = _request_profile(request, profile)
+    if check_profile is None:
+        return _unknown_profile(profile)
+
+    if len(images) > BATCH_MAX_IMAGES:
+        return error(
+            msg=f"At most {BATCH_MAX_IMAGES} images per batch",
+            response_type="FACE_VERIFY",
+            status_code=400
+        )
+
+    try:
+        response = await within_deadline(
+            verify_face_images(images, early_decision=early_decision, timings=timings, profile=check_profile),
+            request.state.deadline
+        )
+    except DeadlineExceeded as e:
+        return _deadline_exceeded(e)
+    return _mark_degraded(response) if degraded else response
+
+@app.websocket("/api/v1/verify-face/live")
+async def verify_face_live(websocket: WebSocket, profile: str | None = None, access_token: str | None = None):
+    """
+    Live capture: binary JPEG/PNG frames in, JSON feedback out, until a
+    frame passes. Browsers cannot set headers on a WebSocket, so the token
+    may also come as ?access_token=.
+    """
+    authorization = websocket.headers.get("authorization")
+    if authorization is None and access_token:
+        authorization = f"Bearer {access_token}"
+
+    auth_result = verify_api_key_plain(authorization)
+    if isinstance(auth_result, dict) and auth_result.get("response") == "error":
+        await websocket.close(code=CLOSE_POLICY_VIOLATION, reason=auth_result["msg"])
+        return
+
+    check_profile = get_profile(profile)
+    if check_profile is None:
+        await websocket.close(code=CLOSE_POLICY_VIOLATION, reason=_unknown_profile(profile)["msg"])
+        return
+
+    await live_verify(websocket, check_profile)
+
+# ================= Async Jobs =================
+@app.post("/api/v1/jobs")
+@serialized
+async def submit_verification_job(
+    image: UploadFile = File(...),
+    callback_url: str | None = Form(default=None),
+    authorization: str | None = Header(default=None),
+    early_decision: bool = False,
+    profile: str | None = None
+):
+    if not is_allowed_image(image):
+        return error(msg="Uploaded file must be a JPG or PNG image", status_code=400)
+
+    auth_result = verify_api_key_plain(authorization)
+    if isinstance(auth_result, dict) and auth_result.get("response") == "error":
+        return auth_result
+
+    check_profile = get_profile(profile)
+    if check_profile is None:
+        return _unknown_profile(profile)
+
+    return await submit_job(image, early_decision=early_decision, profile=check_profile, callback_url=callback_url)
+
+@app.get("/api/v1/jobs/{job_id}")
+@serialized
+async def poll_verification_job(job_id: str, authorization: str | None = Header(default=None)):
+    auth_result = verify_api_key_plain(authorization)
+    if isinstance(auth_result, dict) and auth_result.get("response") == "error":
+        return auth_result
+
+    return await get_job(job_id)
+
+@app.get("/api/v1/profiles")
+@serialized
+async def profiles():
+    """Check profiles a request can select with ?profile=NAME"""
+    return success(data=profile_summary(), msg="Check profiles", response_type="PROFILES")
+
+def _request_profile(request, name):
+    """
+    (profile, degraded): the requested profile, or DEGRADE_PROFILE when
+    admission control found the queue deep and the request named none
+    """
+    if not name and getattr(request.state, "degraded", False):
+        return DEGRADE_PROFILE, True
+    return get_profile(name), False
+
+def _mark_degraded(response):
+    if response.get("response") == "success":
+        response["data"]["degraded"] = True
+    return response
+
+def _deadline_exceeded(e):
+    response = error(msg=str(e), response_type="FACE_VERIFY", status_code=HTTP_504_GATEWAY_TIMEOUT)
+    return JSONResponse(status_code=HTTP_504_GATEWAY_TIMEOUT, content=response)
+
+def _unknown_profile(name):
+    return error(
+        msg=f"Unknown check profile '{name}', expected one of {', '.join(PROFILES)}",
+        response_type="FACE_VERIFY",
+        status_code=400
+    )
 
 # ================= Global Exception Handler =================
 app.add_exception_handler(RequestValidationError, validation_exception_handler)
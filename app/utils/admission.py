@@ -0,0 +1,200 @@
+import asyncio
+import math
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+
+from app.utils.metrics import ADMISSION, ADMISSION_QUEUE_DEPTH, DEADLINE_EXCEEDED
+
+
+class Overloaded(Exception):
+    """Request not admitted; `retry_after` is the suggested wait in seconds"""
+
+    def __init__(self, msg, retry_after=1):
+        super().__init__(msg)
+        self.msg = msg
+        self.retry_after = retry_after
+
+
+class DeadlineExceeded(Exception):
+    """The request's deadline passed while it waited or ran"""
+
+
+class AdmissionController:
+    """
+    Per-worker admission control for verification requests.
+
+    At most `max_in_flight` requests run at once; up to `max_queued` more
+    wait (first come, first served) for at most `queue_timeout` seconds.
+    Anything beyond that is refused right away with Overloaded, so a burst
+    turns into fast 503s instead of unbounded latency.
+
+    `degrade_depth` (0: never): requests that had to queue at that
+    position or deeper are flagged `degraded`, for the caller to run a
+    cheaper check set.
+    """
+
+    # Weight of the newest sample in the running service-time estimate
+    SERVICE_SMOOTHING = 0.2
+    MAX_RETRY_AFTER = 60
+
+    def __init__(self, max_in_flight, max_queued=0, queue_timeout=10.0, degrade_depth=0):
+        self.max_in_flight = max_in_flight
+        self.max_queued = max_queued
+        self.queue_timeout = queue_timeout
+        self.degrade_depth = degrade_depth
+        self._in_flight = 0
+        self._waiters = deque()
+        self._service_seconds = 1.0
+        self._stats = {"admitted": 0, "queued": 0, "rejected": 0, "timed_out": 0, "expired": 0, "degraded": 0}
+
+    @property
+    def enabled(self):
+        return self.max_in_flight > 0
+
+    @asynccontextmanager
+    async def slot(self, deadline=None):
+        """
+        Hold one in-flight slot for the body of the `async with`; yields
+        whether the request should degrade. `deadline` (time.monotonic())
+        also bounds the wait for a slot.
+        Raises Overloaded when the queue is full or the wait times out,
+        DeadlineExceeded when the deadline passes first.
+        """
+        if not self.enabled:
+            yield False
+            return
+
+        position = await self._acquire(deadline)
+        degraded = self.degrade_depth > 0 and position >= self.degrade_depth
+        self._stats["admitted"] += 1
+        ADMISSION.labels("admitted").inc()
+        if degraded:
+            self._stats["degraded"] += 1
+            ADMISSION.labels("degraded").inc()
+
+        started = time.perf_counter()
+        try:
+            yield degraded
+        finally:
+            a = self.SERVICE_SMOOTHING
+            self._service_seconds = (1 - a) * self._service_seconds + a * (time.perf_counter() - started)
+            self._release()
+
+    async def _acquire(self, deadline):
+        """Take a slot; returns the queue position the request waited at (0: none)"""
+        if self._in_flight < self.max_in_flight and not self._waiters:
+            self._in_flight += 1
+            return 0
+
+        if len(self._waiters) >= self.max_queued:
+            self._stats["rejected"] += 1
+            ADMISSION.labels("rejected").inc()
+            raise Overloaded(
+                f"Server busy ({self._in_flight} running, {len(self._waiters)} waiting)",
+                self.retry_after()
+            )
+
+        timeout = self.queue_timeout
+        timed_out_by_deadline = False
+        if deadline is not None and deadline - time.monotonic() < timeout:
+            timeout = max(0.0, deadline - time.monotonic())
+            timed_out_by_deadline = True
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        self._stats["queued"] += 1
+        ADMISSION.labels("queued").inc()
+        ADMISSION_QUEUE_DEPTH.inc()
+        position = len(self._waiters)
+        try:
+            # _release() hands the slot over by resolving the future
+            await asyncio.wait_for(asyncio.shield(waiter), timeout)
+            return position
+        except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+            if waiter.done() and not waiter.cancelled():
+                # The slot arrived together with the timeout: pass it on
+                self._release()
+            else:
+                waiter.cancel()
+            if isinstance(e, asyncio.CancelledError):
+                raise
+            if timed_out_by_deadline:
+                self._stats["expired"] += 1
+                ADMISSION.labels("expired").inc()
+                DEADLINE_EXCEEDED.labels("queue").inc()
+                raise DeadlineExceeded("Deadline passed while waiting for a verification slot")
+            self._stats["timed_out"] += 1
+            ADMISSION.labels("timed_out").inc()
+            raise Overloaded(f"No verification slot within {self.queue_timeout:g}s", self.retry_after())
+        finally:
+            if waiter in self._waiters:
+                self._waiters.remove(waiter)
+            ADMISSION_QUEUE_DEPTH.dec()
+
+    def _release(self):
+        # Hand the slot straight to the oldest live waiter, if any
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self._in_flight -= 1
+
+    def retry_after(self):
+        """Seconds until the current queue has likely drained"""
+        backlog = len(self._waiters) + 1
+        seconds = backlog * self._service_seconds / max(1, self.max_in_flight)
+        return min(self.MAX_RETRY_AFTER, max(1, math.ceil(seconds)))
+
+    def queued(self):
+        return len(self._waiters)
+
+    def stats(self):
+        return {
+            **self._stats,
+            "enabled": self.enabled,
+            "in_flight": self._in_flight,
+            "waiting": len(self._waiters),
+            "max_in_flight": self.max_in_flight,
+            "max_queued": self.max_queued,
+            "degrade_depth": self.degrade_depth,
+            "service_seconds": round(self._service_seconds, 3),
+        }
+
+
+def parse_deadline(value, default_ms=0):
+    """
+    time.monotonic() deadline for a request: `value` is the client's
+    X-Deadline-Ms header (milliseconds it is willing to wait, relative so
+    clock skew does not matter), `default_ms` the server default (0: none).
+    Invalid headers raise ValueError.
+    """
+    budget_ms = default_ms
+    if value not in (None, ""):
+        try:
+            budget_ms = float(value)
+        except ValueError:
+            budget_ms = 0.0
+        if not math.isfinite(budget_ms) or budget_ms <= 0:
+            raise ValueError("X-Deadline-Ms must be a positive number of milliseconds")
+        if default_ms:
+            budget_ms = min(budget_ms, default_ms)
+    if not budget_ms:
+        return None
+    return time.monotonic() + budget_ms / 1000
+
+
+async def within_deadline(awaitable, deadline):
+    """
+    Await `awaitable`, cancelling it once `deadline` (time.monotonic())
+    passes; raises DeadlineExceeded then. Cancellation reaches the check
+    graph, so stages not yet started never run.
+    """
+    if deadline is None:
+        return await awaitable
+    try:
+        return await asyncio.wait_for(awaitable, max(0.0, deadline - time.monotonic()))
+    except asyncio.TimeoutError:
+        DEADLINE_EXCEEDED.labels("checks").inc()
+        raise DeadlineExceeded("Deadline passed before the checks finished") from None
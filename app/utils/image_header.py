@@ -0,0 +1,140 @@
+from dataclasses import dataclass
+
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+JPEG_SOI = b"\xff\xd8\xff"
+
+# Start-of-frame markers carry the dimensions (C4 DHT, C8 JPG, CC DAC are not SOFs)
+_JPEG_SOF = {0xC0, 0xC1, 0xC2, 0xC3, 0xC5, 0xC6, 0xC7, 0xC9, 0xCA, 0xCB, 0xCD, 0xCE, 0xCF}
+_JPEG_SOS = 0xDA
+_EXIF_ORIENTATION_TAG = 0x0112
+
+
+@dataclass(frozen=True)
+class ImageHeader:
+    """What the file header says, without decoding any pixels"""
+
+    format: str           # "jpeg" or "png"
+    width: int            # stored width, before EXIF rotation
+    height: int
+    orientation: int = 1  # EXIF orientation, 1-8
+
+    @property
+    def size(self):
+        """(width, height) as displayed; orientations 5-8 rotate by 90 degrees"""
+        if self.orientation >= 5:
+            return self.height, self.width
+        return self.width, self.height
+
+    @property
+    def pixels(self):
+        return self.width * self.height
+
+
+def sniff_format(buf):
+    """"jpeg" / "png" from the magic bytes, else None"""
+    if bytes(buf[:8]) == PNG_SIGNATURE:
+        return "png"
+    if bytes(buf[:3]) == JPEG_SOI:
+        return "jpeg"
+    return None
+
+
+def probe_header(buf):
+    """
+    Parse dimensions (and JPEG EXIF orientation) from the start of an
+    encoded image.
+
+    Returns None while `buf` is too short to tell; raises ValueError for
+    data that is not a well-formed JPEG or PNG header.
+    """
+    if len(buf) < 8:
+        return None
+    fmt = sniff_format(buf)
+    if fmt == "png":
+        return _probe_png(buf)
+    if fmt == "jpeg":
+        return _probe_jpeg(buf)
+    raise ValueError("not a JPEG or PNG file")
+
+
+def _be16(buf, i):
+    return (buf[i] << 8) | buf[i + 1]
+
+
+def _probe_png(buf):
+    # Signature, then IHDR: length(4) "IHDR"(4) width(4) height(4)
+    if len(buf) < 24:
+        return None
+    if bytes(buf[12:16]) != b"IHDR":
+        raise ValueError("PNG without IHDR chunk")
+    width = int.from_bytes(buf[16:20], "big")
+    height = int.from_bytes(buf[20:24], "big")
+    return ImageHeader("png", width, height)
+
+
+def _probe_jpeg(buf):
+    n = len(buf)
+    i = 2
+    orientation = 1
+    while i + 4 <= n:
+        if buf[i] != 0xFF:
+            raise ValueError("corrupt JPEG marker")
+        marker = buf[i + 1]
+        if marker == 0xFF:
+            # Fill byte
+            i += 1
+            continue
+        if marker == 0x01 or 0xD0 <= marker <= 0xD8:
+            # Standalone markers have no length
+            i += 2
+            continue
+        if marker == _JPEG_SOS:
+            raise ValueError("JPEG scan data before any frame header")
+
+        length = _be16(buf, i + 2)
+        if length < 2:
+            raise ValueError("corrupt JPEG segment length")
+        start, end = i + 4, i + 2 + length
+
+        if marker in _JPEG_SOF:
+            # precision(1) height(2) width(2)
+            if start + 5 > n:
+                return None
+            return ImageHeader("jpeg", _be16(buf, start + 3), _be16(buf, start + 1), orientation)
+
+        if marker == 0xE1 and orientation == 1:
+            if end > n:
+                return None
+            orientation = _exif_orientation(memoryview(buf)[start:end])
+
+        i = end
+    return None
+
+
+def _exif_orientation(segment):
+    """Orientation tag from an APP1 Exif segment (1 when absent or unreadable)"""
+    if bytes(segment[:6]) != b"Exif\x00\x00":
+        return 1
+    tiff = segment[6:]
+    order = bytes(tiff[:2])
+    if order == b"II":
+        endian = "little"
+    elif order == b"MM":
+        endian = "big"
+    else:
+        return 1
+
+    def u16(i):
+        return int.from_bytes(tiff[i:i + 2], endian)
+
+    ifd = int.from_bytes(tiff[4:8], endian)
+    if ifd + 2 > len(tiff):
+        return 1
+    for k in range(u16(ifd)):
+        entry = ifd + 2 + 12 * k
+        if entry + 12 > len(tiff):
+            break
+        if u16(entry) == _EXIF_ORIENTATION_TAG:
+            value = u16(entry + 8)
+            return value if 1 <= value <= 8 else 1
+    return 1
@@ -0,0 +1,213 @@
+import asyncio
+import time
+import uuid
+
+import httpx
+
+from app.utils.json_safe import dumps
+from app.utils.metrics import JOBS, JOB_QUEUE_DEPTH
+
+
+class QueueFull(Exception):
+    """No room for another job; the client should retry later"""
+
+
+class JobQueue:
+    """
+    Bounded in-process job queue drained by dedicated worker tasks.
+
+    submit() stores a "queued" record and returns it at once; a worker
+    runs `handler(payload)` and stores the result (or error) on the
+    record, then POSTs the record to the job's callback URL, if any.
+    Records expire `ttl_seconds` after they finish and are purged every
+    `cleanup_interval` seconds. Payloads (the uploaded bytes) only live
+    in the queue, never in the store. `callback_check(url)`, if given, is
+    awaited again right before delivery and returns an error message to
+    refuse the URL (e.g. its host now resolves to a private address).
+    """
+
+    # Seconds before callback retry n (1-based): 1, 2, 4, ...
+    CALLBACK_BACKOFF = 1.0
+
+    def __init__(self, store, handler, workers=2, max_queued=64, ttl_seconds=3600.0,
+                 cleanup_interval=60.0, callback_timeout=10.0, callback_retries=3, callback_check=None):
+        self.store = store
+        self.handler = handler
+        self.workers = workers
+        self.max_queued = max_queued
+        self.ttl_seconds = ttl_seconds
+        self.cleanup_interval = cleanup_interval
+        self.callback_timeout = callback_timeout
+        self.callback_retries = callback_retries
+        self.callback_check = callback_check
+        self._queue = None
+        self._reserved = 0
+        self._tasks = []
+        self._callbacks = set()
+        self._stats = {"accepted": 0, "rejected": 0, "done": 0, "failed": 0, "purged": 0,
+                       "callbacks_delivered": 0, "callbacks_failed": 0}
+
+    async def start(self):
+        self._queue = asyncio.Queue(self.max_queued)
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+        self._tasks.append(asyncio.create_task(self._cleanup()))
+
+    async def stop(self):
+        """Cancel the workers and pending callbacks; jobs still queued are marked failed"""
+        tasks = self._tasks + list(self._callbacks)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._tasks = []
+        while self._queue is not None and not self._queue.empty():
+            job_id, _, _ = self._queue.get_nowait()
+            JOB_QUEUE_DEPTH.dec()
+            await self._finish(job_id, status="failed", error="Service shut down before the job ran")
+
+    async def submit(self, payload, callback_url=None, **info):
+        """
+        Queue `payload` for the handler; returns the new job record.
+        `info` is stored on the record as is (e.g. the profile name).
+        Raises QueueFull when max_queued jobs are already waiting.
+        """
+        if self._queue is None:
+            raise RuntimeError("Job queue is not running")
+        # Reserve the slot before awaiting the store, so concurrent
+        # submits cannot overfill the queue
+        if self._queue.qsize() + self._reserved >= self.max_queued:
+            self._stats["rejected"] += 1
+            JOBS.labels("rejected").inc()
+            raise QueueFull(f"Job queue is full ({self.max_queued} waiting)")
+
+        now = time.time()
+        job = {
+            "job_id": uuid.uuid4().hex,
+            "status": "queued",
+            "created_at": round(now, 3),
+            "started_at": None,
+            "finished_at": None,
+            # Unfinished jobs expire too, in case a worker dies with them
+            "expires_at": now + self.ttl_seconds,
+            "callback_url": callback_url,
+            "callback": None,
+            "result": None,
+            "error": None,
+            **info,
+        }
+        self._reserved += 1
+        try:
+            await asyncio.to_thread(self.store.put, job)
+        finally:
+            self._reserved -= 1
+        self._queue.put_nowait((job["job_id"], payload, callback_url))
+        JOB_QUEUE_DEPTH.inc()
+        self._stats["accepted"] += 1
+        JOBS.labels("accepted").inc()
+        return job
+
+    async def get(self, job_id):
+        return await asyncio.to_thread(self.store.get, job_id)
+
+    def queued(self):
+        return self._queue.qsize() if self._queue is not None else 0
+
+    async def _worker(self):
+        while True:
+            job_id, payload, callback_url = await self._queue.get()
+            JOB_QUEUE_DEPTH.dec()
+            try:
+                await self._run(job_id, payload, callback_url)
+            except asyncio.CancelledError:
+                await self._finish(job_id, status="failed", error="Service shut down while the job ran")
+                raise
+            except Exception as e:
+                # The store itself failed; nothing left to report to
+                print(f"Job {job_id} could not be recorded: {e}")
+            finally:
+                self._queue.task_done()
+
+    async def _run(self, job_id, payload, callback_url):
+        await asyncio.to_thread(self.store.update, job_id, status="running", started_at=round(time.time(), 3))
+        try:
+            result = await self.handler(payload)
+        except Exception as e:
+            job = await self._finish(job_id, status="failed", error=str(e))
+        else:
+            job = await self._finish(job_id, status="done", result=result)
+
+        if callback_url and job is not None:
+            # Deliver in the background; a slow receiver must not hold a worker
+            task = asyncio.create_task(self._deliver(callback_url, job))
+            self._callbacks.add(task)
+            task.add_done_callback(self._callbacks.discard)
+
+    async def _deliver(self, url, job):
+        problem = await self.callback_check(url) if self.callback_check else None
+        if problem:
+            self._stats["callbacks_failed"] += 1
+            print(f"Callback for job {job['job_id']} refused: {problem}")
+            callback = {"status": "refused", "attempts": 0, "status_code": None, "error": problem}
+        else:
+            callback = await self._notify(url, job)
+        try:
+            await asyncio.to_thread(self.store.update, job["job_id"], callback=callback)
+        except Exception as e:
+            print(f"Job {job['job_id']} callback status could not be recorded: {e}")
+
+    async def _finish(self, job_id, **fields):
+        now = time.time()
+        self._stats[fields["status"]] += 1
+        JOBS.labels(fields["status"]).inc()
+        return await asyncio.to_thread(
+            self.store.update, job_id,
+            finished_at=round(now, 3), expires_at=now + self.ttl_seconds, **fields
+        )
+
+    async def _notify(self, url, job):
+        """POST the finished job to its callback URL; returns the delivery record"""
+        body = dumps(public_view(job))
+        status_code = None
+        error = None
+        attempts = 0
+        async with httpx.AsyncClient(timeout=self.callback_timeout) as client:
+            for attempts in range(1, self.callback_retries + 2):
+                try:
+                    response = await client.post(url, content=body, headers={"Content-Type": "application/json"})
+                    status_code = response.status_code
+                    if response.is_success:
+                        self._stats["callbacks_delivered"] += 1
+                        return {"status": "delivered", "attempts": attempts, "status_code": status_code}
+                    error = f"HTTP {status_code}"
+                    # Client errors will not go away on retry
+                    if response.is_client_error:
+                        break
+                except httpx.HTTPError as e:
+                    error = str(e) or type(e).__name__
+                if attempts <= self.callback_retries:
+                    await asyncio.sleep(self.CALLBACK_BACKOFF * 2 ** (attempts - 1))
+
+        self._stats["callbacks_failed"] += 1
+        print(f"Callback for job {job['job_id']} failed after {attempts} attempts: {error}")
+        return {"status": "failed", "attempts": attempts, "status_code": status_code, "error": error}
+
+    async def _cleanup(self):
+        while True:
+            await asyncio.sleep(self.cleanup_interval)
+            try:
+                self._stats["purged"] += await asyncio.to_thread(self.store.purge_expired)
+            except Exception as e:
+                print(f"Job cleanup failed: {e}")
+
+    def stats(self):
+        return {
+            **self._stats,
+            "queued": self.queued(),
+            "max_queued": self.max_queued,
+            "workers": self.workers,
+            "store": self.store.name,
+        }
+
+
+def public_view(job):
+    """Job record as returned to clients"""
+    return {**job, "expires_at": round(job["expires_at"], 3)}
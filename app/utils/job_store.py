@@ -0,0 +1,123 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+
+from app.utils.json_safe import dumps
+
+
+class MemoryJobStore:
+    """
+    Job records of this worker, in process memory.
+
+    Each record is a dict json_safe.dumps can serialize, with "job_id" and
+    "expires_at" (epoch seconds); expired records read as missing and
+    are dropped by purge_expired().
+    """
+
+    name = "memory"
+
+    def __init__(self):
+        self._jobs = {}
+        self._lock = threading.Lock()
+
+    def put(self, job):
+        with self._lock:
+            self._jobs[job["job_id"]] = dict(job)
+
+    def get(self, job_id):
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None or job["expires_at"] < time.time():
+                return None
+            return dict(job)
+
+    def update(self, job_id, **fields):
+        """Merge `fields` into a job; returns the updated record (None if gone)"""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return None
+            job.update(fields)
+            return dict(job)
+
+    def purge_expired(self):
+        now = time.time()
+        with self._lock:
+            expired = [job_id for job_id, job in self._jobs.items() if job["expires_at"] < now]
+            for job_id in expired:
+                del self._jobs[job_id]
+        return len(expired)
+
+    def __len__(self):
+        return len(self._jobs)
+
+
+class SQLiteJobStore:
+    """
+    Job records in a SQLite file, so every worker on the host can answer
+    a poll for a job another worker accepted.
+    """
+
+    name = "sqlite"
+
+    def __init__(self, path):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._connect() as db:
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS jobs "
+                "(job_id TEXT PRIMARY KEY, record TEXT NOT NULL, expires_at REAL NOT NULL)"
+            )
+
+    @contextmanager
+    def _connect(self):
+        db = sqlite3.connect(self.path, timeout=5)
+        try:
+            with db:
+                yield db
+        finally:
+            db.close()
+
+    def put(self, job):
+        with self._connect() as db:
+            db.execute(
+                "INSERT OR REPLACE INTO jobs (job_id, record, expires_at) VALUES (?, ?, ?)",
+                (job["job_id"], dumps(job).decode(), job["expires_at"])
+            )
+
+    def get(self, job_id):
+        with self._connect() as db:
+            row = db.execute(
+                "SELECT record FROM jobs WHERE job_id = ? AND expires_at >= ?",
+                (job_id, time.time())
+            ).fetchone()
+        return None if row is None else json.loads(row[0])
+
+    def update(self, job_id, **fields):
+        with self._connect() as db:
+            # Take the write lock before reading so concurrent updates serialize
+            db.execute("BEGIN IMMEDIATE")
+            row = db.execute("SELECT record FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+            if row is None:
+                return None
+            job = {**json.loads(row[0]), **fields}
+            db.execute(
+                "UPDATE jobs SET record = ?, expires_at = ? WHERE job_id = ?",
+                (dumps(job).decode(), job["expires_at"], job_id)
+            )
+        return job
+
+    def purge_expired(self):
+        with self._connect() as db:
+            cursor = db.execute("DELETE FROM jobs WHERE expires_at < ?", (time.time(),))
+            return cursor.rowcount
+
+    def __len__(self):
+        with self._connect() as db:
+            return db.execute("SELECT COUNT(*) FROM jobs").fetchone()[0]
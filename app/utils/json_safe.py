@@ -1,5 +1,14 @@
+import json
+import re
+
 import numpy as np
 
+try:
+    import orjson
+except ImportError:  # optional: fall back to the stdlib encoder
+    orjson = None
+
+
 def to_python(obj):
     """
     Recursively convert numpy types to native Python types
@@ -15,3 +24,60 @@ def to_python(obj):
     if isinstance(obj, (list, tuple)):
         return [to_python(v) for v in obj]
     return obj
+
+
+def _numpy_default(obj):
+    # Types OPT_SERIALIZE_NUMPY leaves out (e.g. object arrays)
+    if isinstance(obj, np.generic):
+        return obj.item()
+    if isinstance(obj, np.ndarray):
+        return obj.tolist()
+    raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
+
+
+def _formats_differ(data):
+    """
+    Whether orjson output may hold a float Python's repr writes
+    differently: below 1e-4 repr switches to exponent notation earlier
+    (1e-05 vs 0.00001), and exponents are written without "+" or
+    zero padding (1e+16 vs 1e16). A digit before "e" marks an exponent;
+    "e" inside strings just costs a stdlib pass.
+    """
+    if b"0.0000" in data:
+        return True
+    for marker in (b"e-", b"e1", b"e2", b"e3"):
+        i = data.find(marker)
+        while i != -1:
+            if i > 0 and 48 <= data[i - 1] <= 57:
+                return True
+            i = data.find(marker, i + 1)
+    return False
+
+
+def stdlib_dumps(obj):
+    """The bytes Starlette's JSONResponse renders after to_python"""
+    return json.dumps(
+        to_python(obj), ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")
+    ).encode("utf-8")
+
+
+def dumps(obj):
+    """
+    Serialize a response payload (numpy scalars allowed) to JSON bytes.
+
+    One orjson pass replaces to_python + jsonable_encoder + json.dumps
+    and gives the same bytes as stdlib_dumps. Payloads orjson would
+    format differently (tiny or huge floats, unsupported types) take the
+    stdlib path. np.float32/float16 scalars are the exception: orjson
+    writes their shortest float32 digits ("0.1") where to_python widened
+    them to float64 ("0.10000000149011612"); checks report float64.
+    """
+    if orjson is None:
+        return stdlib_dumps(obj)
+    try:
+        data = orjson.dumps(obj, default=_numpy_default, option=orjson.OPT_SERIALIZE_NUMPY)
+    except TypeError:
+        return stdlib_dumps(obj)
+    if _formats_differ(data):
+        return stdlib_dumps(obj)
+    return data
@@ -0,0 +1,30 @@
+def worker_memory():
+    """
+    Memory of this worker process in MB (Linux only, else None).
+
+    "rss" counts pages shared with other processes in full; "pss" splits
+    shared pages between their users and "private" is what only this
+    process holds, so copy-on-write sharing shows up as pss/private well
+    below rss.
+    """
+    try:
+        with open("/proc/self/smaps_rollup") as f:
+            lines = f.read().splitlines()
+    except OSError:
+        return None
+
+    fields = {}
+    for line in lines[1:]:
+        parts = line.split()
+        if len(parts) >= 2 and parts[1].isdigit():
+            fields[parts[0].rstrip(":")] = int(parts[1])   # kB
+
+    def mb(*names):
+        return round(sum(fields.get(name, 0) for name in names) / 1024, 1)
+
+    return {
+        "rss": mb("Rss"),
+        "pss": mb("Pss"),
+        "shared": mb("Shared_Clean", "Shared_Dirty"),
+        "private": mb("Private_Clean", "Private_Dirty"),
+    }
@@ -0,0 +1,96 @@
+"""
+Prometheus metrics, served by GET /metrics.
+
+Each worker keeps its own registry. When PROMETHEUS_MULTIPROC_DIR is
+set (see gunicorn.conf.py), workers write their samples there and
+/metrics aggregates all of them.
+"""
+import os
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Gauge, Histogram,
+    generate_latest, multiprocess
+)
+
+# From a ~2 ms lighting check up to multi-second OCR / cold YOLO
+STAGE_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+REQUEST_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.0, 3.0, 5.0, 10.0, 20.0, 30.0, 60.0)
+
+DECODE_SECONDS = Histogram(
+    "verification_decode_seconds", "Image decode time (full or reduced JPEG decode)",
+    ["kind"], buckets=STAGE_BUCKETS
+)
+STAGE_SECONDS = Histogram(
+    "verification_stage_seconds", "Execution time of one check or shared artifact stage",
+    ["stage"], buckets=STAGE_BUCKETS
+)
+QUEUE_WAIT_SECONDS = Histogram(
+    "verification_queue_wait_seconds", "Time a stage waited for an executor thread/process",
+    ["stage"], buckets=STAGE_BUCKETS
+)
+REQUEST_SECONDS = Histogram(
+    "http_request_duration_seconds", "End-to-end request latency",
+    ["endpoint", "status"], buckets=REQUEST_BUCKETS
+)
+IN_FLIGHT = Gauge(
+    "http_requests_in_flight", "Requests currently being served",
+    ["endpoint"], multiprocess_mode="livesum"
+)
+VERDICTS = Counter(
+    "verification_verdicts_total", "Verification outcomes (passed / failed / rejected / error)",
+    ["verdict"]
+)
+JOBS = Counter(
+    "verification_jobs_total", "Async jobs by outcome (accepted / rejected / done / failed)",
+    ["status"]
+)
+JOB_QUEUE_DEPTH = Gauge(
+    "verification_job_queue_depth", "Async jobs waiting for a verification worker",
+    multiprocess_mode="livesum"
+)
+TOKEN_CACHE_LOOKUPS = Counter(
+    "auth_token_cache_lookups_total", "Bearer token verifications answered from the cache (hit) or by jwt.decode (miss)",
+    ["result"]
+)
+TOKEN_VERIFY_SAVED_SECONDS = Counter(
+    "auth_token_verify_saved_seconds_total", "Estimated jwt.decode time saved by token cache hits"
+)
+ADMISSION = Counter(
+    "verification_admission_total",
+    "Admission decisions for verify requests (admitted / queued / rejected / timed_out / expired / degraded)",
+    ["outcome"]
+)
+ADMISSION_QUEUE_DEPTH = Gauge(
+    "verification_admission_queue_depth", "Verify requests waiting for an in-flight slot",
+    multiprocess_mode="livesum"
+)
+DEADLINE_EXCEEDED = Counter(
+    "verification_deadline_exceeded_total", "Verify requests cancelled because their deadline passed",
+    ["phase"]
+)
+NEAR_DUPLICATE_LOOKUPS = Counter(
+    "verification_near_duplicate_total",
+    "Perceptual-hash lookups (hit / miss) and audited hits (audit_agree / audit_drift)",
+    ["result"]
+)
+NEAR_DUPLICATE_SAVED_SECONDS = Counter(
+    "verification_near_duplicate_saved_seconds_total", "Pipeline time saved by reusing near-duplicate results"
+)
+LIVE_SESSIONS = Gauge(
+    "verification_live_sessions", "Open live-capture WebSocket sessions",
+    multiprocess_mode="livesum"
+)
+LIVE_FRAMES = Counter(
+    "verification_live_frames_total",
+    "Live-capture frames (checked / dropped / rejected / candidate / failed / passed)",
+    ["outcome"]
+)
+
+
+def render():
+    """(body, content_type) of the current metrics in text format"""
+    if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return generate_latest(registry), CONTENT_TYPE_LATEST
+    return generate_latest(REGISTRY), CONTENT_TYPE_LATEST
@@ -0,0 +1,230 @@
+import random
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+
+import cv2
+import numpy as np
+
+from app.utils.metrics import NEAR_DUPLICATE_LOOKUPS, NEAR_DUPLICATE_SAVED_SECONDS
+
+# Frame the hashes are computed from; the lighting check works at the
+# same resolution, so the reduced decode is shared
+HASH_SIDE = 512
+
+
+def phash(gray):
+    """64-bit DCT hash: low frequencies of a 32x32 thumbnail against their median"""
+    small = cv2.resize(gray, (32, 32), interpolation=cv2.INTER_AREA).astype(np.float32)
+    low = cv2.dct(small)[:8, :8].flatten()
+    # The DC term only carries overall brightness
+    bits = low > np.median(low[1:])
+    return _pack(bits)
+
+
+def dhash(gray):
+    """64-bit gradient hash: sign of horizontal differences on a 9x8 thumbnail"""
+    small = cv2.resize(gray, (9, 8), interpolation=cv2.INTER_AREA).astype(np.int16)
+    bits = (small[:, 1:] > small[:, :-1]).flatten()
+    return _pack(bits)
+
+
+def _pack(bits):
+    return int.from_bytes(np.packbits(bits).tobytes(), "big")
+
+
+def hamming(a, b):
+    return (a ^ b).bit_count()
+
+
+def image_hashes(ctx):
+    """(phash, dhash) of an ImageContext at HASH_SIDE, or None if it does not decode"""
+    gray = ctx.at(HASH_SIDE).gray
+    if gray is None:
+        return None
+    return phash(gray), dhash(gray)
+
+
+class BKTree:
+    """
+    Burkhard-Keller tree over 64-bit hashes under Hamming distance.
+
+    Nodes are [hash, key, {distance: child}]. Removal leaves a tombstone;
+    the owner rebuilds the tree once tombstones outnumber live nodes.
+    """
+
+    def __init__(self):
+        self._root = None
+        self.removed = set()
+        self.size = 0
+
+    def add(self, value, key):
+        self.size += 1
+        node = [value, key, {}]
+        if self._root is None:
+            self._root = node
+            return
+        current = self._root
+        while True:
+            d = hamming(value, current[0])
+            child = current[2].get(d)
+            if child is None:
+                current[2][d] = node
+                return
+            current = child
+
+    def remove(self, key):
+        self.removed.add(key)
+
+    def search(self, value, radius):
+        """[(distance, key)] of live nodes within `radius`, nearest first"""
+        found = []
+        pending = [self._root] if self._root is not None else []
+        while pending:
+            node = pending.pop()
+            d = hamming(value, node[0])
+            if d <= radius and node[1] not in self.removed:
+                found.append((d, node[1]))
+            # Triangle inequality: only children at d +- radius can match
+            for child_d, child in node[2].items():
+                if d - radius <= child_d <= d + radius:
+                    pending.append(child)
+        found.sort(key=lambda item: item[0])
+        return found
+
+    def live(self):
+        return self.size - len(self.removed)
+
+    def items(self):
+        """(hash, key) of every live node"""
+        pending = [self._root] if self._root is not None else []
+        while pending:
+            node = pending.pop()
+            if node[1] not in self.removed:
+                yield node[0], node[1]
+            pending.extend(node[2].values())
+
+
+@dataclass
+class NearMatch:
+    key: int
+    distance: int
+    result: dict
+    compute_seconds: float
+
+
+class NearDuplicateIndex:
+    """
+    Reuses verification results for visually near-identical uploads
+    (re-encoded, resized, slightly re-cropped).
+
+    Entries are indexed by pHash in one BK-tree per namespace (check
+    configuration). A match needs the pHash within `max_distance` bits
+    and, as confirmation, the dHash within twice that: dHash is as
+    stable under re-encoding but moves more under cropping. At most
+    `max_entries` entries are kept, least recently matched first out,
+    each for `ttl_seconds`.
+
+    A share `audit_rate` of matches is recomputed anyway and compared
+    with the reused result, to measure verdict drift against the compute
+    saved.
+    """
+
+    def __init__(self, max_entries, ttl_seconds, max_distance=4, audit_rate=0.0):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.max_distance = max_distance
+        self.audit_rate = audit_rate
+        self._trees = {}
+        self._entries = OrderedDict()   # key -> (namespace, expires_at, dhash, result, compute_seconds)
+        self._next_key = 0
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "reused": 0, "audits": 0, "audit_drift": 0, "evicted": 0}
+        self._saved_seconds = 0.0
+        self._distances = [0] * (max_distance + 1)
+
+    def lookup(self, namespace, hashes):
+        """Closest live entry within max_distance for (phash, dhash), or None"""
+        ph, dh = hashes
+        now = time.time()
+        with self._lock:
+            tree = self._trees.get(namespace)
+            candidates = tree.search(ph, self.max_distance) if tree is not None else []
+            for distance, key in candidates:
+                _, expires_at, entry_dh, result, compute_seconds = self._entries[key]
+                if expires_at < now:
+                    self._drop(key)
+                    continue
+                if hamming(dh, entry_dh) > 2 * self.max_distance:
+                    continue
+                self._entries.move_to_end(key)
+                self._stats["hits"] += 1
+                self._distances[distance] += 1
+                NEAR_DUPLICATE_LOOKUPS.labels("hit").inc()
+                return NearMatch(key, distance, result, compute_seconds)
+
+            self._stats["misses"] += 1
+        NEAR_DUPLICATE_LOOKUPS.labels("miss").inc()
+        return None
+
+    def add(self, namespace, hashes, result, compute_seconds):
+        ph, dh = hashes
+        with self._lock:
+            key = self._next_key
+            self._next_key += 1
+            self._trees.setdefault(namespace, BKTree()).add(ph, key)
+            self._entries[key] = (namespace, time.time() + self.ttl_seconds, dh, result, compute_seconds)
+            while len(self._entries) > self.max_entries:
+                oldest = next(iter(self._entries))
+                self._drop(oldest)
+                self._stats["evicted"] += 1
+
+    def should_audit(self):
+        """Whether to recompute a match instead of reusing it"""
+        return self.audit_rate > 0 and random.random() < self.audit_rate
+
+    def reused(self, match):
+        """Account the compute a reused match saved"""
+        with self._lock:
+            self._stats["reused"] += 1
+            self._saved_seconds += match.compute_seconds
+        NEAR_DUPLICATE_SAVED_SECONDS.inc(match.compute_seconds)
+
+    def record_audit(self, match, result):
+        """Compare a recomputed result with the one the match would have reused"""
+        drift = (result["image_status"] != match.result["image_status"]
+                 or result["score"] != match.result["score"])
+        with self._lock:
+            self._stats["audits"] += 1
+            self._stats["audit_drift"] += int(drift)
+        NEAR_DUPLICATE_LOOKUPS.labels("audit_drift" if drift else "audit_agree").inc()
+        return drift
+
+    def _drop(self, key):
+        namespace = self._entries.pop(key)[0]
+        tree = self._trees[namespace]
+        tree.remove(key)
+        if tree.live() == 0:
+            del self._trees[namespace]
+        elif len(tree.removed) > tree.live():
+            self._rebuild(namespace)
+
+    def _rebuild(self, namespace):
+        tree = BKTree()
+        for value, key in self._trees[namespace].items():
+            tree.add(value, key)
+        self._trees[namespace] = tree
+
+    def stats(self):
+        lookups = self._stats["hits"] + self._stats["misses"]
+        audits = self._stats["audits"]
+        return {
+            **self._stats,
+            "entries": len(self._entries),
+            "hit_ratio": round(self._stats["hits"] / lookups, 4) if lookups else 0.0,
+            "drift_ratio": round(self._stats["audit_drift"] / audits, 4) if audits else None,
+            "saved_seconds": round(self._saved_seconds, 3),
+            "hits_by_distance": list(self._distances),
+            "max_distance": self.max_distance,
+        }
@@ -0,0 +1,100 @@
+"""
+Per-process CPU budget: thread counts of the native libraries, the check
+executor and optional core pinning, all derived from the CPU budget
+settings in app/config.py.
+"""
+import os
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import cv2
+
+from app import config
+
+# Core set this process was pinned to (None: not pinned by us)
+PINNED_CPUS = None
+# Default executor installed by install_executor()
+_executor = None
+
+
+def configure_threads():
+    """
+    Cap the thread pools of the native libraries in this process. Run it
+    before the first OCR or model call; OMP_* must be in the environment
+    before Tesseract's OpenMP runtime starts (and is inherited by the
+    tesseract CLI pytesseract spawns).
+    """
+    os.environ["OMP_THREAD_LIMIT"] = str(config.OMP_THREADS)
+    os.environ["OMP_NUM_THREADS"] = str(config.OMP_THREADS)
+    cv2.setNumThreads(config.CV2_THREADS)
+
+
+def install_executor(loop):
+    """Size the loop's default executor (asyncio.to_thread) to CHECK_THREADS"""
+    global _executor
+    _executor = ThreadPoolExecutor(max_workers=config.CHECK_THREADS, thread_name_prefix="check")
+    loop.set_default_executor(_executor)
+
+
+def pin_to_cpus(cpus):
+    """Restrict this process (threads started later inherit it) to `cpus`"""
+    global PINNED_CPUS
+    if not cpus or not hasattr(os, "sched_setaffinity"):
+        return
+    os.sched_setaffinity(0, cpus)
+    PINNED_CPUS = tuple(sorted(cpus))
+
+
+def pin_worker(slot):
+    """
+    Pin server worker number `slot` to its own WORKER_CPUS cores of the
+    available set (wrapping around when workers x WORKER_CPUS exceeds it)
+    """
+    if not hasattr(os, "sched_getaffinity"):
+        return
+    cpus = sorted(os.sched_getaffinity(0))
+    count = min(config.WORKER_CPUS, len(cpus))
+    start = (slot * count) % len(cpus)
+    pin_to_cpus([cpus[(start + i) % len(cpus)] for i in range(count)])
+
+
+def resource_report():
+    """Effective CPU settings of this worker, for the diagnostics endpoint"""
+    torch_threads = None
+    if "torch" in sys.modules:
+        torch = sys.modules["torch"]
+        torch_threads = {"intra_op": torch.get_num_threads(), "inter_op": torch.get_num_interop_threads()}
+
+    return {
+        "pid": os.getpid(),
+        "available_cpus": config.AVAILABLE_CPUS,
+        "web_concurrency": config.WEB_CONCURRENCY,
+        "worker_cpus": config.WORKER_CPUS,
+        "affinity": sorted(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else None,
+        "pinned": PINNED_CPUS is not None,
+        "check_executor": {
+            "kind": config.CHECK_EXECUTOR,
+            "threads": _executor._max_workers if _executor is not None else None,
+            "process_workers": config.CHECK_PROCESS_WORKERS if config.CHECK_EXECUTOR == "process" else None,
+            "process_cpus": list(config.CHECK_PROCESS_CPUS) or None,
+        },
+        "cv2_threads": cv2.getNumThreads(),
+        "omp_thread_limit": os.getenv("OMP_THREAD_LIMIT"),
+        "detector": {"backend": config.DETECTOR_BACKEND, "threads": config.DETECTOR_THREADS},
+        "torch_threads": torch_threads,
+        "python_threads": threading.active_count(),
+        "os_threads": _os_threads(),
+    }
+
+
+def _os_threads():
+    # Includes native pools (OpenMP, torch, OpenCV) Python does not see
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("Threads:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return None
@@ -1,6 +1,11 @@
+import functools
 import time
 from typing import Any
 
+from starlette.responses import JSONResponse, Response
+
+from app.utils.json_safe import dumps
+
 def make_response(
     data: Any = None,
     msg: str = "",
@@ -44,3 +49,26 @@ def error(
         status_code=status_code,
         response="error"
     )
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse rendered in one pass by json_safe.dumps (numpy values allowed)"""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+def serialized(endpoint):
+    """
+    Route decorator: serialize the returned envelope here instead of
+    FastAPI's jsonable_encoder + json.dumps. Same bytes, one pass.
+    Responses the endpoint builds itself are passed through.
+    """
+    @functools.wraps(endpoint)
+    async def wrapper(*args, **kwargs):
+        result = await endpoint(*args, **kwargs)
+        if isinstance(result, Response):
+            return result
+        return FastJSONResponse(result)
+
+    return wrapper
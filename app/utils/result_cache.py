@@ -0,0 +1,249 @@
+import asyncio
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+
+from app.utils.json_safe import dumps
+
+
+def cache_key(image_bytes, fingerprint):
+    """Content address: image bytes plus the check-configuration fingerprint"""
+    digest = hashlib.sha256(image_bytes).hexdigest()
+    return f"{fingerprint}:{digest}"
+
+
+def config_fingerprint(settings):
+    """Short stable hash of every setting that can change a result"""
+    blob = json.dumps(settings, sort_keys=True, default=str)
+    return hashlib.sha256(blob.encode()).hexdigest()[:16]
+
+
+class MemoryLRU:
+    """In-process LRU with a per-entry TTL"""
+
+    def __init__(self, max_entries, ttl_seconds):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries = OrderedDict()   # key -> (expires_at, value)
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at < time.time():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._entries[key] = (time.time() + self.ttl_seconds, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class SQLiteStore:
+    """
+    On-disk store shared by every uvicorn worker on the host.
+
+    Besides results it keeps short leases, so that when several workers
+    receive the same image at once only the lease holder computes it.
+    """
+
+    def __init__(self, path, ttl_seconds, lease_seconds=60):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.lease_seconds = lease_seconds
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._connect() as db:
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS results "
+                "(key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL)"
+            )
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS leases "
+                "(key TEXT PRIMARY KEY, owner TEXT NOT NULL, expires_at REAL NOT NULL)"
+            )
+
+    @contextmanager
+    def _connect(self):
+        db = sqlite3.connect(self.path, timeout=5)
+        try:
+            with db:
+                yield db
+        finally:
+            db.close()
+
+    def get(self, key):
+        with self._connect() as db:
+            row = db.execute(
+                "SELECT value FROM results WHERE key = ? AND expires_at >= ?",
+                (key, time.time())
+            ).fetchone()
+        return None if row is None else json.loads(row[0])
+
+    def set(self, key, value):
+        now = time.time()
+        with self._connect() as db:
+            db.execute(
+                "INSERT OR REPLACE INTO results (key, value, expires_at) VALUES (?, ?, ?)",
+                (key, dumps(value).decode(), now + self.ttl_seconds)
+            )
+            # Opportunistic cleanup keeps the file bounded by the TTL
+            db.execute("DELETE FROM results WHERE expires_at < ?", (now,))
+
+    def claim(self, key, owner):
+        """Take the compute lease for `key`; False if another worker holds it"""
+        now = time.time()
+        with self._connect() as db:
+            db.execute("DELETE FROM leases WHERE key = ? AND expires_at < ?", (key, now))
+            cursor = db.execute(
+                "INSERT OR IGNORE INTO leases (key, owner, expires_at) VALUES (?, ?, ?)",
+                (key, owner, now + self.lease_seconds)
+            )
+            return cursor.rowcount == 1
+
+    def release(self, key, owner):
+        with self._connect() as db:
+            db.execute("DELETE FROM leases WHERE key = ? AND owner = ?", (key, owner))
+
+    def lease_active(self, key):
+        with self._connect() as db:
+            row = db.execute(
+                "SELECT 1 FROM leases WHERE key = ? AND expires_at >= ?",
+                (key, time.time())
+            ).fetchone()
+        return row is not None
+
+
+class ResultCache:
+    """
+    Verification result cache: memory LRU in front of an optional SQLite
+    store, with coalescing of concurrent identical requests (in-process
+    through a shared future, across workers through SQLite leases).
+    """
+
+    POLL_SECONDS = 0.05
+
+    def __init__(self, memory, store=None):
+        self.memory = memory
+        self.store = store
+        self._inflight = {}
+        self._owner = f"{os.getpid()}-{id(self)}"
+        self._stats = {"hits": 0, "disk_hits": 0, "misses": 0, "coalesced": 0, "errors": 0}
+
+    async def get_or_compute(self, key, compute):
+        """
+        Return (result, status) with status "hit", "coalesced" or "miss".
+        `compute` is an async callable producing a dict json_safe.dumps can
+        serialize (numpy scalars allowed).
+        """
+        value = self.memory.get(key)
+        if value is not None:
+            self._stats["hits"] += 1
+            return value, "hit"
+
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            try:
+                value = await asyncio.shield(inflight)
+            except asyncio.CancelledError:
+                if not inflight.cancelled():
+                    raise
+                # The request we were waiting on was cancelled; start over
+                return await self.get_or_compute(key, compute)
+            self._stats["coalesced"] += 1
+            return value, "coalesced"
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            value, status = await self._resolve(key, compute)
+            future.set_result(value)
+            return value, status
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            # Waiters (if any) consume the exception; avoid "never retrieved"
+            future.exception()
+            raise
+        finally:
+            del self._inflight[key]
+
+    async def _resolve(self, key, compute):
+        if self.store is None:
+            self._stats["misses"] += 1
+            value = await compute()
+            self.memory.set(key, value)
+            return value, "miss"
+
+        value = await self._store_call(self.store.get, key)
+        if value is not None:
+            self._stats["disk_hits"] += 1
+            self.memory.set(key, value)
+            return value, "hit"
+
+        claimed = await self._store_call(self.store.claim, key, self._owner)
+        if not claimed:
+            # Another worker is computing it: wait for its result
+            value = await self._wait_for_peer(key)
+            if value is not None:
+                self._stats["coalesced"] += 1
+                self.memory.set(key, value)
+                return value, "coalesced"
+
+        self._stats["misses"] += 1
+        try:
+            value = await compute()
+            self.memory.set(key, value)
+            await self._store_call(self.store.set, key, value)
+        finally:
+            if claimed:
+                await self._store_call(self.store.release, key, self._owner)
+        return value, "miss"
+
+    async def _wait_for_peer(self, key):
+        while True:
+            await asyncio.sleep(self.POLL_SECONDS)
+            value = await self._store_call(self.store.get, key)
+            if value is not None:
+                return value
+            if not await self._store_call(self.store.lease_active, key):
+                # Peer failed or its lease expired; compute locally
+                return await self._store_call(self.store.get, key)
+
+    async def _store_call(self, func, *args):
+        # The disk store is an optimization: on SQLite errors act as a miss
+        try:
+            return await asyncio.to_thread(func, *args)
+        except sqlite3.Error as e:
+            self._stats["errors"] += 1
+            print(f"Result cache store error: {e}")
+            return None
+
+    def stats(self):
+        lookups = self._stats["hits"] + self._stats["disk_hits"] + self._stats["misses"] + self._stats["coalesced"]
+        return {
+            **self._stats,
+            "entries": len(self.memory),
+            "hit_ratio": round((lookups - self._stats["misses"]) / lookups, 4) if lookups else 0.0,
+            "backend": "memory+sqlite" if self.store is not None else "memory",
+        }
@@ -1,9 +1,111 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
 import jwt
+from app.config import TOKEN_CACHE_SIZE, TOKEN_CACHE_TTL
+from app.utils.metrics import TOKEN_CACHE_LOOKUPS, TOKEN_VERIFY_SAVED_SECONDS
 from app.utils.response import error
 
 SECRET_KEY = "ATIK-IMAGE_PROCESSING-SECRET"
 
 
+class TokenCache:
+    """
+    Bounded LRU of tokens whose signature and claims already verified.
+
+    Keyed by a SHA-256 digest of the token (the token itself is never
+    stored). An entry is served until the token's `exp` (capped at
+    `ttl_seconds` from verification) and the whole cache is dropped when
+    the signing key changes. Only successful verifications are cached,
+    so expired and invalid tokens always take the full jwt.decode path.
+    """
+
+    # Weight of the newest sample in the running jwt.decode cost
+    COST_SMOOTHING = 0.1
+
+    def __init__(self, max_entries, ttl_seconds):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries = OrderedDict()   # digest -> (expires_at, payload)
+        self._key_digest = None
+        self._lock = threading.Lock()
+        self._decode_seconds = None
+        self._stats = {"hits": 0, "misses": 0, "saved_seconds": 0.0}
+
+    def verify(self, token, key):
+        """jwt.decode(token, key), answered from the cache when possible"""
+        if self.max_entries <= 0:
+            return jwt.decode(token, key, algorithms=["HS256"])
+
+        started = time.perf_counter()
+        digest = hashlib.sha256(token.encode()).digest()
+        key_digest = hashlib.sha256(key.encode()).digest()
+        with self._lock:
+            if key_digest != self._key_digest:
+                self._entries.clear()
+                self._key_digest = key_digest
+            entry = self._entries.get(digest)
+            if entry is not None and entry[0] <= time.time():
+                del self._entries[digest]
+                entry = None
+            if entry is not None:
+                self._entries.move_to_end(digest)
+
+        if entry is not None:
+            saved = max(0.0, (self._decode_seconds or 0.0) - (time.perf_counter() - started))
+            self._stats["hits"] += 1
+            self._stats["saved_seconds"] += saved
+            TOKEN_CACHE_LOOKUPS.labels("hit").inc()
+            TOKEN_VERIFY_SAVED_SECONDS.inc(saved)
+            return dict(entry[1])
+
+        self._stats["misses"] += 1
+        TOKEN_CACHE_LOOKUPS.labels("miss").inc()
+        decode_started = time.perf_counter()
+        payload = jwt.decode(token, key, algorithms=["HS256"])
+        self._observe_decode(time.perf_counter() - decode_started)
+
+        now = time.time()
+        expires_at = now + self.ttl_seconds
+        if isinstance(payload.get("exp"), (int, float)):
+            expires_at = min(expires_at, payload["exp"])
+        with self._lock:
+            if key_digest == self._key_digest:
+                self._entries[digest] = (expires_at, dict(payload))
+                self._entries.move_to_end(digest)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+        return payload
+
+    def _observe_decode(self, seconds):
+        if self._decode_seconds is None:
+            self._decode_seconds = seconds
+        else:
+            a = self.COST_SMOOTHING
+            self._decode_seconds = (1 - a) * self._decode_seconds + a * seconds
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        lookups = self._stats["hits"] + self._stats["misses"]
+        return {
+            "hits": self._stats["hits"],
+            "misses": self._stats["misses"],
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "hit_ratio": round(self._stats["hits"] / lookups, 4) if lookups else 0.0,
+            "decode_ms": round(self._decode_seconds * 1000, 4) if self._decode_seconds else None,
+            "saved_ms": round(self._stats["saved_seconds"] * 1000, 3),
+        }
+
+
+TOKEN_CACHE = TokenCache(TOKEN_CACHE_SIZE, TOKEN_CACHE_TTL)
+
+
 def verify_api_key_plain(authorization: str | None):
     if not authorization:
         return error(
@@ -22,7 +124,7 @@ def verify_api_key_plain(authorization: str | None):
     token = authorization.replace("Bearer ", "").strip()
 
     try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=["HS256"])
+        payload = TOKEN_CACHE.verify(token, SECRET_KEY)
         return payload  # valid token → return payload
 
     except jwt.ExpiredSignatureError:
@@ -0,0 +1,89 @@
+from app.config import UPLOAD_MAX_BYTES, UPLOAD_MAX_PIXELS, UPLOAD_MIN_SIDE, UPLOAD_CHUNK_BYTES
+from app.utils.image_header import probe_header, sniff_format
+
+ALLOWED_IMAGE_EXTS = {"jpg", "jpeg", "png"}
+
+
+def is_allowed_image(upload):
+    """Uploaded file must be a JPG/JPEG/PNG by extension and content type"""
+    filename = (upload.filename or "").lower()
+    ext = filename.rsplit('.', 1)[-1] if '.' in filename else ''
+    content_type = (getattr(upload, "content_type", "") or "").lower()
+
+    return ext in ALLOWED_IMAGE_EXTS and content_type.startswith("image/")
+
+
+class UploadRejected(Exception):
+    """Upload refused before decoding; the message is safe to return"""
+
+    def __init__(self, msg, status_code=400):
+        super().__init__(msg)
+        self.msg = msg
+        self.status_code = status_code
+
+
+async def read_image_upload(upload, max_bytes=UPLOAD_MAX_BYTES):
+    """
+    Read an image upload in chunks, validating it as it arrives.
+
+    Stops as soon as the byte limit is exceeded, the magic bytes are not
+    JPEG/PNG, or the header declares too many / too few pixels, so an
+    oversized or bogus file is never read in full nor decoded. Returns
+    (buffer, ImageHeader); the buffer is handed to ImageContext as is.
+    """
+    size = getattr(upload, "size", None)
+    if size is not None and size > max_bytes:
+        raise UploadRejected(f"Image file exceeds {max_bytes} bytes", status_code=413)
+
+    buf = bytearray()
+    header = None
+    while True:
+        chunk = await upload.read(UPLOAD_CHUNK_BYTES)
+        if not chunk:
+            break
+        buf += chunk
+        if len(buf) > max_bytes:
+            raise UploadRejected(f"Image file exceeds {max_bytes} bytes", status_code=413)
+        if header is None:
+            header = _check_header(buf)
+
+    return buf, _require_header(buf, header)
+
+
+def check_image_bytes(buf, max_bytes=UPLOAD_MAX_BYTES):
+    """
+    Same limits as read_image_upload for an image received whole (e.g. a
+    WebSocket frame); returns its ImageHeader or raises UploadRejected.
+    """
+    if len(buf) > max_bytes:
+        raise UploadRejected(f"Image file exceeds {max_bytes} bytes", status_code=413)
+    return _require_header(buf, _check_header(buf) if buf else None)
+
+
+def _require_header(buf, header):
+    if not buf:
+        raise UploadRejected("Empty image file")
+    if header is None:
+        if sniff_format(buf) is None:
+            raise UploadRejected("Uploaded file must be a JPG or PNG image")
+        raise UploadRejected("Truncated image header")
+    return header
+
+
+def _check_header(buf):
+    try:
+        header = probe_header(buf)
+    except ValueError:
+        raise UploadRejected("Uploaded file must be a JPG or PNG image")
+    if header is None:
+        return None
+
+    if header.pixels > UPLOAD_MAX_PIXELS:
+        raise UploadRejected(
+            f"Image too large: {header.width}x{header.height} exceeds {UPLOAD_MAX_PIXELS} pixels"
+        )
+    if min(header.width, header.height) < UPLOAD_MIN_SIDE:
+        raise UploadRejected(
+            f"Image too small: {header.width}x{header.height}, sides must be at least {UPLOAD_MIN_SIDE} pixels"
+        )
+    return header
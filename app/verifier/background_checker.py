@@ -1,7 +1,14 @@
 import cv2, numpy as np
 
+from app.verifier.image_context import as_image_context
+
+
 def check_background(image_bytes):
-    img = cv2.imdecode(np.frombuffer(image_bytes, np.uint8), cv2.IMREAD_GRAYSCALE)
+    return check_background_ctx(as_image_context(image_bytes))
+
+
+def check_background_ctx(ctx):
+    img = ctx.gray
     edges = cv2.Canny(img, 100, 200)
 
     ratio = (edges > 0).sum() / (img.shape[0] * img.shape[1])
@@ -0,0 +1,54 @@
+import threading
+import time
+
+import cv2
+
+FRONTAL_FACE = "haarcascade_frontalface_default.xml"
+EYE = "haarcascade_eye.xml"
+
+# Per-thread {name: cv2.CascadeClassifier}. detectMultiScale is not
+# re-entrant, so each thread gets its own classifier instead of sharing
+# one behind a lock, which would serialize Haar detection across requests.
+_LOCAL = threading.local()
+_STATS = {}
+_STATS_LOCK = threading.Lock()
+
+
+def get_cascade(name):
+    """Return this thread's cascade for `name`, loading the XML on its first use in the thread"""
+    cascades = getattr(_LOCAL, "cascades", None)
+    if cascades is None:
+        cascades = _LOCAL.cascades = {}
+
+    cascade = cascades.get(name)
+    if cascade is None:
+        started = time.perf_counter()
+        cascade = cv2.CascadeClassifier(cv2.data.haarcascades + name)
+        elapsed = time.perf_counter() - started
+
+        if cascade.empty():
+            raise RuntimeError(f"Failed to load Haar cascade: {name}")
+
+        with _STATS_LOCK:
+            stats = _STATS.setdefault(name, {"loads": 0, "load_seconds": 0.0})
+            stats["loads"] += 1
+            stats["load_seconds"] += elapsed
+
+        cascades[name] = cascade
+    return cascade
+
+
+def cascade_stats():
+    """
+    Load counters per cascade. `loads` should stay at or below the number
+    of threads that run checks (CHECK_THREADS); anything higher means
+    classifiers are being rebuilt per request.
+    """
+    with _STATS_LOCK:
+        return {
+            name: {
+                "loads": s["loads"],
+                "load_seconds": round(s["load_seconds"], 6)
+            }
+            for name, s in _STATS.items()
+        }
@@ -0,0 +1,230 @@
+import ast
+import os
+
+import cv2
+import numpy as np
+
+from app.config import (
+    YOLO_AREA_FILTER, YOLO_SEG_MODEL, YOLO_DET_MODEL,
+    DETECTOR_BACKEND, DETECTOR_IMGSZ, DETECTOR_THREADS, DETECTOR_INT8
+)
+from app.verifier.yolo_detector import Detections, from_result
+
+# Ultralytics predict defaults, so every backend filters the same way
+IOU_THRESHOLD = 0.7
+MAX_DETECTIONS = 300
+LETTERBOX_FILL = 114
+
+
+class TorchDetector:
+    """Ultralytics PyTorch checkpoint (the original runtime)"""
+
+    name = "torch"
+
+    def __init__(self, weights, imgsz=640, threads=0):
+        from ultralytics import YOLO
+        if threads:
+            import torch
+            torch.set_num_threads(threads)
+            try:
+                # One forward pass at a time: no use for an inter-op pool
+                torch.set_num_interop_threads(1)
+            except RuntimeError:
+                pass  # only settable before torch's first parallel work
+        self.model = YOLO(weights)
+        self.names = self.model.names
+        self.imgsz = imgsz
+
+    def predict(self, frames, conf):
+        results = self.model.predict(
+            source=list(frames),
+            conf=conf,
+            imgsz=self.imgsz,
+            device="cpu",
+            verbose=False
+        )
+        return [
+            from_result(result, self.names, frame.shape[:2])
+            for result, frame in zip(results, frames)
+        ]
+
+
+class _ExportedDetector:
+    """
+    Shared pre/post-processing for runtimes executing the ONNX export:
+    letterbox to the fixed input size, then YOLOv8 head decoding, NMS and
+    (for segmentation models) lazy prototype masks.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.names, self.imgsz = _onnx_metadata(path)
+
+    def predict(self, frames, conf):
+        # Exported models have a fixed batch of one
+        return [self._predict_one(frame, conf) for frame in frames]
+
+    def _predict_one(self, frame, conf):
+        blob, gain, pad = _letterbox(frame, self.imgsz)
+        outputs = self._infer(blob)
+        return _decode(outputs, self.names, frame.shape[:2], conf, gain, pad, self.imgsz)
+
+    def _infer(self, blob):
+        raise NotImplementedError
+
+
+class OnnxDetector(_ExportedDetector):
+    """ONNX Runtime on the CPU execution provider"""
+
+    name = "onnx"
+
+    def __init__(self, path, threads=0, int8=False):
+        import onnxruntime as ort
+        super().__init__(path)
+        options = ort.SessionOptions()
+        if threads:
+            options.intra_op_num_threads = threads
+        self.session = ort.InferenceSession(
+            _quantized(path) if int8 else path, options, providers=["CPUExecutionProvider"]
+        )
+        self.input_name = self.session.get_inputs()[0].name
+
+    def _infer(self, blob):
+        return self.session.run(None, {self.input_name: blob})
+
+
+class OpenVINODetector(_ExportedDetector):
+    """OpenVINO CPU plugin, compiling the ONNX export directly"""
+
+    name = "openvino"
+
+    def __init__(self, path, threads=0):
+        import openvino as ov
+        super().__init__(path)
+        config = {"INFERENCE_NUM_THREADS": threads} if threads else {}
+        self.model = ov.Core().compile_model(path, "CPU", config)
+
+    def _infer(self, blob):
+        result = self.model(blob)
+        return [result[output] for output in self.model.outputs]
+
+
+def make_detector(backend=DETECTOR_BACKEND, weights=None, imgsz=DETECTOR_IMGSZ,
+                  threads=DETECTOR_THREADS, int8=DETECTOR_INT8):
+    """Detector for `backend`; defaults follow the DETECTOR_* settings"""
+    if weights is None:
+        # Segmentation head is only needed for mask-area filtering
+        weights = YOLO_SEG_MODEL if YOLO_AREA_FILTER == "mask" else YOLO_DET_MODEL
+    if int8 and backend != "onnx":
+        raise ValueError("DETECTOR_INT8 is only supported by the onnx detector backend")
+
+    if backend == "torch":
+        return TorchDetector(weights, imgsz, threads)
+
+    path = weights if weights.endswith(".onnx") else export_onnx(weights, imgsz)
+    if backend == "onnx":
+        return OnnxDetector(path, threads, int8)
+    if backend == "openvino":
+        return OpenVINODetector(path, threads)
+    raise ValueError(f"Unknown detector backend '{backend}'")
+
+
+def export_onnx(weights, imgsz):
+    """Export a .pt checkpoint to ONNX at a fixed input size (cached on disk)"""
+    target = f"{os.path.splitext(weights)[0]}-{imgsz}.onnx"
+    if not os.path.exists(target):
+        from ultralytics import YOLO
+        exported = YOLO(weights).export(format="onnx", imgsz=imgsz, dynamic=False)
+        os.replace(exported, target)
+    return target
+
+
+def _quantized(path):
+    """Dynamic int8 weight quantization of an ONNX model (cached on disk)"""
+    target = f"{os.path.splitext(path)[0]}.int8.onnx"
+    if not os.path.exists(target):
+        from onnxruntime.quantization import quantize_dynamic, QuantType
+        quantize_dynamic(path, target, weight_type=QuantType.QUInt8)
+    return target
+
+
+def _onnx_metadata(path):
+    """Class names and input size recorded by the Ultralytics export"""
+    import onnx
+    model = onnx.load(path, load_external_data=False)
+    meta = {prop.key: prop.value for prop in model.metadata_props}
+    dims = model.graph.input[0].type.tensor_type.shape.dim
+    return ast.literal_eval(meta["names"]), dims[2].dim_value
+
+
+def _letterbox(frame, imgsz):
+    """Resize keeping aspect, pad to imgsz x imgsz; returns NCHW RGB float blob"""
+    h, w = frame.shape[:2]
+    gain = min(imgsz / h, imgsz / w)
+    nh, nw = round(h * gain), round(w * gain)
+    top, left = (imgsz - nh) // 2, (imgsz - nw) // 2
+
+    canvas = np.full((imgsz, imgsz, 3), LETTERBOX_FILL, np.uint8)
+    canvas[top:top + nh, left:left + nw] = cv2.resize(frame, (nw, nh), interpolation=cv2.INTER_LINEAR)
+    blob = canvas[:, :, ::-1].transpose(2, 0, 1)[None].astype(np.float32) / 255.0
+    return np.ascontiguousarray(blob), gain, (left, top)
+
+
+def _decode(outputs, names, image_shape, conf, gain, pad, imgsz):
+    """YOLOv8 head output -> Detections in original-image pixels"""
+    pred = outputs[0][0].T                      # (anchors, 4 + classes [+ mask coeffs])
+    nc = len(names)
+    class_scores = pred[:, 4:4 + nc]
+    class_ids = class_scores.argmax(axis=1)
+    scores = class_scores[np.arange(len(pred)), class_ids]
+
+    keep = scores > conf
+    pred, class_ids, scores = pred[keep], class_ids[keep], scores[keep]
+    if not len(pred):
+        return Detections([], np.zeros((0, 4), np.float32), image_shape)
+
+    # cx, cy, w, h -> x, y, w, h for NMS (per class, like Ultralytics)
+    xywh = pred[:, :4].copy()
+    xywh[:, :2] -= xywh[:, 2:] / 2
+    picked = cv2.dnn.NMSBoxesBatched(
+        xywh.tolist(), scores.tolist(), class_ids.tolist(), conf, IOU_THRESHOLD
+    )
+    picked = np.asarray(picked, dtype=int).reshape(-1)
+    picked = picked[np.argsort(-scores[picked], kind="stable")][:MAX_DETECTIONS]
+
+    input_boxes = np.concatenate([xywh[picked, :2], xywh[picked, :2] + xywh[picked, 2:]], axis=1)
+    h, w = image_shape
+    left, top = pad
+    boxes = (input_boxes - [left, top, left, top]) / gain
+    boxes[:, [0, 2]] = boxes[:, [0, 2]].clip(0, w)
+    boxes[:, [1, 3]] = boxes[:, [1, 3]].clip(0, h)
+
+    mask_source = None
+    if len(outputs) > 1:
+        coeffs = pred[picked, 4 + nc:]
+        protos = outputs[1][0]                  # (coeffs, mh, mw)
+        mask_source = _prototype_masks(coeffs, protos, input_boxes, imgsz)
+
+    return Detections(
+        names=[names[int(c)] for c in class_ids[picked]],
+        boxes=boxes.astype(np.float32),
+        image_shape=image_shape,
+        mask_source=mask_source
+    )
+
+
+def _prototype_masks(coeffs, protos, input_boxes, imgsz):
+    """Lazy per-detection masks at prototype resolution, cropped to the box"""
+    nm, mh, mw = protos.shape
+    flat = protos.reshape(nm, -1)
+    scale = np.array([mw, mh, mw, mh]) / imgsz
+
+    def mask(i):
+        # sigmoid(x) > 0.5  <=>  x > 0
+        m = (coeffs[i] @ flat).reshape(mh, mw) > 0
+        x1, y1, x2, y2 = (input_boxes[i] * scale).round().astype(int)
+        cropped = np.zeros_like(m)
+        cropped[max(y1, 0):y2, max(x1, 0):x2] = m[max(y1, 0):y2, max(x1, 0):x2]
+        return cropped
+
+    return mask
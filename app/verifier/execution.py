@@ -0,0 +1,201 @@
+import asyncio
+import multiprocessing
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import asynccontextmanager
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from app.config import CHECK_EXECUTOR, CHECK_PROCESS_WORKERS, CHECK_PROCESS_STAGES, CHECK_PROCESS_CPUS
+from app.utils.resources import configure_threads, pin_to_cpus
+from app.verifier.image_context import ImageContext
+
+
+def call_timed(func, ctx, kwargs, max_side=None, submitted=None):
+    """
+    Run one stage at its working resolution; returns (result, elapsed_ms,
+    queue_ms), queue_ms being the wait since `submitted` (perf_counter,
+    which is system-wide on Linux, so it also holds for pool workers).
+    """
+    started = time.perf_counter()
+    result = func(ctx.at(max_side), **kwargs)
+    queue_ms = 0.0 if submitted is None else (started - submitted) * 1000
+    return result, (time.perf_counter() - started) * 1000, queue_ms
+
+
+class ThreadBackend:
+    """Every stage on the asyncio thread pool (the original behaviour)"""
+
+    name = "thread"
+
+    def shutdown(self):
+        pass
+
+    @asynccontextmanager
+    async def session(self, ctx):
+        yield _ThreadSession(ctx)
+
+
+class _ThreadSession:
+    def __init__(self, ctx):
+        self.ctx = ctx
+
+    async def call(self, stage, kwargs):
+        return await asyncio.to_thread(
+            call_timed, stage.func, self.ctx, kwargs, stage.max_side, time.perf_counter()
+        )
+
+
+class ProcessBackend:
+    """
+    Stages named in `stages` run on a persistent process pool, the rest on
+    threads. Workers preload the models they will need, and the decoded
+    frame reaches them through shared memory instead of being pickled.
+    """
+
+    name = "process"
+
+    def __init__(self, workers, stages, cpus=()):
+        self.workers = workers
+        self.stages = frozenset(stages)
+        self.cpus = tuple(cpus)
+        self._pool = None
+        self._lock = threading.Lock()
+
+    @property
+    def pool(self):
+        if self._pool is None:
+            with self._lock:
+                if self._pool is None:
+                    # spawn: forking a process that already runs torch /
+                    # MediaPipe threads is not safe
+                    self._pool = ProcessPoolExecutor(
+                        max_workers=self.workers,
+                        mp_context=multiprocessing.get_context("spawn"),
+                        initializer=_init_worker,
+                        initargs=(tuple(self.stages), self.cpus)
+                    )
+        return self._pool
+
+    def shutdown(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+    @asynccontextmanager
+    async def session(self, ctx):
+        session = _ProcessSession(self, ctx)
+        try:
+            yield session
+        finally:
+            session.close()
+
+
+class _ProcessSession:
+    """
+    One request's view of the process pool; owns the shared frames, one
+    per working resolution (stage max_side) the pool stages ask for
+    """
+
+    def __init__(self, backend, ctx):
+        self.backend = backend
+        self.ctx = ctx
+        self._shared = {}   # max_side -> (SharedMemory, spec), (None, None) if undecodable
+        self._share_lock = asyncio.Lock()
+
+    async def call(self, stage, kwargs):
+        spec = None
+        if stage.name in self.backend.stages:
+            async with self._share_lock:
+                if stage.max_side not in self._shared:
+                    # Decoding / resizing happens here, off the event loop
+                    self._shared[stage.max_side] = await asyncio.to_thread(self._share_view, stage.max_side)
+            spec = self._shared[stage.max_side][1]
+
+        if spec is None:
+            # Thread stage, or a frame that does not decode: checks then
+            # see the same None frames as on the thread backend
+            return await asyncio.to_thread(
+                call_timed, stage.func, self.ctx, kwargs, stage.max_side, time.perf_counter()
+            )
+
+        # The shared view is already at the stage's working resolution
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self.backend.pool, _run_in_worker, stage.func, spec, kwargs, time.perf_counter()
+        )
+
+    def _share_view(self, max_side):
+        frame = self.ctx.at(max_side).bgr
+        if frame is None:
+            return None, None
+        shm = shared_memory.SharedMemory(create=True, size=max(frame.nbytes, 1))
+        np.ndarray(frame.shape, frame.dtype, buffer=shm.buf)[...] = frame
+        return shm, (shm.name, frame.shape, frame.dtype.str)
+
+    def close(self):
+        # Unlinking only removes the name; a worker still running on the
+        # frame keeps its mapping until it detaches
+        for shm, _ in self._shared.values():
+            if shm is not None:
+                shm.close()
+                shm.unlink()
+        self._shared = {}
+
+
+def _run_in_worker(func, spec, kwargs, submitted):
+    name, shape, dtype = spec
+    shm = shared_memory.SharedMemory(name=name)
+    frame = None
+    try:
+        frame = np.ndarray(shape, np.dtype(dtype), buffer=shm.buf)
+        return call_timed(func, ImageContext.from_frame(frame), kwargs, None, submitted)
+    finally:
+        # Views into shm.buf must be gone before it can be closed
+        frame = None
+        shm.close()
+
+
+def _init_worker(stage_names, cpus):
+    # Same thread caps as the server process, then its own core set
+    configure_threads()
+    pin_to_cpus(cpus)
+    preload_stages(stage_names)
+
+
+def preload_stages(stage_names):
+    """Load the models and graphs needed by `stage_names` into this process"""
+    names = set(stage_names)
+
+    if names & {"faces", "face", "geometry"}:
+        from app.verifier.cascade_registry import get_cascade, FRONTAL_FACE
+        get_cascade(FRONTAL_FACE)
+
+    if "eyes" in names:
+        from app.verifier.cascade_registry import get_cascade, EYE
+        get_cascade(EYE)
+
+    if names & {"detections", "object_detector", "human_only"}:
+        from app.verifier.yolo_detector import _get_model
+        _get_model()
+
+    if names & {"ocr_data", "text"}:
+        from app.verifier.ocr_engine import get_backend
+        get_backend()
+
+    if names & {"face_landmarks", "pose"}:
+        from app.verifier.pose_checker import FACE_MESH_POOL
+        FACE_MESH_POOL.fill(1)
+
+    if names & {"hand_landmarks", "hands"}:
+        from app.verifier.hand_detector import HANDS_POOL
+        HANDS_POOL.fill(1)
+
+
+def make_backend():
+    """Execution backend selected by CHECK_EXECUTOR"""
+    if CHECK_EXECUTOR == "process":
+        return ProcessBackend(CHECK_PROCESS_WORKERS, CHECK_PROCESS_STAGES, CHECK_PROCESS_CPUS)
+    return ThreadBackend()
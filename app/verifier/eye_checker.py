@@ -1,9 +1,15 @@
 import cv2, numpy as np
 
+from app.verifier.image_context import as_image_context
+from app.verifier.cascade_registry import get_cascade, EYE
+
+
 def check_eyes(image_bytes):
-    img = cv2.imdecode(np.frombuffer(image_bytes, np.uint8), cv2.IMREAD_GRAYSCALE)
-    eye_cascade = cv2.CascadeClassifier(
-        cv2.data.haarcascades + "haarcascade_eye.xml"
-    )
+    return check_eyes_ctx(as_image_context(image_bytes))
+
+
+def check_eyes_ctx(ctx):
+    img = ctx.gray
+    eye_cascade = get_cascade(EYE)
     eyes = eye_cascade.detectMultiScale(img)
     return {"eyes_detected": len(eyes) >= 2}
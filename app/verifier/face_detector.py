@@ -1,13 +1,22 @@
 import cv2, numpy as np
 
+from app.verifier.image_context import as_image_context
+from app.verifier.cascade_registry import get_cascade, FRONTAL_FACE
+
+
 def detect_face(image_bytes):
-    img = cv2.imdecode(np.frombuffer(image_bytes, np.uint8), cv2.IMREAD_COLOR)
-    gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+    return detect_face_ctx(as_image_context(image_bytes))
+
+
+def find_faces(ctx):
+    """Haar frontal-face boxes (x, y, w, h) on the shared gray frame"""
+    face_cascade = get_cascade(FRONTAL_FACE)
+    return face_cascade.detectMultiScale(ctx.gray, 1.3, 5)
+
 
-    face_cascade = cv2.CascadeClassifier(
-        cv2.data.haarcascades + "haarcascade_frontalface_default.xml"
-    )
-    faces = face_cascade.detectMultiScale(gray, 1.3, 5)
+def detect_face_ctx(ctx, faces=None):
+    if faces is None:
+        faces = find_faces(ctx)
 
     return {
         "face_detected": len(faces) == 1,
@@ -1,13 +1,19 @@
 import cv2, numpy as np
 
+from app.verifier.image_context import as_image_context
+from app.verifier.face_detector import find_faces
+
+
 def check_face_geometry(image_bytes):
-    img = cv2.imdecode(np.frombuffer(image_bytes, np.uint8), cv2.IMREAD_COLOR)
-    gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+    return check_face_geometry_ctx(as_image_context(image_bytes))
+
+
+def check_face_geometry_ctx(ctx, faces=None):
+    img = ctx.bgr
 
-    face_cascade = cv2.CascadeClassifier(
-        cv2.data.haarcascades + "haarcascade_frontalface_default.xml"
-    )
-    faces = face_cascade.detectMultiScale(gray, 1.3, 5)
+    # Reuse the face boxes from detect_face when the pipeline provides them
+    if faces is None:
+        faces = find_faces(ctx)
 
     if len(faces) != 1:
         return {"geometry_ok": False}
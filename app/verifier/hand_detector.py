@@ -2,8 +2,25 @@ import cv2
 import numpy as np
 import mediapipe as mp
 
+from app.config import MP_POOL_SIZE
+from app.verifier.image_context import as_image_context
+from app.verifier.mp_pool import SolutionPool
+
 mp_hands = mp.solutions.hands
 
+
+def make_hands(static_image_mode=True):
+    """Hands graph; static_image_mode=False tracks hands across stream frames"""
+    return mp_hands.Hands(
+        static_image_mode=static_image_mode,
+        max_num_hands=2,
+        min_detection_confidence=0.5,
+        min_tracking_confidence=0.5
+    )
+
+
+HANDS_POOL = SolutionPool("hands", make_hands, MP_POOL_SIZE)
+
 def check_hands(image_bytes):
     """
     Check if hands are visible or holding objects.
@@ -23,37 +40,49 @@ def check_hands(image_bytes):
             "reason": str
         }
     """
-    
+    return check_hands_ctx(as_image_context(image_bytes))
+
+
+def find_hand_landmarks(ctx):
+    """Normalized (x, y, z) landmark arrays, one per detected hand"""
+    with HANDS_POOL.checkout() as hands:
+        return hand_landmarks_with(hands, ctx)
+
+
+def hand_landmarks_with(hands, ctx):
+    """find_hand_landmarks on a given Hands graph"""
+    results = hands.process(ctx.rgb)
+
+    if not results.multi_hand_landmarks:
+        return []
+
+    return [
+        np.array([(lm.x, lm.y, lm.z) for lm in hand_landmarks.landmark])
+        for hand_landmarks in results.multi_hand_landmarks
+    ]
+
+
+def check_hands_ctx(ctx, hand_landmarks=None):
+    """Same as check_hands, on a shared ImageContext"""
     try:
-        # Decode image
-        img = cv2.imdecode(np.frombuffer(image_bytes, np.uint8), cv2.IMREAD_COLOR)
+        # Shared decoded frame
+        img = ctx.bgr
         if img is None:
             return _fail("Image decode failed")
         
-        h, w = img.shape[:2]
-        rgb = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
+        # Detect hands (unless the pipeline already did)
+        if hand_landmarks is None:
+            hand_landmarks = find_hand_landmarks(ctx)
         
-        # Detect hands
-        with mp_hands.Hands(
-            static_image_mode=True,
-            max_num_hands=2,
-            min_detection_confidence=0.5,
-            min_tracking_confidence=0.5
-        ) as hands:
-            results = hands.process(rgb)
-        
-        if not results.multi_hand_landmarks:
+        if not hand_landmarks:
             return _pass("No hands detected")
         
         # Check hand positions
         hand_positions = []
-        for hand_landmarks in results.multi_hand_landmarks:
+        for landmarks in hand_landmarks:
             # Get hand bounding box
-            x_coords = [lm.x for lm in hand_landmarks.landmark]
-            y_coords = [lm.y for lm in hand_landmarks.landmark]
-            
-            hand_x_min, hand_x_max = min(x_coords), max(x_coords)
-            hand_y_min, hand_y_max = min(y_coords), max(y_coords)
+            hand_x_min, hand_y_min = landmarks[:, :2].min(axis=0)
+            hand_x_max, hand_y_max = landmarks[:, :2].max(axis=0)
             
             # Face region typically in center-upper area
             face_region_x = (0.25, 0.75)
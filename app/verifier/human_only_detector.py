@@ -1,54 +1,32 @@
 import cv2
 import numpy as np
 
-# Lazy load model (to avoid numpy/torch initialization issues)
-MODEL = None
-ALLOWED_CLASS = "person"
-
+from app.verifier.image_context import as_image_context
+from app.verifier.yolo_detector import detect_objects
 
-def _get_model():
-    """Lazy load YOLO model on first use"""
-    global MODEL
-    if MODEL is None:
-        from ultralytics import YOLO
-        try:
-            MODEL = YOLO("yolov8n.pt")  # object detection only (lighter than seg)
-        except Exception as e:
-            print(f"ERROR loading YOLO model: {e}")
-            raise
-    return MODEL
+ALLOWED_CLASS = "person"
 
 
 def check_human_only(image_bytes, conf_threshold=0.4):
     """
     FAIL if any object other than 'person' is detected
     """
+    return check_human_only_ctx(as_image_context(image_bytes), conf_threshold)
+
 
-    print( "Running human-only detection..." )
+def check_human_only_ctx(ctx, conf_threshold=0.4, detections=None):
+    """Same as check_human_only, on a shared ImageContext"""
 
-    img = cv2.imdecode(np.frombuffer(image_bytes, np.uint8), cv2.IMREAD_COLOR)
+    img = ctx.bgr
     if img is None:
         return _fail("Image decode failed")
 
-    model = _get_model()
-    results = model.predict(
-        source=img,
-        conf=conf_threshold,
-        device="cpu",
-        verbose=False
-    )[0]
-
-    detected = []
-    person_count = 0
-
-    for cls in results.boxes.cls:
-        class_name = model.names[int(cls)]
-        detected.append(class_name)
-
-        if class_name == "person":
-            person_count += 1
+    # Shares the YOLO pass with the object detector when run in the pipeline
+    if detections is None:
+        detections = detect_objects(ctx, conf_threshold)
 
-    non_human_objects = [x for x in detected if x != ALLOWED_CLASS]
+    person_count = detections.person_count
+    non_human_objects = [x for x in detections.names if x != ALLOWED_CLASS]
 
     if person_count != 1:
         return _fail(f"Invalid number of persons detected: {person_count}")
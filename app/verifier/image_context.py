@@ -0,0 +1,192 @@
+import io
+import threading
+import time
+
+import cv2
+import numpy as np
+from PIL import Image
+
+from app.utils.image_header import probe_header
+from app.utils.metrics import DECODE_SECONDS
+
+# DCT-domain reduced JPEG decoding (other formats are resized by OpenCV)
+_REDUCED_DECODE = ((8, cv2.IMREAD_REDUCED_COLOR_8), (4, cv2.IMREAD_REDUCED_COLOR_4), (2, cv2.IMREAD_REDUCED_COLOR_2))
+
+
+class ImageContext:
+    """
+    Immutable view of one uploaded image, shared by all checkers.
+
+    The raw bytes are decoded at most once; the BGR, gray and RGB frames
+    are computed lazily on first access and cached. Returned arrays are
+    read-only so one checker cannot corrupt the frame seen by another.
+
+    at(max_side) serves checks that need less than full resolution from a
+    cached pyramid of smaller contexts, using reduced JPEG decoding when
+    the full frame has not been decoded.
+    """
+
+    __slots__ = ("_data", "_size", "_lock", "_bgr", "_gray", "_rgb", "_decoded", "_views", "_view_lock")
+
+    def __init__(self, data, size=None):
+        # `size`: (width, height) if already known from the upload header
+        object.__setattr__(self, "_data", data)
+        object.__setattr__(self, "_size", size)
+        object.__setattr__(self, "_lock", threading.Lock())
+        object.__setattr__(self, "_bgr", None)
+        object.__setattr__(self, "_gray", None)
+        object.__setattr__(self, "_rgb", None)
+        object.__setattr__(self, "_decoded", False)
+        object.__setattr__(self, "_views", {})
+        object.__setattr__(self, "_view_lock", threading.Lock())
+
+    @classmethod
+    def from_frame(cls, bgr, data=None):
+        """Wrap an already decoded BGR frame (e.g. a shared-memory view)"""
+        ctx = cls(data)
+        object.__setattr__(ctx, "_bgr", _freeze(bgr))
+        object.__setattr__(ctx, "_decoded", True)
+        return ctx
+
+    def __setattr__(self, name, value):
+        raise AttributeError("ImageContext is immutable")
+
+    @property
+    def data(self):
+        """Original encoded image bytes"""
+        return self._data
+
+    @property
+    def bgr(self):
+        """Decoded colour frame (BGR), or None if the bytes are not an image"""
+        if not self._decoded:
+            with self._lock:
+                if not self._decoded:
+                    started = time.perf_counter()
+                    img = cv2.imdecode(np.frombuffer(self._data, np.uint8), cv2.IMREAD_COLOR)
+                    DECODE_SECONDS.labels("full").observe(time.perf_counter() - started)
+                    object.__setattr__(self, "_bgr", _freeze(img))
+                    object.__setattr__(self, "_decoded", True)
+        return self._bgr
+
+    @property
+    def gray(self):
+        """Grayscale frame, or None if decode failed"""
+        if self._gray is None:
+            bgr = self.bgr
+            if bgr is None:
+                return None
+            with self._lock:
+                if self._gray is None:
+                    gray = cv2.cvtColor(bgr, cv2.COLOR_BGR2GRAY)
+                    object.__setattr__(self, "_gray", _freeze(gray))
+        return self._gray
+
+    @property
+    def rgb(self):
+        """RGB frame (MediaPipe input), or None if decode failed"""
+        if self._rgb is None:
+            bgr = self.bgr
+            if bgr is None:
+                return None
+            with self._lock:
+                if self._rgb is None:
+                    rgb = cv2.cvtColor(bgr, cv2.COLOR_BGR2RGB)
+                    object.__setattr__(self, "_rgb", _freeze(rgb))
+        return self._rgb
+
+    def warm(self):
+        """Decode and build the gray view up front (e.g. off the event loop)"""
+        self.gray
+        return self
+
+    @property
+    def shape(self):
+        """(height, width) of the decoded frame, or None if decode failed"""
+        bgr = self.bgr
+        return None if bgr is None else bgr.shape[:2]
+
+    def at(self, max_side):
+        """
+        Context whose long side is at most `max_side` pixels (None: full
+        resolution). Smaller views are built once and cached.
+        """
+        if max_side is None:
+            return self
+
+        long_side = self._long_side()
+        if long_side is None or long_side <= max_side:
+            return self
+
+        with self._view_lock:
+            view = self._views.get(max_side)
+            if view is None:
+                frame = self._build_view(max_side, long_side)
+                if frame is None:
+                    # Undecodable: checks see the same None frames as before
+                    return self
+                view = ImageContext.from_frame(frame, self._data)
+                self._views[max_side] = view
+        return view
+
+    def _long_side(self):
+        if self._decoded:
+            return None if self._bgr is None else max(self._bgr.shape[:2])
+        if self._size is not None:
+            return max(self._size)
+        if self._data is None:
+            return None
+        # Header only; EXIF rotation swaps width/height, not the long side
+        try:
+            header = probe_header(self._data)
+            if header is not None:
+                return max(header.size)
+        except ValueError:
+            pass
+        try:
+            with Image.open(io.BytesIO(self._data)) as im:
+                return max(im.size)
+        except Exception:
+            return None
+
+    def _build_view(self, max_side, long_side):
+        # Smallest source that still covers max_side: a cached larger
+        # view, the full frame if already decoded, or a reduced decode
+        sources = [v.bgr for side, v in self._views.items() if side > max_side]
+        if self._decoded:
+            sources.append(self._bgr)
+        else:
+            for factor, flag in _REDUCED_DECODE:
+                if long_side // factor >= max_side:
+                    started = time.perf_counter()
+                    reduced = cv2.imdecode(np.frombuffer(self._data, np.uint8), flag)
+                    DECODE_SECONDS.labels("reduced").observe(time.perf_counter() - started)
+                    if reduced is not None:
+                        sources.append(reduced)
+                    break
+            if not sources:
+                sources.append(self.bgr)
+
+        sources = [f for f in sources if f is not None]
+        if not sources:
+            return None
+
+        src = min(sources, key=lambda f: max(f.shape[:2]))
+        h, w = src.shape[:2]
+        scale = max_side / max(h, w)
+        if scale >= 1:
+            return src
+        return cv2.resize(src, (max(1, round(w * scale)), max(1, round(h * scale))), interpolation=cv2.INTER_AREA)
+
+
+def as_image_context(image):
+    """Accept either raw bytes or an existing ImageContext"""
+    if isinstance(image, ImageContext):
+        return image
+    return ImageContext(image)
+
+
+def _freeze(arr):
+    if arr is not None:
+        arr.setflags(write=False)
+    return arr
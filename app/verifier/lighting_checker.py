@@ -1,7 +1,14 @@
 import cv2, numpy as np
 
+from app.verifier.image_context import as_image_context
+
+
 def check_lighting(image_bytes):
-    img = cv2.imdecode(np.frombuffer(image_bytes, np.uint8), cv2.IMREAD_GRAYSCALE)
+    return check_lighting_ctx(as_image_context(image_bytes))
+
+
+def check_lighting_ctx(ctx):
+    img = ctx.gray
     brightness = np.mean(img)
 
     if brightness < 70:
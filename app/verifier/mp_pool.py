@@ -0,0 +1,128 @@
+import queue
+import threading
+import time
+from contextlib import contextmanager
+
+# name -> SolutionPool, for stats
+_POOLS = {}
+
+
+class SolutionPool:
+    """
+    Bounded pool of MediaPipe solution objects (FaceMesh, Hands, ...).
+
+    Graphs are created lazily up to `size` and checked out exclusively,
+    so no two threads ever call process() on the same graph. A graph
+    that raises is closed and replaced instead of being returned.
+    """
+
+    def __init__(self, name, factory, size):
+        if size < 1:
+            raise ValueError("Pool size must be at least 1")
+        self.name = name
+        self.size = size
+        self._factory = factory
+        self._idle = queue.LifoQueue()
+        self._lock = threading.Lock()
+        self._created = 0
+        self._stats = {
+            "checkouts": 0,
+            "exhausted": 0,       # checkouts that had to wait for a graph
+            "wait_seconds": 0.0,
+            "max_wait_seconds": 0.0,
+            "errors": 0,          # graphs discarded after an exception
+        }
+        _POOLS[name] = self
+
+    def _acquire(self):
+        """Return (solution, seconds spent waiting on an exhausted pool)"""
+        waited = 0.0
+        while True:
+            try:
+                return self._idle.get_nowait(), waited
+            except queue.Empty:
+                pass
+
+            with self._lock:
+                create = self._created < self.size
+                if create:
+                    self._created += 1
+
+            if create:
+                try:
+                    return self._factory(), waited
+                except Exception:
+                    with self._lock:
+                        self._created -= 1
+                    raise
+
+            # Pool exhausted: wait for a graph to come back. The timeout
+            # lets waiters notice capacity freed by a discarded graph.
+            started = time.perf_counter()
+            try:
+                solution = self._idle.get(timeout=0.1)
+            except queue.Empty:
+                solution = None
+            waited += time.perf_counter() - started
+            if solution is not None:
+                return solution, waited
+
+    def _discard(self, solution):
+        with self._lock:
+            self._created -= 1
+            self._stats["errors"] += 1
+        try:
+            solution.close()
+        except Exception:
+            pass
+
+    def fill(self, count=None):
+        """Pre-initialize graphs (up to `count`, default the full pool size)"""
+        target = self.size if count is None else min(count, self.size)
+        while True:
+            with self._lock:
+                if self._created >= target:
+                    return
+                self._created += 1
+            try:
+                self._idle.put(self._factory())
+            except Exception:
+                with self._lock:
+                    self._created -= 1
+                raise
+
+    @contextmanager
+    def checkout(self):
+        solution, wait = self._acquire()
+
+        with self._lock:
+            self._stats["checkouts"] += 1
+            self._stats["wait_seconds"] += wait
+            self._stats["max_wait_seconds"] = max(self._stats["max_wait_seconds"], wait)
+            if wait > 0:
+                self._stats["exhausted"] += 1
+
+        try:
+            yield solution
+        except BaseException:
+            # Graph state is unknown after a failure; rebuild lazily
+            self._discard(solution)
+            raise
+        else:
+            self._idle.put(solution)
+
+    def stats(self):
+        with self._lock:
+            return {
+                **self._stats,
+                "wait_seconds": round(self._stats["wait_seconds"], 6),
+                "max_wait_seconds": round(self._stats["max_wait_seconds"], 6),
+                "size": self.size,
+                "created": self._created,
+                "idle": self._idle.qsize(),
+            }
+
+
+def pool_stats():
+    """Stats for every MediaPipe pool in this process"""
+    return {name: pool.stats() for name, pool in _POOLS.items()}
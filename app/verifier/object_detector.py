@@ -1,28 +1,18 @@
 import cv2
 import numpy as np
 
-# Lazy load model (to avoid numpy/torch initialization issues)
-MODEL = None
-
-
-def _get_model():
-    """Lazy load YOLO model on first use"""
-    global MODEL
-    if MODEL is None:
-        from ultralytics import YOLO
-        try:
-            MODEL = YOLO("yolov8n-seg.pt")  # nano = CPU optimized
-        except Exception as e:
-            print(f"ERROR loading YOLO model: {e}")
-            raise
-    return MODEL
+from app.verifier.image_context import as_image_context
+from app.verifier.yolo_detector import detect_objects
 
 
 def check_non_human_object_yolo(image_bytes,
                                 conf_threshold: float = 0.4,
                                 min_object_area_ratio: float = 0.005):
     """
-    Detect whether any non-human object is present using YOLOv8 segmentation.
+    Detect whether any non-human object is present using YOLOv8.
+
+    Objects are filtered by mask area (segmentation model) or box area,
+    depending on YOLO_AREA_FILTER.
 
     Args:
         image_bytes: image in bytes
@@ -37,47 +27,42 @@ def check_non_human_object_yolo(image_bytes,
             "reason": str
         }
     """
+    return check_non_human_object_yolo_ctx(
+        as_image_context(image_bytes), conf_threshold, min_object_area_ratio
+    )
+
 
+def check_non_human_object_yolo_ctx(ctx,
+                                    conf_threshold: float = 0.4,
+                                    min_object_area_ratio: float = 0.005,
+                                    detections=None):
+    """Same as check_non_human_object_yolo, on a shared ImageContext"""
     try:
-        # Decode image
-        img = cv2.imdecode(np.frombuffer(image_bytes, np.uint8), cv2.IMREAD_COLOR)
+        # Shared decoded frame
+        img = ctx.bgr
         if img is None:
             return _fail("Image decode failed")
 
-        h, w = img.shape[:2]
-        img_area = h * w
+        # YOLO inference (CPU), unless the pipeline already ran it
+        if detections is None:
+            detections = detect_objects(ctx, conf_threshold)
 
-        # YOLO inference (CPU)
-        model = _get_model()
-        results = model.predict(
-            source=img,
-            conf=conf_threshold,
-            device="cpu",
-            verbose=False
-        )[0]
-
-        if results.masks is None:
+        if len(detections) == 0:
             return _pass("No objects detected")
 
         detected_objects = []
 
-        for box, cls, mask in zip(
-            results.boxes.xyxy,
-            results.boxes.cls,
-            results.masks.data
-        ):
-            class_id = int(cls)
-            class_name = MODEL.names[class_id]
-
+        for i, class_name in enumerate(detections.names):
             # Ignore humans
             if class_name == "person":
                 continue
 
-            # Area filtering
-            mask_np = mask.cpu().numpy()
-            obj_area = np.sum(mask_np > 0)
+            # Area filtering; a mask never exceeds its box, so small
+            # boxes are rejected without touching the mask
+            if detections.box_area_ratio(i) < min_object_area_ratio:
+                continue
 
-            if obj_area / img_area < min_object_area_ratio:
+            if detections.area_ratio(i) < min_object_area_ratio:
                 continue
 
             detected_objects.append(class_name)
@@ -0,0 +1,200 @@
+import threading
+
+import cv2
+import numpy as np
+from PIL import Image
+
+from app.config import OCR_BACKEND, OCR_PREFILTER, OCR_MAX_REGIONS
+
+# Prefilter works on a downscaled frame; text lines shorter than
+# MIN_LINE_HEIGHT pixels there are too small to matter for the area check
+PREFILTER_SIDE = 1024
+MIN_LINE_HEIGHT = 4
+REGION_PADDING = 8
+# Above this share of the frame, cropping saves nothing: OCR everything
+MAX_REGION_COVERAGE = 0.5
+
+_EMPTY_KEYS = ("text", "conf", "left", "top", "width", "height")
+
+
+def _empty_data():
+    return {key: [] for key in _EMPTY_KEYS}
+
+
+class PytesseractBackend:
+    """Spawns the tesseract CLI per call (the original behaviour)"""
+
+    name = "pytesseract"
+    # A process per call: one crop around all regions is cheaper than one per region
+    max_regions = 1
+
+    def __init__(self):
+        import pytesseract
+        self._pytesseract = pytesseract
+
+    def image_to_data(self, gray):
+        return self._pytesseract.image_to_data(gray, output_type=self._pytesseract.Output.DICT)
+
+
+class TesserocrBackend:
+    """
+    In-process Tesseract API via tesserocr: one long-lived handle per
+    thread, so no process spawn, temp file or TSV parsing per call.
+    """
+
+    name = "tesserocr"
+    max_regions = OCR_MAX_REGIONS
+
+    def __init__(self, lang="eng"):
+        import tesserocr
+        self._tesserocr = tesserocr
+        self._lang = lang
+        self._local = threading.local()
+
+    def _api(self):
+        api = getattr(self._local, "api", None)
+        if api is None:
+            api = self._tesserocr.PyTessBaseAPI(lang=self._lang)
+            self._local.api = api
+        return api
+
+    def image_to_data(self, gray):
+        tesserocr = self._tesserocr
+        api = self._api()
+        api.SetImage(Image.fromarray(gray))
+        api.Recognize()
+
+        data = _empty_data()
+        iterator = api.GetIterator()
+        if iterator is None:
+            return data
+
+        level = tesserocr.RIL.WORD
+        for word in tesserocr.iterate_level(iterator, level):
+            text = word.GetUTF8Text(level)
+            box = word.BoundingBox(level)
+            if text is None or box is None:
+                continue
+            x1, y1, x2, y2 = box
+            data["text"].append(text)
+            data["conf"].append(word.Confidence(level))
+            data["left"].append(x1)
+            data["top"].append(y1)
+            data["width"].append(x2 - x1)
+            data["height"].append(y2 - y1)
+        return data
+
+
+_BACKEND = None
+_BACKEND_LOCK = threading.Lock()
+
+
+def get_backend():
+    """OCR backend selected by OCR_BACKEND ("auto" prefers tesserocr)"""
+    global _BACKEND
+    if _BACKEND is None:
+        with _BACKEND_LOCK:
+            if _BACKEND is None:
+                if OCR_BACKEND == "tesserocr":
+                    _BACKEND = TesserocrBackend()
+                elif OCR_BACKEND == "pytesseract":
+                    _BACKEND = PytesseractBackend()
+                else:
+                    try:
+                        _BACKEND = TesserocrBackend()
+                    except ImportError:
+                        _BACKEND = PytesseractBackend()
+    return _BACKEND
+
+
+def find_text_regions(gray):
+    """
+    Cheap text-likelihood prefilter: boxes (x, y, w, h) in full-frame
+    pixels around line-like clusters of strong gradients. An empty list
+    means no text-like structure at all.
+    """
+    h, w = gray.shape[:2]
+    scale = min(1.0, PREFILTER_SIDE / max(h, w))
+    small = gray if scale == 1.0 else cv2.resize(gray, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+
+    # Character strokes: strong local gradient, bridged horizontally into lines
+    grad = cv2.morphologyEx(small, cv2.MORPH_GRADIENT, cv2.getStructuringElement(cv2.MORPH_ELLIPSE, (3, 3)))
+    _, bw = cv2.threshold(grad, 0, 255, cv2.THRESH_BINARY | cv2.THRESH_OTSU)
+    lines = cv2.morphologyEx(bw, cv2.MORPH_CLOSE, cv2.getStructuringElement(cv2.MORPH_RECT, (9, 1)))
+    contours, _ = cv2.findContours(lines, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+
+    sh, sw = small.shape[:2]
+    regions = []
+    for contour in contours:
+        x, y, cw, ch = cv2.boundingRect(contour)
+        if ch < MIN_LINE_HEIGHT or ch > sh * 0.3 or cw < ch:
+            continue
+        # Text lines are dense in stroke pixels
+        if cv2.countNonZero(bw[y:y + ch, x:x + cw]) / float(cw * ch) < 0.3:
+            continue
+
+        pad = REGION_PADDING
+        x0 = max(0, int(x / scale) - pad)
+        y0 = max(0, int(y / scale) - pad)
+        x1 = min(w, int((x + cw) / scale) + pad)
+        y1 = min(h, int((y + ch) / scale) + pad)
+        regions.append((x0, y0, x1 - x0, y1 - y0))
+
+    return _merge_overlapping(regions)
+
+
+def _merge_overlapping(regions):
+    merged = []
+    for box in sorted(regions):
+        x, y, w, h = box
+        for i, (mx, my, mw, mh) in enumerate(merged):
+            if x <= mx + mw and mx <= x + w and y <= my + mh and my <= y + h:
+                nx, ny = min(x, mx), min(y, my)
+                merged[i] = (nx, ny, max(x + w, mx + mw) - nx, max(y + h, my + mh) - ny)
+                break
+        else:
+            merged.append(box)
+    return merged
+
+
+def ocr_words(gray):
+    """
+    Word boxes for a gray frame, in pytesseract's image_to_data DICT
+    layout and full-frame coordinates.
+
+    With OCR_PREFILTER, frames without text-like regions skip OCR
+    entirely and otherwise only the candidate regions are recognized:
+    each on its own with tesserocr (up to OCR_MAX_REGIONS), as one
+    union crop with pytesseract.
+    """
+    backend = get_backend()
+    if not OCR_PREFILTER:
+        return backend.image_to_data(gray)
+
+    regions = find_text_regions(gray)
+    if not regions:
+        return _empty_data()
+
+    h, w = gray.shape[:2]
+    if len(regions) > backend.max_regions:
+        # Many small candidates: one crop around all of them
+        x0 = min(x for x, _, _, _ in regions)
+        y0 = min(y for _, y, _, _ in regions)
+        x1 = max(x + rw for x, _, rw, _ in regions)
+        y1 = max(y + rh for _, y, _, rh in regions)
+        regions = [(x0, y0, x1 - x0, y1 - y0)]
+
+    if sum(rw * rh for _, _, rw, rh in regions) > MAX_REGION_COVERAGE * h * w:
+        return backend.image_to_data(gray)
+
+    data = _empty_data()
+    for x, y, rw, rh in regions:
+        part = backend.image_to_data(np.ascontiguousarray(gray[y:y + rh, x:x + rw]))
+        for i in range(len(part["text"])):
+            data["text"].append(part["text"][i])
+            data["conf"].append(part["conf"][i])
+            data["left"].append(part["left"][i] + x)
+            data["top"].append(part["top"][i] + y)
+            data["width"].append(part["width"][i])
+            data["height"].append(part["height"][i])
+    return data
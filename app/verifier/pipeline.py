@@ -0,0 +1,246 @@
+import asyncio
+from dataclasses import dataclass, replace
+from typing import Callable
+
+from app.config import RESOLUTION_AWARE
+from app.utils.metrics import STAGE_SECONDS, QUEUE_WAIT_SECONDS
+from app.verifier.execution import make_backend
+from app.verifier.face_detector import find_faces, detect_face_ctx
+from app.verifier.eye_checker import check_eyes_ctx
+from app.verifier.quality_checker import check_quality_ctx
+from app.verifier.pose_checker import find_face_landmarks, check_head_pose_ctx
+from app.verifier.lighting_checker import check_lighting_ctx
+from app.verifier.background_checker import check_background_ctx
+from app.verifier.geometry_checker import check_face_geometry_ctx
+from app.verifier.text_checker import run_ocr, check_text_presence_ctx
+from app.verifier.yolo_detector import detect_objects
+from app.verifier.object_detector import check_non_human_object_yolo_ctx
+from app.verifier.human_only_detector import check_human_only_ctx
+from app.verifier.hand_detector import find_hand_landmarks, check_hands_ctx
+
+
+@dataclass(frozen=True)
+class Stage:
+    """
+    One node of the verification graph.
+
+    `func` is called as func(ctx, **{dep: result}) for every name in
+    `requires`, so dependency names double as keyword arguments.
+    Artifacts are shared intermediate results (face boxes, landmarks,
+    model outputs); checks produce the dicts passed to build_response.
+    `cost_ms` is the prior cost estimate used before any run is measured.
+    `max_side` caps the long side of the frame the stage sees (None: full
+    resolution). Stages exchanging pixel coordinates must share it.
+    """
+    name: str
+    func: Callable
+    requires: tuple = ()
+    artifact: bool = False
+    cost_ms: float = 1.0
+    max_side: int | None = None
+
+
+class CheckGraph:
+    """
+    Runs stages as soon as their inputs are ready, each at most once per
+    request. Independent branches run in parallel on the execution
+    backend (thread pool, or thread + process pool).
+    """
+
+    # Weight of the newest sample in the running cost estimate
+    COST_SMOOTHING = 0.2
+
+    def __init__(self, stages, backend=None, resolution_aware=True):
+        if not resolution_aware:
+            stages = [replace(s, max_side=None) for s in stages]
+        self.stages = {s.name: s for s in stages}
+        self._validate()
+        self._cost_ms = {s.name: s.cost_ms for s in stages}
+        self.backend = backend or make_backend()
+
+    def _validate(self):
+        for stage in self.stages.values():
+            for dep in stage.requires:
+                if dep not in self.stages:
+                    raise ValueError(f"Stage '{stage.name}' requires unknown stage '{dep}'")
+
+        # Reject cycles up front so scheduling can never deadlock
+        state = {}
+
+        def visit(name):
+            if state.get(name) == "done":
+                return
+            if state.get(name) == "visiting":
+                raise ValueError(f"Dependency cycle through stage '{name}'")
+            state[name] = "visiting"
+            for dep in self.stages[name].requires:
+                visit(dep)
+            state[name] = "done"
+
+        for name in self.stages:
+            visit(name)
+
+    async def run(self, ctx, targets, artifacts=None, timings=None):
+        """
+        Compute `targets` (and whatever they depend on); returns {name: result}.
+        `artifacts` pre-seeds stage results computed elsewhere (e.g. a
+        batched YOLO pass), so those stages are not run again. If given,
+        `timings` receives {stage: {"ms", "queue_ms"}} for every stage run.
+        """
+        tasks = {}
+        async with self.backend.session(ctx) as session:
+            schedule = self._scheduler(session, tasks, artifacts, timings)
+
+            try:
+                results = await asyncio.gather(*(schedule(name) for name in targets))
+            except BaseException:
+                for task in tasks.values():
+                    task.cancel()
+                raise
+
+        return dict(zip(targets, results))
+
+    async def run_until_decided(self, ctx, targets, decided, parallelism=4, artifacts=None, timings=None):
+        """
+        Cheap-first run that stops once `decided(results, remaining)` is true.
+
+        Targets start in order of estimated cost (own cost plus the
+        artifacts they need), at most `parallelism` at a time. Returns
+        (results, skipped) where `skipped` lists targets that were never
+        finished. Work already handed to a thread cannot be interrupted;
+        it finishes in the background and its result is dropped.
+        """
+        order = sorted(targets, key=self.estimated_cost_ms)
+        tasks = {}
+        running = {}
+        results = {}
+
+        async with self.backend.session(ctx) as session:
+            schedule = self._scheduler(session, tasks, artifacts, timings)
+
+            try:
+                while order or running:
+                    while order and len(running) < parallelism:
+                        name = order.pop(0)
+                        running[schedule(name)] = name
+
+                    done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+                    for task in done:
+                        results[running.pop(task)] = task.result()
+
+                    if decided(results, order + list(running.values())):
+                        break
+            finally:
+                for task in tasks.values():
+                    task.cancel()
+
+        skipped = [name for name in targets if name not in results]
+        return results, skipped
+
+    def _scheduler(self, session, tasks, artifacts, timings=None):
+        """Return schedule(name): the (memoized) task producing a stage's result"""
+        loop = asyncio.get_running_loop()
+        for name, value in (artifacts or {}).items():
+            future = loop.create_future()
+            future.set_result(value)
+            tasks[name] = future
+
+        def schedule(name):
+            if name not in tasks:
+                tasks[name] = asyncio.ensure_future(
+                    self._run_stage(self.stages[name], session, schedule, timings)
+                )
+            return tasks[name]
+
+        return schedule
+
+    def dependencies(self, targets):
+        """Names of `targets` and every stage they depend on"""
+        seen = set()
+        pending = list(targets)
+        while pending:
+            name = pending.pop()
+            if name in seen:
+                continue
+            seen.add(name)
+            pending.extend(self.stages[name].requires)
+        return seen
+
+    def needs_full_frame(self, targets):
+        """Whether any stage behind `targets` works at full resolution"""
+        return any(self.stages[name].max_side is None for name in self.dependencies(targets))
+
+    def estimated_cost_ms(self, name):
+        """Measured cost of a stage plus everything it depends on"""
+        stage = self.stages[name]
+        return self._cost_ms[name] + sum(self.estimated_cost_ms(dep) for dep in stage.requires)
+
+    def cost_estimates(self):
+        return {name: round(cost, 3) for name, cost in self._cost_ms.items()}
+
+    def reset_costs(self):
+        """Drop measured costs, e.g. after an unrepresentative warm-up run"""
+        self._cost_ms = {name: stage.cost_ms for name, stage in self.stages.items()}
+
+    async def _run_stage(self, stage, session, schedule, timings=None):
+        deps = await asyncio.gather(*(schedule(dep) for dep in stage.requires))
+        kwargs = dict(zip(stage.requires, deps))
+
+        try:
+            result, elapsed_ms, queue_ms = await session.call(stage, kwargs)
+        except Exception as e:
+            if not stage.artifact:
+                raise
+            # Dependents receive None and recompute inside their own error
+            # handling, so a failed artifact fails each check the same way
+            # it would have standalone.
+            print(f"Artifact '{stage.name}' failed: {e}")
+            return None
+
+        a = self.COST_SMOOTHING
+        self._cost_ms[stage.name] = (1 - a) * self._cost_ms[stage.name] + a * elapsed_ms
+
+        STAGE_SECONDS.labels(stage.name).observe(elapsed_ms / 1000)
+        QUEUE_WAIT_SECONDS.labels(stage.name).observe(queue_ms / 1000)
+        if timings is not None:
+            timings[stage.name] = {"ms": round(elapsed_ms, 2), "queue_ms": round(queue_ms, 2)}
+        return result
+
+
+# Every check the graph can run (a profile selects a subset)
+CHECK_ORDER = (
+    "face", "eyes", "quality", "pose", "lighting", "background",
+    "geometry", "text", "object_detector", "human_only", "hands"
+)
+
+# cost_ms priors are rough single-core timings on a 12 MP upload; they
+# are replaced by measured costs as requests run.
+#
+# max_side: Haar cascades, MediaPipe (192-256 px input) and YOLO (640 px
+# input) lose nothing at these sizes, and the mean brightness barely
+# moves. Blur (Laplacian variance), edge ratio and OCR depend on pixel
+# scale, so they stay at full resolution.
+# scripts/compare_resolution.py checks verdict agreement on a local set.
+STAGES = [
+    # Shared artifacts
+    Stage("faces", find_faces, artifact=True, cost_ms=60, max_side=1280),
+    Stage("face_landmarks", find_face_landmarks, artifact=True, cost_ms=40, max_side=960),
+    Stage("hand_landmarks", find_hand_landmarks, artifact=True, cost_ms=40, max_side=960),
+    Stage("ocr_data", run_ocr, artifact=True, cost_ms=1500),
+    Stage("detections", detect_objects, artifact=True, cost_ms=800, max_side=1280),
+
+    # Checks
+    Stage("face", detect_face_ctx, requires=("faces",), max_side=1280),
+    Stage("eyes", check_eyes_ctx, cost_ms=80, max_side=1600),
+    Stage("quality", check_quality_ctx, cost_ms=15),
+    Stage("pose", check_head_pose_ctx, requires=("face_landmarks",), max_side=960),
+    Stage("lighting", check_lighting_ctx, cost_ms=2, max_side=512),
+    Stage("background", check_background_ctx, cost_ms=15),
+    Stage("geometry", check_face_geometry_ctx, requires=("faces",), max_side=1280),
+    Stage("text", check_text_presence_ctx, requires=("ocr_data",)),
+    Stage("object_detector", check_non_human_object_yolo_ctx, requires=("detections",), max_side=1280),
+    Stage("human_only", check_human_only_ctx, requires=("detections",), max_side=1280),
+    Stage("hands", check_hands_ctx, requires=("hand_landmarks",), max_side=960),
+]
+
+VERIFICATION_GRAPH = CheckGraph(STAGES, resolution_aware=RESOLUTION_AWARE)
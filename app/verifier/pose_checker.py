@@ -1,16 +1,52 @@
 import cv2, mediapipe as mp, numpy as np
 
+from app.config import MP_POOL_SIZE
+from app.verifier.image_context import as_image_context
+from app.verifier.mp_pool import SolutionPool
+
 mp_face_mesh = mp.solutions.face_mesh
 
+
+def make_face_mesh(static_image_mode=True):
+    """
+    FaceMesh graph. static_image_mode=False tracks landmarks across the
+    consecutive frames of one stream instead of detecting on each frame.
+    """
+    return mp_face_mesh.FaceMesh(static_image_mode=static_image_mode)
+
+
+FACE_MESH_POOL = SolutionPool("face_mesh", make_face_mesh, MP_POOL_SIZE)
+
+
 def check_head_pose(image_bytes):
-    img = cv2.imdecode(np.frombuffer(image_bytes, np.uint8), cv2.IMREAD_COLOR)
-    rgb = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
+    return check_head_pose_ctx(as_image_context(image_bytes))
+
+
+def find_face_landmarks(ctx):
+    """FaceMesh landmarks (x, y, z) of the first face; empty if no face"""
+    with FACE_MESH_POOL.checkout() as fm:
+        return face_landmarks_with(fm, ctx)
+
+
+def face_landmarks_with(fm, ctx):
+    """find_face_landmarks on a given FaceMesh graph"""
+    res = fm.process(ctx.rgb)
+
+    if not res.multi_face_landmarks:
+        return np.empty((0, 3))
+
+    return np.array(
+        [(p.x, p.y, p.z) for p in res.multi_face_landmarks[0].landmark]
+    )
+
+
+def check_head_pose_ctx(ctx, face_landmarks=None):
+    if face_landmarks is None:
+        face_landmarks = find_face_landmarks(ctx)
 
-    with mp_face_mesh.FaceMesh(static_image_mode=True) as fm:
-        res = fm.process(rgb)
-        if not res.multi_face_landmarks:
-            return {"head_pose": "unknown"}
+    if len(face_landmarks) == 0:
+        return {"head_pose": "unknown"}
 
-        lm = res.multi_face_landmarks[0].landmark
-        yaw = lm[263].x - lm[33].x
-        return {"head_pose": "frontal" if abs(yaw) < 0.03 else "turned"}
+    lm = face_landmarks
+    yaw = lm[263, 0] - lm[33, 0]
+    return {"head_pose": "frontal" if abs(yaw) < 0.03 else "turned"}
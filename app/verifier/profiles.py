@@ -0,0 +1,89 @@
+from dataclasses import dataclass
+
+from app.config import CHECK_PROFILE, ADMISSION_DEGRADE_PROFILE
+from app.verifier.response_builder import PASS_RULES
+
+
+@dataclass(frozen=True)
+class Profile:
+    """
+    A named set of checks and the score needed to pass.
+
+    Only the checks listed here are run for a request using the profile;
+    the score is out of len(checks).
+    """
+    name: str
+    checks: tuple
+    passing_threshold: int
+    description: str = ""
+
+    @property
+    def max_score(self):
+        return len(self.checks)
+
+
+PROFILES = {p.name: p for p in (
+    Profile(
+        "fast",
+        ("face", "quality", "lighting", "geometry"),
+        passing_threshold=4,
+        description="Face, sharpness, lighting and framing only; no OCR, YOLO or MediaPipe"
+    ),
+    Profile(
+        "standard",
+        ("face", "eyes", "quality", "pose", "lighting", "background",
+         "geometry", "text", "object_detector", "human_only", "hands"),
+        passing_threshold=8,
+        description="Every check, 8 of 11 to pass"
+    ),
+    Profile(
+        "strict",
+        ("face", "eyes", "quality", "pose", "lighting", "background",
+         "geometry", "text", "object_detector", "human_only", "hands"),
+        passing_threshold=11,
+        description="Every check must pass"
+    ),
+)}
+
+
+def _validate():
+    for profile in PROFILES.values():
+        unknown = [name for name in profile.checks if name not in PASS_RULES]
+        if unknown:
+            raise ValueError(f"Profile '{profile.name}' has unknown checks {unknown}")
+        if not 0 < profile.passing_threshold <= profile.max_score:
+            raise ValueError(f"Profile '{profile.name}' threshold must be within 1..{profile.max_score}")
+    if CHECK_PROFILE not in PROFILES:
+        raise ValueError(f"CHECK_PROFILE must be one of {sorted(PROFILES)}, got '{CHECK_PROFILE}'")
+    if ADMISSION_DEGRADE_PROFILE not in PROFILES:
+        raise ValueError(
+            f"ADMISSION_DEGRADE_PROFILE must be one of {sorted(PROFILES)}, got '{ADMISSION_DEGRADE_PROFILE}'"
+        )
+
+
+_validate()
+
+DEFAULT_PROFILE = PROFILES[CHECK_PROFILE]
+# Used instead of the default profile while the admission queue is deep
+DEGRADE_PROFILE = PROFILES[ADMISSION_DEGRADE_PROFILE]
+
+
+def get_profile(name=None):
+    """Profile by name (None: the configured default); None if unknown"""
+    if name is None or name == "":
+        return DEFAULT_PROFILE
+    return PROFILES.get(name.strip().lower())
+
+
+def profile_summary():
+    """Public description of the available profiles"""
+    return {
+        name: {
+            "checks": list(p.checks),
+            "passing_threshold": p.passing_threshold,
+            "max_score": p.max_score,
+            "description": p.description,
+            "default": p is DEFAULT_PROFILE
+        }
+        for name, p in PROFILES.items()
+    }
@@ -1,6 +1,8 @@
 import cv2
 import numpy as np
 
+from app.verifier.image_context import as_image_context
+
 def check_quality(image_bytes, threshold: float = 100.0):
     """
     Check image quality using Laplacian variance.
@@ -15,8 +17,13 @@ def check_quality(image_bytes, threshold: float = 100.0):
             "is_blurry": bool
         }
     """
-    # Decode image to grayscale
-    img = cv2.imdecode(np.frombuffer(image_bytes, np.uint8), cv2.IMREAD_GRAYSCALE)
+    return check_quality_ctx(as_image_context(image_bytes), threshold)
+
+
+def check_quality_ctx(ctx, threshold: float = 100.0):
+    """Same as check_quality, on a shared ImageContext"""
+    # Grayscale view of the shared frame
+    img = ctx.gray
     
     # Compute Laplacian variance (blur score)
     blur_score = float(cv2.Laplacian(img, cv2.CV_64F).var())
@@ -1,68 +1,80 @@
-def build_response(face, eyes, quality, pose, lighting, bg, geometry, text, object_detector, human_only, hands):
-    """
-    Build flexible, score-based verification response.
-    
-    Each check gives 1 point if passed. Minimum points required to pass = 7 (adjustable).
-    """
+# Each check gives 1 point if its rule passes
+PASS_RULES = {
+    "face": lambda r: r.get("face_detected", False),
+    "eyes": lambda r: r.get("eyes_detected", False),
+    "quality": lambda r: not r.get("is_blurry", True),
+    # Flexible head pose check
+    "pose": lambda r: r.get("head_pose") in ["frontal", "slightly turned", "turned"],
+    "lighting": lambda r: r.get("lighting") == "good",
+    "background": lambda r: r.get("background_ok", False),
+    "geometry": lambda r: r.get("geometry_ok", False),
+    "text": lambda r: r.get("text_ok", False),
+    "object_detector": lambda r: r.get("non_human_object_present", False) is False,
+    "human_only": lambda r: r.get("status") == "PASS",
+    "hands": lambda r: r.get("is_ok", False),
+}
 
-    # Assign points for each criterion
-    score = 0
-    max_score = 11
+# Order of "details" in the response
+DETAILS_ORDER = (
+    "face", "eyes", "quality", "pose", "lighting", "background",
+    "geometry", "text", "hands", "object_detector", "human_only"
+)
 
-    if face.get("face_detected", False):
-        score += 1
+# Passing threshold when every check runs (see profiles.py for per-profile thresholds)
+PASSING_THRESHOLD = 8
 
-    if eyes.get("eyes_detected", False):
-        score += 1
+SKIPPED = {"skipped": True}
 
-    if not quality.get("is_blurry", True):
-        score += 1
 
-    # Flexible head pose check
-    if pose.get("head_pose") in ["frontal", "slightly turned", "turned"]:
-        score += 1
+def check_passed(name, result):
+    """Whether one check's result earns its point"""
+    return bool(PASS_RULES[name](result))
+
+
+def score_bounds(results, remaining):
+    """
+    (worst, best) reachable score given finished `results` and the
+    names of checks still outstanding.
+    """
+    score = sum(1 for name, result in results.items() if check_passed(name, result))
+    return score, score + len(remaining)
 
-    if lighting.get("lighting") == "good":
-        score += 1
 
-    if bg.get("background_ok", False):
-        score += 1
+def verdict_decided(results, remaining, passing_threshold=PASSING_THRESHOLD):
+    """True once the outstanding checks can no longer change the verdict"""
+    worst, best = score_bounds(results, remaining)
+    return worst >= passing_threshold or best < passing_threshold
 
-    if geometry.get("geometry_ok", False):
-        score += 1
 
-    if text.get("text_ok", False):
-        score += 1
+def build_response(results, checks=None, passing_threshold=PASSING_THRESHOLD, skipped=()):
+    """
+    Build flexible, score-based verification response.
 
-    if object_detector.get("non_human_object_present", False) is False:
-        score += 1
-    
-    if human_only.get("status") == "PASS":
-        score += 1
-    
-    if hands.get("is_ok", False):
-        score += 1
+    Each of `checks` (default: all of them) gives 1 point if passed, out
+    of len(checks); at least `passing_threshold` points pass the image.
+    Checks named in `skipped` (early decision mode) score no point and are
+    listed under "skipped_checks".
+    """
+    checks = DETAILS_ORDER if checks is None else checks
+    details = {name: results.get(name, SKIPPED) for name in DETAILS_ORDER if name in checks}
 
-    # Define passing threshold (can be adjusted)
-    passing_threshold = 8
+    # Assign points for each criterion
+    score = sum(
+        1 for name, result in details.items()
+        if name not in skipped and check_passed(name, result)
+    )
+    max_score = len(details)
 
     passed = score >= passing_threshold
 
-    return {
+    response = {
         "image_status": "passed" if passed else "failed",
         "score": score,
         "max_score": max_score,
-        "details": {
-            "face": face,
-            "eyes": eyes,
-            "quality": quality,
-            "pose": pose,
-            "lighting": lighting,
-            "background": bg,
-            "geometry": geometry,
-            "text": text,
-            "hands": hands,
-            "object_detector": object_detector,
-            "human_only": human_only
-        }
+        "details": details
     }
+
+    if skipped:
+        response["skipped_checks"] = [name for name in details if name in skipped]
+
+    return response
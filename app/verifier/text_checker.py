@@ -1,6 +1,5 @@
-import cv2
-import numpy as np
-import pytesseract
+from app.verifier.image_context import as_image_context
+from app.verifier.ocr_engine import ocr_words
 
 # For Linux, no need to set tesseract_cmd if installed via apt
 # pytesseract.pytesseract.tesseract_cmd = "/usr/bin/tesseract"
@@ -8,15 +7,20 @@ import pytesseract
 TEXT_AREA_THRESHOLD = 0.06  # 6%
 
 def check_text_presence(image_bytes: bytes):
-    # Convert bytes to numpy array and decode image
-    img_np = np.frombuffer(image_bytes, np.uint8)
-    img = cv2.imdecode(img_np, cv2.IMREAD_COLOR)
+    return check_text_presence_ctx(as_image_context(image_bytes))
 
-    # Convert to grayscale
-    gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
 
-    # Perform OCR
-    data = pytesseract.image_to_data(gray, output_type=pytesseract.Output.DICT)
+def run_ocr(ctx):
+    """Tesseract word boxes for the shared gray frame (see ocr_engine)"""
+    return ocr_words(ctx.gray)
+
+
+def check_text_presence_ctx(ctx, ocr_data=None):
+    # Grayscale view of the shared frame
+    gray = ctx.gray
+
+    # Perform OCR (unless the pipeline already did)
+    data = ocr_data if ocr_data is not None else run_ocr(ctx)
 
     h, w = gray.shape
     img_area = h * w
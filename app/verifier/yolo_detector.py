@@ -0,0 +1,112 @@
+import threading
+
+import numpy as np
+
+from app.config import YOLO_AREA_FILTER
+
+# Lazy load model (to avoid numpy/torch initialization issues)
+MODEL = None
+_MODEL_LOCK = threading.Lock()
+
+
+def _get_model():
+    """Lazy load the single detector shared by all object checks"""
+    global MODEL
+    if MODEL is None:
+        # Concurrent first requests must not each load their own copy
+        with _MODEL_LOCK:
+            if MODEL is None:
+                # Runtime (torch / onnx / openvino) per DETECTOR_BACKEND
+                from app.verifier.detector_backends import make_detector
+                try:
+                    MODEL = make_detector()
+                except Exception as e:
+                    print(f"ERROR loading YOLO model: {e}")
+                    raise
+    return MODEL
+
+
+class Detections:
+    """
+    One YOLO pass over a frame: class names and boxes for every detection.
+
+    Mask areas are derived on demand through `mask_source(i)`, which
+    returns detection i's mask in the letterboxed model-input space (or
+    None without a segmentation head), so masks are only touched for
+    objects that survive the box-area test.
+    """
+
+    def __init__(self, names, boxes, image_shape, mask_source=None):
+        self.names = names              # class name per detection
+        self.boxes = boxes              # (N, 4) xyxy in image pixels
+        self.image_shape = image_shape  # (h, w)
+        self._mask_source = mask_source
+        self._mask_ratios = {}
+
+    def __getstate__(self):
+        # Crossing a process boundary (process execution backend): resolve
+        # the non-person mask areas here and drop the raw model output
+        for i, name in enumerate(self.names):
+            if name != "person":
+                self.mask_area_ratio(i)
+        state = self.__dict__.copy()
+        state["_mask_source"] = None
+        return state
+
+    def __len__(self):
+        return len(self.names)
+
+    @property
+    def person_count(self):
+        return sum(1 for name in self.names if name == "person")
+
+    def box_area_ratio(self, i):
+        x1, y1, x2, y2 = self.boxes[i]
+        h, w = self.image_shape
+        return float((x2 - x1) * (y2 - y1)) / (h * w)
+
+    def mask_area_ratio(self, i):
+        """Mask area relative to the image, or None without masks"""
+        if i in self._mask_ratios:
+            return self._mask_ratios[i]
+        mask_np = None if self._mask_source is None else self._mask_source(i)
+        if mask_np is None:
+            return None
+
+        # Masks live in the letterboxed model-input space; undo the
+        # letterbox scale so the ratio is relative to the original image
+        h, w = self.image_shape
+        mh, mw = mask_np.shape
+        gain = min(mh / h, mw / w)
+        ratio = float(np.sum(mask_np > 0)) / (gain * gain * h * w)
+        self._mask_ratios[i] = ratio
+        return ratio
+
+    def area_ratio(self, i):
+        """Area used by the object filter, per YOLO_AREA_FILTER"""
+        if YOLO_AREA_FILTER == "mask":
+            ratio = self.mask_area_ratio(i)
+            if ratio is not None:
+                return ratio
+        return self.box_area_ratio(i)
+
+
+def detect_objects(ctx, conf_threshold: float = 0.4):
+    """Single YOLO inference pass on the shared frame"""
+    return _get_model().predict([ctx.bgr], conf_threshold)[0]
+
+
+def detect_objects_batch(ctxs, conf_threshold: float = 0.4):
+    """One batched YOLO forward pass over several frames"""
+    return _get_model().predict([ctx.bgr for ctx in ctxs], conf_threshold)
+
+
+def from_result(result, names, image_shape):
+    """Wrap one Ultralytics result as Detections"""
+    masks = result.masks
+    return Detections(
+        names=[names[int(cls)] for cls in result.boxes.cls],
+        boxes=result.boxes.xyxy.cpu().numpy(),
+        image_shape=image_shape,
+        mask_source=None if masks is None else (lambda i: masks.data[i].cpu().numpy())
+    )
@@ -0,0 +1,8 @@
+"""
+Benchmarks for the verification checks.
+
+    python -m benchmarks.corpus OUT_DIR     # write the synthetic corpus
+    python -m benchmarks.run [options]      # time checks and the pipeline
+    python -m benchmarks.loadgen [options]  # load-test a running service
+    python -m benchmarks.serialization      # response encoding, old vs new
+"""
@@ -0,0 +1,203 @@
+"""
+Deterministic synthetic image corpus.
+
+Every sample is a head-and-shoulders portrait drawn with OpenCV on a
+noisy gradient background, optionally with an ID-card style text block
+or handheld objects, encoded as JPEG or PNG. The same seed always gives
+the same bytes, so timings are comparable across runs and machines.
+
+Usage:
+    python -m benchmarks.corpus OUT_DIR [--resolutions 480p 12mp] [--formats jpeg]
+"""
+import argparse
+import os
+from dataclasses import dataclass
+
+import cv2
+import numpy as np
+
+# 480p up to a 12 MP phone photo (4:3)
+RESOLUTIONS = {
+    "480p": (640, 480),
+    "720p": (1280, 720),
+    "1080p": (1920, 1080),
+    "5mp": (2592, 1944),
+    "12mp": (4000, 3000),
+}
+FORMATS = ("jpeg", "png")
+SCENES = ("face", "face_text", "face_object")
+
+JPEG_QUALITY = 92
+PNG_COMPRESSION = 3
+
+
+@dataclass(frozen=True)
+class Sample:
+    name: str
+    resolution: str
+    format: str
+    scene: str
+    data: bytes
+
+
+def generate(resolutions=None, formats=None, scenes=None, seed=0):
+    """All samples for the selected resolutions x formats x scenes"""
+    samples = []
+    for resolution in resolutions or RESOLUTIONS:
+        width, height = RESOLUTIONS[resolution]
+        for scene in scenes or SCENES:
+            # Positions in the full tables, so a sample renders the same
+            # pixels whichever subset is selected
+            r_index = list(RESOLUTIONS).index(resolution)
+            s_index = SCENES.index(scene)
+            frame = render(scene, width, height, seed=seed * 1000 + r_index * 10 + s_index)
+            for fmt in formats or FORMATS:
+                samples.append(Sample(
+                    name=f"{scene}-{resolution}.{'jpg' if fmt == 'jpeg' else 'png'}",
+                    resolution=resolution,
+                    format=fmt,
+                    scene=scene,
+                    data=encode(frame, fmt)
+                ))
+    return samples
+
+
+def encode(frame, fmt):
+    if fmt == "jpeg":
+        ok, buf = cv2.imencode(".jpg", frame, [cv2.IMWRITE_JPEG_QUALITY, JPEG_QUALITY])
+    else:
+        ok, buf = cv2.imencode(".png", frame, [cv2.IMWRITE_PNG_COMPRESSION, PNG_COMPRESSION])
+    if not ok:
+        raise ValueError(f"Could not encode {fmt}")
+    return buf.tobytes()
+
+
+def render(scene, width, height, seed=0):
+    """BGR frame for one scene"""
+    rng = np.random.default_rng(seed)
+    img = _background(width, height, rng)
+    _draw_person(img, rng)
+    if scene == "face_text":
+        _draw_text_block(img, rng)
+    elif scene == "face_object":
+        _draw_objects(img, rng)
+    return img
+
+
+def _color(rng, low, high):
+    return tuple(int(v) for v in rng.integers(low, high))
+
+
+def _background(width, height, rng):
+    # Vertical gradient plus low-frequency sensor-like noise
+    top = rng.integers(170, 235, 3).astype(np.float32)
+    bottom = rng.integers(140, 215, 3).astype(np.float32)
+    t = np.linspace(0, 1, height, dtype=np.float32)[:, None, None]
+    img = np.broadcast_to(top * (1 - t) + bottom * t, (height, width, 3)).copy()
+
+    noise = rng.normal(0, 4, (max(1, height // 4), max(1, width // 4), 3)).astype(np.float32)
+    img += cv2.resize(noise, (width, height), interpolation=cv2.INTER_LINEAR)
+    return np.clip(img, 0, 255).astype(np.uint8)
+
+
+def _draw_person(img, rng):
+    h, w = img.shape[:2]
+    s = min(w, h)
+    cx, cy = w // 2, int(h * 0.45)
+    fw, fh = int(s * 0.16), int(s * 0.22)      # face half-axes
+    skin = _color(rng, [90, 120, 165], [135, 165, 220])
+    hair = _color(rng, [10, 10, 10], [60, 60, 80])
+    shirt = _color(rng, [30, 30, 30], [140, 140, 140])
+    aa = cv2.LINE_AA
+
+    # Shoulders and neck
+    cv2.ellipse(img, (cx, h + s // 10), (int(s * 0.42), int(s * 0.38)), 0, 180, 360, shirt, -1, aa)
+    cv2.rectangle(img, (cx - fw // 2, cy), (cx + fw // 2, cy + fh + s // 12), skin, -1, aa)
+
+    # Hair behind the face, then the face
+    cv2.ellipse(img, (cx, cy - fh // 6), (int(fw * 1.12), int(fh * 1.0)), 0, 180, 360, hair, -1, aa)
+    cv2.ellipse(img, (cx, cy), (fw, fh), 0, 0, 360, skin, -1, aa)
+
+    # Eyes, brows
+    eye_y = cy - int(fh * 0.15)
+    eye_w, eye_h = max(2, int(fw * 0.2)), max(1, int(fh * 0.07))
+    iris = _color(rng, [20, 40, 40], [90, 120, 120])
+    for side in (-1, 1):
+        ex = cx + side * int(fw * 0.42)
+        cv2.ellipse(img, (ex, eye_y), (eye_w, eye_h), 0, 0, 360, (245, 245, 245), -1, aa)
+        cv2.circle(img, (ex, eye_y), max(1, int(eye_h * 0.9)), iris, -1, aa)
+        cv2.circle(img, (ex, eye_y), max(1, int(eye_h * 0.4)), (10, 10, 10), -1, aa)
+        cv2.line(img, (ex - eye_w, eye_y - 2 * eye_h - 2), (ex + eye_w, eye_y - 2 * eye_h - 4),
+                 hair, max(1, eye_h // 2), aa)
+
+    # Nose and mouth
+    dark_skin = tuple(max(0, c - 40) for c in skin)
+    cv2.line(img, (cx, eye_y + eye_h), (cx - fw // 10, cy + fh // 5), dark_skin, max(1, s // 300), aa)
+    cv2.ellipse(img, (cx, cy + int(fh * 0.45)), (int(fw * 0.3), max(1, int(fh * 0.06))),
+                0, 0, 180, (60, 60, 150), max(1, s // 250), aa)
+
+    # Soft shading so the face is not a flat fill
+    x0, y0 = max(0, cx - fw), max(0, cy - fh)
+    roi = img[y0:cy + fh, x0:cx + fw]
+    k = max(3, (s // 150) | 1)
+    roi[...] = cv2.GaussianBlur(roi, (k, k), 0)
+
+
+def _draw_text_block(img, rng):
+    # ID-card style panel with a few lines of text beside the face
+    h, w = img.shape[:2]
+    scale = h / 900
+    thickness = max(1, int(2 * scale))
+    x0, y0 = int(w * 0.04), int(h * 0.62)
+    x1, y1 = int(w * 0.38), int(h * 0.95)
+    cv2.rectangle(img, (x0, y0), (x1, y1), (235, 235, 235), -1)
+
+    letters = np.array(list("ABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789"))
+    line_height = int(40 * scale)
+    y = y0 + line_height
+    while y < y1 - line_height // 3:
+        words = ["".join(rng.choice(letters, rng.integers(3, 9))) for _ in range(3)]
+        cv2.putText(img, " ".join(words), (x0 + line_height // 3, y), cv2.FONT_HERSHEY_SIMPLEX,
+                    scale, (20, 20, 20), thickness, cv2.LINE_AA)
+        y += line_height
+
+
+def _draw_objects(img, rng):
+    # A phone held up at one side and a cup at the other
+    h, w = img.shape[:2]
+    s = min(w, h)
+    aa = cv2.LINE_AA
+
+    pw, ph = int(s * 0.12), int(s * 0.24)
+    px, py = int(w * 0.72), int(h * 0.5)
+    cv2.rectangle(img, (px, py), (px + pw, py + ph), (25, 25, 25), -1, aa)
+    margin = max(2, pw // 12)
+    screen = _color(rng, [120, 60, 20], [220, 160, 90])
+    cv2.rectangle(img, (px + margin, py + 3 * margin), (px + pw - margin, py + ph - 3 * margin), screen, -1, aa)
+
+    cw, ch = int(s * 0.1), int(s * 0.14)
+    qx, qy = int(w * 0.12), int(h * 0.7)
+    cup = _color(rng, [30, 30, 120], [120, 120, 240])
+    pts = np.array([[qx, qy], [qx + cw, qy], [qx + int(cw * 0.85), qy + ch], [qx + int(cw * 0.15), qy + ch]], np.int32)
+    cv2.fillPoly(img, [pts], cup, aa)
+    cv2.ellipse(img, (qx + cw, qy + ch // 2), (cw // 4, ch // 4), 0, -90, 90, cup, max(2, s // 150), aa)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("out_dir")
+    parser.add_argument("--resolutions", nargs="+", choices=list(RESOLUTIONS))
+    parser.add_argument("--formats", nargs="+", choices=FORMATS)
+    parser.add_argument("--scenes", nargs="+", choices=SCENES)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    os.makedirs(args.out_dir, exist_ok=True)
+    for sample in generate(args.resolutions, args.formats, args.scenes, args.seed):
+        with open(os.path.join(args.out_dir, sample.name), "wb") as f:
+            f.write(sample.data)
+        print(f"{sample.name}: {len(sample.data)} bytes")
+
+
+if __name__ == "__main__":
+    main()
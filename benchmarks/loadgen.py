@@ -0,0 +1,308 @@
+"""
+Open-loop load generator and capacity report for a running service.
+
+Fetches a token from /api/v1/get-token, waits for /ready, then sends
+/api/v1/verify-face requests at each arrival rate in --rates. Arrivals
+follow a seeded Poisson process and are independent of completions, so
+a slow server cannot slow the offered load down. Arrivals that find
+--concurrency requests already outstanding are counted as dropped.
+Latency is measured from the scheduled arrival time.
+
+Each step reports achieved throughput, p50/p95/p99 latency, error and
+drop rates. The knee is the last rate that still keeps up: throughput
+>= 90% of offered, errors <= --max-error-rate and p95 <= --knee-factor
+times the first step's p95. Same seed and options give the same request
+schedule and images; --compare prints the change against an earlier
+JSON report.
+
+Images come from the synthetic corpus (--mix RESOLUTION.FORMAT=WEIGHT)
+or a directory (--image-dir). By default every request gets a few random
+trailing bytes so the result cache cannot serve it; --no-unique measures
+the cached path instead.
+
+Usage:
+    python -m benchmarks.loadgen --url http://127.0.0.1:7000 --rates 1 2 4 8 16 \\
+        --duration 30 --concurrency 64 --mix 1080p.jpeg=3 12mp.jpeg=1 [--json out.json]
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+
+import httpx
+import numpy as np
+
+from benchmarks.corpus import RESOLUTIONS, FORMATS, generate
+
+DEFAULT_CLIENT_ID = "image-8989"
+DEFAULT_CLIENT_SECRET = "atik-check-8888"
+IMAGE_EXTS = (".jpg", ".jpeg", ".png")
+
+
+def load_images(image_dir=None, mix=None, seed=0):
+    """[(name, bytes, content_type, weight)] for the request mix"""
+    if image_dir:
+        names = sorted(n for n in os.listdir(image_dir) if n.lower().endswith(IMAGE_EXTS))
+        images = []
+        for name in names:
+            with open(os.path.join(image_dir, name), "rb") as f:
+                images.append((name, f.read(), _content_type(name), 1.0))
+        return images
+
+    images = []
+    for item in mix:
+        key, _, weight = item.partition("=")
+        resolution, _, fmt = key.partition(".")
+        if resolution not in RESOLUTIONS or fmt not in FORMATS:
+            raise SystemExit(f"--mix expects RESOLUTION.FORMAT=WEIGHT, e.g. 1080p.jpeg=3 (got '{item}')")
+        samples = generate([resolution], [fmt], seed=seed)
+        # The weight is shared by the scenes of that resolution/format
+        for sample in samples:
+            images.append((sample.name, sample.data, _content_type(sample.name),
+                           float(weight or 1) / len(samples)))
+    return images
+
+
+def _content_type(name):
+    return "image/png" if name.lower().endswith(".png") else "image/jpeg"
+
+
+async def get_token(client, client_id, client_secret):
+    response = await client.post("/api/v1/get-token", json={"client_id": client_id, "client_secret": client_secret})
+    body = response.json()
+    if body.get("response") != "success":
+        raise SystemExit(f"Token request failed: {body.get('msg')}")
+    return body["data"]["access_token"]
+
+
+async def wait_ready(client, timeout):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            response = await client.get("/ready")
+            if response.status_code in (200, 404):   # 404: server without /ready
+                return
+        except httpx.TransportError:
+            pass
+        await asyncio.sleep(1)
+    raise SystemExit(f"Service not ready after {timeout}s")
+
+
+async def run_step(client, token, images, rate, duration, concurrency, seed, unique, timeout, params=None):
+    """Offer `rate` requests/s for `duration` seconds; returns the step's samples"""
+    rng = random.Random(f"{seed}:{rate}")
+    weights = [w for *_, w in images]
+    loop = asyncio.get_running_loop()
+    headers = {"Authorization": f"Bearer {token}"}
+
+    latencies = []
+    errors = {}
+    dropped = 0
+    outstanding = 0
+    tasks = []
+
+    async def one(scheduled, image, suffix):
+        nonlocal outstanding
+        name, data, content_type, _ = image
+        try:
+            response = await client.post(
+                "/api/v1/verify-face",
+                files={"image": (name, data + suffix, content_type)},
+                headers=headers,
+                params=params,
+                timeout=timeout
+            )
+            body = response.json()
+            if response.status_code != 200 or body.get("response") != "success":
+                kind = str(body.get("status", response.status_code))
+            else:
+                kind = None
+        except httpx.TimeoutException:
+            kind = "timeout"
+        except httpx.TransportError:
+            kind = "connection"
+        except ValueError:
+            kind = "bad_response"
+        finally:
+            outstanding -= 1
+
+        if kind is None:
+            latencies.append((loop.time() - scheduled) * 1000)
+        else:
+            errors[kind] = errors.get(kind, 0) + 1
+
+    start = loop.time()
+    t = 0.0
+    offered = 0
+    while True:
+        t += rng.expovariate(rate)
+        if t >= duration:
+            break
+        # Draw everything from the RNG up front so the schedule does not
+        # depend on server behaviour
+        image = rng.choices(images, weights)[0]
+        suffix = rng.randbytes(16) if unique else b""
+        offered += 1
+
+        delay = start + t - loop.time()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        if outstanding >= concurrency:
+            dropped += 1
+            continue
+        outstanding += 1
+        tasks.append(asyncio.create_task(one(start + t, image, suffix)))
+
+    await asyncio.gather(*tasks)
+    elapsed = loop.time() - start
+
+    ok = len(latencies)
+    failed = sum(errors.values())
+    return {
+        "rate": rate,
+        "offered": offered,
+        "completed": ok,
+        "errors": errors,
+        "dropped": dropped,
+        "throughput": round(ok / elapsed, 3) if elapsed > 0 else 0.0,
+        "error_rate": round(failed / offered, 4) if offered else 0.0,
+        "drop_rate": round(dropped / offered, 4) if offered else 0.0,
+        "latency_ms": {
+            "p50": round(float(np.percentile(latencies, 50)), 1) if ok else None,
+            "p95": round(float(np.percentile(latencies, 95)), 1) if ok else None,
+            "p99": round(float(np.percentile(latencies, 99)), 1) if ok else None,
+            "max": round(max(latencies), 1) if ok else None,
+        },
+    }
+
+
+def find_knee(steps, knee_factor, max_error_rate):
+    """(last sustainable rate, first rate past the knee) — either may be None"""
+    base_p95 = steps[0]["latency_ms"]["p95"] if steps else None
+    sustainable = None
+    for step in steps:
+        p95 = step["latency_ms"]["p95"]
+        keeps_up = (
+            p95 is not None
+            and step["throughput"] >= 0.9 * step["rate"]
+            and step["error_rate"] + step["drop_rate"] <= max_error_rate
+            and p95 <= knee_factor * base_p95
+        )
+        if not keeps_up:
+            return sustainable, step["rate"]
+        sustainable = step["rate"]
+    return sustainable, None
+
+
+def _print_steps(steps, previous=None):
+    before = {s["rate"]: s for s in (previous or {}).get("steps", [])}
+    print(f"{'rate':>8}{'thrpt':>9}{'p50':>9}{'p95':>9}{'p99':>9}{'err%':>7}{'drop%':>7}")
+    for s in steps:
+        lat = s["latency_ms"]
+        line = (f"{s['rate']:>8}{s['throughput']:>9.2f}{_fmt(lat['p50'])}{_fmt(lat['p95'])}{_fmt(lat['p99'])}"
+                f"{s['error_rate'] * 100:>7.1f}{s['drop_rate'] * 100:>7.1f}")
+        old = before.get(s["rate"])
+        if old and old["latency_ms"]["p95"] and lat["p95"]:
+            change = lat["p95"] / old["latency_ms"]["p95"] - 1
+            line += f"   p95 {change:+.0%} vs previous, thrpt {s['throughput'] - old['throughput']:+.2f}/s"
+        print(line)
+
+
+def _fmt(value):
+    return f"{value:>9.0f}" if value is not None else f"{'-':>9}"
+
+
+async def main_async(args):
+    images = load_images(args.image_dir, args.mix, args.seed)
+    if not images:
+        raise SystemExit("No images to send")
+
+    params = {"profile": args.profile} if args.profile else None
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    async with httpx.AsyncClient(base_url=args.url, limits=limits, timeout=args.timeout) as client:
+        await wait_ready(client, args.ready_timeout)
+
+        if args.warmup > 0:
+            token = await get_token(client, args.client_id, args.client_secret)
+            print(f"Warm-up: {args.warmup}s at {args.rates[0]}/s", file=sys.stderr)
+            await run_step(client, token, images, args.rates[0], args.warmup, args.concurrency,
+                           args.seed + 1, args.unique, args.timeout, params)
+
+        steps = []
+        for rate in args.rates:
+            # Fresh token per step; tokens expire after an hour
+            token = await get_token(client, args.client_id, args.client_secret)
+            print(f"Step: {rate}/s for {args.duration}s", file=sys.stderr)
+            steps.append(await run_step(client, token, images, rate, args.duration, args.concurrency,
+                                        args.seed, args.unique, args.timeout, params))
+            if args.stop_after_knee and find_knee(steps, args.knee_factor, args.max_error_rate)[1] is not None:
+                break
+
+    sustainable, knee = find_knee(steps, args.knee_factor, args.max_error_rate)
+    return {
+        "meta": {
+            "url": args.url,
+            "duration_s": args.duration,
+            "concurrency": args.concurrency,
+            "seed": args.seed,
+            "unique": args.unique,
+            "profile": args.profile,
+            "images": [name for name, *_ in images],
+            "mix": args.mix if not args.image_dir else None,
+            "knee_factor": args.knee_factor,
+            "max_error_rate": args.max_error_rate,
+        },
+        "steps": steps,
+        "sustainable_rate": sustainable,
+        "knee_rate": knee,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="http://127.0.0.1:8000")
+    parser.add_argument("--rates", nargs="+", type=float, default=[1, 2, 4, 8, 16], help="requests/s per step")
+    parser.add_argument("--duration", type=float, default=30, help="seconds per step")
+    parser.add_argument("--warmup", type=float, default=5, help="unrecorded seconds at the first rate")
+    parser.add_argument("--concurrency", type=int, default=64, help="max outstanding requests")
+    parser.add_argument("--mix", nargs="+", default=["1080p.jpeg=1"], metavar="RESOLUTION.FORMAT=WEIGHT")
+    parser.add_argument("--image-dir", help="send these images (uniform mix) instead of the corpus")
+    parser.add_argument("--no-unique", dest="unique", action="store_false",
+                        help="send identical bytes (result cache hits)")
+    parser.add_argument("--profile", help="check profile to request (default: the server's)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--timeout", type=float, default=60, help="per-request timeout, seconds")
+    parser.add_argument("--ready-timeout", type=float, default=300)
+    parser.add_argument("--knee-factor", type=float, default=2.0, help="p95 growth that marks the knee")
+    parser.add_argument("--max-error-rate", type=float, default=0.01)
+    parser.add_argument("--stop-after-knee", action="store_true")
+    parser.add_argument("--client-id", default=DEFAULT_CLIENT_ID)
+    parser.add_argument("--client-secret", default=DEFAULT_CLIENT_SECRET)
+    parser.add_argument("--compare", help="earlier JSON report to compare against")
+    parser.add_argument("--json", help="also write the report to this file")
+    args = parser.parse_args()
+
+    report = asyncio.run(main_async(args))
+
+    previous = None
+    if args.compare:
+        with open(args.compare) as f:
+            previous = json.load(f)
+        changed = [k for k in ("mix", "duration_s", "concurrency", "seed", "unique", "profile")
+                   if previous["meta"].get(k) != report["meta"][k]]
+        if changed:
+            print(f"Warning: {args.compare} differs in {', '.join(changed)}", file=sys.stderr)
+    _print_steps(report["steps"], previous)
+    knee = f"{report['knee_rate']}/s" if report["knee_rate"] is not None else "not reached"
+    print(f"Sustainable rate: {report['sustainable_rate']}/s, knee: {knee}")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
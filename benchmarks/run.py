@@ -0,0 +1,225 @@
+"""
+Micro-benchmarks for the verification checks.
+
+For every corpus sample (see benchmarks/corpus.py) this times:
+  - decode:      bytes -> BGR + gray frames
+  - each check:  in isolation on a pre-decoded frame at its working
+                 resolution, computing its own artifacts
+  - pipeline:    the full verify_face_image call (result cache disabled)
+
+Results are grouped per benchmark, resolution and format and reported as
+wall-time percentiles, mean CPU time (all threads) and the peak of the
+Python heap as seen by tracemalloc: Python objects and numpy arrays only.
+Buffers allocated natively by OpenCV, Tesseract, MediaPipe or torch do
+not show up there.
+
+With a baseline file present, the run fails (exit 1) when a benchmark's
+p50 regresses by more than --threshold (per-check overrides with
+--check-threshold NAME=FRACTION) and by more than --min-delta-ms.
+
+Usage:
+    python -m benchmarks.run [--repeat 5] [--resolutions 480p 12mp] [--formats jpeg]
+        [--scenes face face_text] [--only decode text pipeline]
+        [--baseline benchmarks/baseline.json] [--save-baseline]
+        [--threshold 0.25] [--check-threshold text=0.5] [--json report.json]
+"""
+import os
+
+# Every pipeline run must do the work; set before the app reads its config
+os.environ.setdefault("RESULT_CACHE_ENABLED", "false")
+
+import argparse
+import asyncio
+import io
+import json
+import platform
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+from fastapi import UploadFile
+
+from app.controllers.face_verification_controller import verify_face_image
+from app.verifier.image_context import ImageContext
+from app.verifier.pipeline import VERIFICATION_GRAPH, CHECK_ORDER
+from benchmarks.corpus import RESOLUTIONS, FORMATS, SCENES, generate
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(__file__), "baseline.json")
+BENCHMARKS = ("decode",) + CHECK_ORDER + ("pipeline",)
+
+
+def measure(fn, repeat):
+    """Wall and CPU milliseconds per run, plus the Python-heap peak (tracemalloc) of one extra run"""
+    fn()  # warm-up: lazy model loads, first-call allocations
+    wall, cpu = [], []
+    for _ in range(repeat):
+        w0, c0 = time.perf_counter(), time.process_time()
+        fn()
+        wall.append((time.perf_counter() - w0) * 1000)
+        cpu.append((time.process_time() - c0) * 1000)
+
+    # Separate pass: tracing slows Python code down
+    tracemalloc.start()
+    try:
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return wall, cpu, peak
+
+
+def _benchmarks(sample, loop, only):
+    """(name, callable) pairs for one sample"""
+    frame = ImageContext(sample.data).bgr
+    if frame is None:
+        raise ValueError(f"Could not decode {sample.name}")
+
+    def fresh():
+        # New context per run so cached views are rebuilt like in a request
+        return ImageContext.from_frame(frame, sample.data).warm()
+
+    if "decode" in only:
+        yield "decode", lambda: ImageContext(sample.data).warm()
+
+    for name in CHECK_ORDER:
+        if name in only:
+            stage = VERIFICATION_GRAPH.stages[name]
+            yield name, lambda stage=stage: stage.func(fresh().at(stage.max_side))
+
+    if "pipeline" in only:
+        def pipeline():
+            upload = UploadFile(io.BytesIO(sample.data), size=len(sample.data), filename=sample.name)
+            response = loop.run_until_complete(verify_face_image(upload))
+            if response["response"] != "success":
+                raise RuntimeError(f"{sample.name}: {response['msg']} {response.get('data')}")
+        yield "pipeline", pipeline
+
+
+def run(samples, repeat, only):
+    loop = asyncio.new_event_loop()
+    grouped = {}
+    try:
+        for sample in samples:
+            for name, fn in _benchmarks(sample, loop, only):
+                wall, cpu, peak = measure(fn, repeat)
+                entry = grouped.setdefault(f"{name}@{sample.resolution}.{sample.format}",
+                                           {"wall": [], "cpu": [], "peak": 0})
+                entry["wall"] += wall
+                entry["cpu"] += cpu
+                entry["peak"] = max(entry["peak"], peak)
+                print(f"  {name:<16} {sample.name:<24} p50 {np.percentile(wall, 50):9.2f} ms", file=sys.stderr)
+    finally:
+        loop.close()
+
+    return {
+        key: {
+            "runs": len(e["wall"]),
+            "p50_ms": round(float(np.percentile(e["wall"], 50)), 3),
+            "p95_ms": round(float(np.percentile(e["wall"], 95)), 3),
+            "p99_ms": round(float(np.percentile(e["wall"], 99)), 3),
+            "mean_ms": round(float(np.mean(e["wall"])), 3),
+            "cpu_ms": round(float(np.mean(e["cpu"])), 3),
+            "peak_mb": round(e["peak"] / 2 ** 20, 2),
+        }
+        for key, e in grouped.items()
+    }
+
+
+def compare(results, baseline, threshold, check_thresholds, min_delta_ms):
+    """Benchmarks whose p50 regressed past their threshold"""
+    regressions = []
+    for key, current in results.items():
+        base = baseline.get(key)
+        if base is None:
+            continue
+        limit = check_thresholds.get(key.split("@", 1)[0], threshold)
+        delta = current["p50_ms"] - base["p50_ms"]
+        if current["p50_ms"] > base["p50_ms"] * (1 + limit) and delta > min_delta_ms:
+            regressions.append({
+                "benchmark": key,
+                "baseline_p50_ms": base["p50_ms"],
+                "p50_ms": current["p50_ms"],
+                "change": round(delta / base["p50_ms"], 4),
+                "threshold": limit,
+            })
+    return regressions
+
+
+def _print_table(results):
+    header = f"{'benchmark':<34}{'p50':>10}{'p95':>10}{'p99':>10}{'cpu':>10}{'py heap MB':>12}"
+    print(header)
+    print("-" * len(header))
+    for key in sorted(results):
+        r = results[key]
+        print(f"{key:<34}{r['p50_ms']:>10.2f}{r['p95_ms']:>10.2f}{r['p99_ms']:>10.2f}"
+              f"{r['cpu_ms']:>10.2f}{r['peak_mb']:>12.2f}")
+
+
+def _parse_thresholds(items):
+    thresholds = {}
+    for item in items or ():
+        name, _, value = item.partition("=")
+        if name not in BENCHMARKS or not value:
+            raise SystemExit(f"--check-threshold expects NAME=FRACTION with NAME in {BENCHMARKS}")
+        thresholds[name] = float(value)
+    return thresholds
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=5, help="timed runs per sample and benchmark")
+    parser.add_argument("--resolutions", nargs="+", choices=list(RESOLUTIONS))
+    parser.add_argument("--formats", nargs="+", choices=FORMATS)
+    parser.add_argument("--scenes", nargs="+", choices=SCENES)
+    parser.add_argument("--only", nargs="+", choices=BENCHMARKS, help="run only these benchmarks")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--save-baseline", action="store_true", help="write this run as the new baseline")
+    parser.add_argument("--threshold", type=float, default=0.25, help="allowed p50 slowdown (fraction)")
+    parser.add_argument("--check-threshold", action="append", metavar="NAME=FRACTION")
+    parser.add_argument("--min-delta-ms", type=float, default=1.0, help="ignore slowdowns below this")
+    parser.add_argument("--json", help="also write the report to this file")
+    args = parser.parse_args()
+    check_thresholds = _parse_thresholds(args.check_threshold)
+
+    samples = generate(args.resolutions, args.formats, args.scenes, args.seed)
+    results = run(samples, args.repeat, set(args.only or BENCHMARKS))
+    report = {
+        "meta": {
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "cpus": os.cpu_count(),
+            "repeat": args.repeat,
+            "seed": args.seed,
+        },
+        "results": results,
+    }
+    _print_table(results)
+
+    regressions = []
+    if os.path.exists(args.baseline) and not args.save_baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)["results"]
+        regressions = compare(results, baseline, args.threshold, check_thresholds, args.min_delta_ms)
+        report["regressions"] = regressions
+        for r in regressions:
+            print(f"REGRESSION {r['benchmark']}: p50 {r['baseline_p50_ms']} -> {r['p50_ms']} ms "
+                  f"(+{r['change']:.0%}, threshold {r['threshold']:.0%})")
+        if not regressions:
+            print(f"No regressions against {args.baseline}")
+
+    if args.save_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Baseline written to {args.baseline}")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
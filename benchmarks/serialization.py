@@ -0,0 +1,135 @@
+"""
+Response serialization micro-benchmark.
+
+Compares the previous response path (to_python, then FastAPI's
+jsonable_encoder, then Starlette's json.dumps) with json_safe.dumps on
+realistic verify-face payloads: a single result, a result with timings
+and a full batch of BATCH_MAX_IMAGES results with detected objects.
+Every payload is also checked for byte-identical output; the run fails
+(exit 1) on any difference.
+
+Usage:
+    python -m benchmarks.serialization [--repeat 2000] [--json report.json]
+"""
+import argparse
+import json
+import sys
+import time
+
+import numpy as np
+from fastapi.encoders import jsonable_encoder
+
+from app.config import BATCH_MAX_IMAGES
+from app.utils.json_safe import dumps, orjson, to_python
+from app.utils.response import success
+from app.verifier.response_builder import build_response
+
+
+def previous_path(payload):
+    """What an endpoint returning a to_python'd dict used to cost"""
+    content = jsonable_encoder(to_python(payload))
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")).encode("utf-8")
+
+
+def sample_result(rng, objects=0):
+    """One result as the checks produce it, numpy scalars included"""
+    detected = list(rng.choice(["cell phone", "cup", "book", "bottle"], objects, replace=False).tolist())
+    results = {
+        "face": {"face_detected": True, "face_count": 1},
+        "eyes": {"eyes_detected": np.bool_(rng.random() > 0.2)},
+        "quality": {"blur_score": np.float64(rng.uniform(20, 900)), "is_blurry": np.bool_(rng.random() > 0.8)},
+        "pose": {"head_pose": "frontal"},
+        "lighting": {"brightness": np.float64(rng.uniform(60, 200)), "lighting": "good"},
+        "background": {"edge_ratio": np.float64(round(rng.uniform(0.001, 0.05), 4)),
+                       "background_ok": np.bool_(True)},
+        "geometry": {"geometry_ok": True},
+        "text": {"text_detected": False, "word_count": 0, "text_area_ratio": 0.0, "text_ok": True},
+        "hands": {"hands_detected": False, "hand_position": "not_visible", "is_ok": True,
+                  "reason": "No hands detected"},
+        "object_detector": {"non_human_object_present": bool(detected), "detected_objects": detected,
+                            "reason": f"Non-human objects detected: {set(detected)}" if detected
+                            else "No objects detected"},
+        "human_only": {"status": "FAIL", "reason": f"Non-human objects detected: {detected}", "objects": detected}
+        if detected else {"status": "PASS", "reason": "Only human detected", "objects": []},
+    }
+    result = build_response(results)
+    result["profile"] = "standard"
+    result["cached"] = False
+    return result
+
+
+def payloads(seed=0):
+    rng = np.random.default_rng(seed)
+    single = sample_result(rng)
+
+    timed = sample_result(rng, objects=2)
+    timed["timings"] = {
+        "total_ms": 812.41, "decode_ms": 38.2,
+        "stages": {name: {"ms": round(float(rng.uniform(1, 400)), 2), "queue_ms": round(float(rng.uniform(0, 5)), 2)}
+                   for name in ("faces", "face_landmarks", "hand_landmarks", "ocr_data", "detections",
+                                "face", "eyes", "quality", "pose", "lighting", "background",
+                                "geometry", "text", "object_detector", "human_only", "hands")}
+    }
+
+    items = [
+        {"index": i, "filename": f"image-{i}.jpg", "response": "success",
+         "msg": "Face verification completed", "data": sample_result(rng, objects=i % 3)}
+        for i in range(BATCH_MAX_IMAGES)
+    ]
+    batch = {"count": len(items), "passed": sum(1 for item in items if item["data"]["image_status"] == "passed"),
+             "results": items}
+
+    return {
+        "single": success(data=single, msg="Face verification completed", response_type="FACE_VERIFY"),
+        "single+timings": success(data=timed, msg="Face verification completed", response_type="FACE_VERIFY"),
+        f"batch{BATCH_MAX_IMAGES}": success(data=batch, msg="Batch face verification completed",
+                                            response_type="FACE_VERIFY"),
+    }
+
+
+def measure(fn, payload, repeat):
+    fn(payload)
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn(payload)
+        samples.append((time.perf_counter() - started) * 1e6)
+    return round(float(np.percentile(samples, 50)), 2), round(float(np.mean(samples)), 2)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", help="also write the report to this file")
+    args = parser.parse_args()
+
+    if orjson is None:
+        print("orjson is not installed: json_safe.dumps uses the stdlib encoder", file=sys.stderr)
+
+    report = {}
+    mismatched = []
+    print(f"{'payload':<18}{'bytes':>8}{'previous p50 us':>18}{'dumps p50 us':>15}{'speed-up':>10}")
+    for name, payload in payloads(args.seed).items():
+        expected = previous_path(payload)
+        if dumps(payload) != expected:
+            mismatched.append(name)
+        old_p50, old_mean = measure(previous_path, payload, args.repeat)
+        new_p50, new_mean = measure(dumps, payload, args.repeat)
+        report[name] = {"bytes": len(expected), "previous_p50_us": old_p50, "previous_mean_us": old_mean,
+                        "dumps_p50_us": new_p50, "dumps_mean_us": new_mean,
+                        "speedup": round(old_p50 / new_p50, 1) if new_p50 else None}
+        print(f"{name:<18}{len(expected):>8}{old_p50:>18.1f}{new_p50:>15.1f}{report[name]['speedup']:>9}x")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"results": report, "mismatched": mismatched}, f, indent=2)
+
+    if mismatched:
+        print(f"OUTPUT DIFFERS for {', '.join(mismatched)}")
+        sys.exit(1)
+    print("Output byte-identical for every payload")
+
+
+if __name__ == "__main__":
+    main()
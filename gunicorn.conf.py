@@ -0,0 +1,60 @@
+"""
+Preload-then-fork server mode:
+
+    gunicorn -c gunicorn.conf.py app.main:app
+
+The master imports the app and loads the read-only model weights once,
+then forks the workers, which share those pages copy-on-write instead of
+each holding a private copy. Every worker still runs its own warm-up
+(threads, MediaPipe graphs, first inference) after the fork.
+"""
+import gc
+import os
+import shutil
+
+bind = os.getenv("BIND", "0.0.0.0:8000")
+workers = int(os.getenv("WEB_CONCURRENCY", "4"))
+# app.config splits the CPU budget across this many workers
+os.environ["WEB_CONCURRENCY"] = str(workers)
+worker_class = "uvicorn.workers.UvicornWorker"
+preload_app = True
+# First requests on a cold worker can take a while
+timeout = 120
+
+# Aggregated /metrics across workers: start from an empty sample dir. This
+# must happen here, not in on_starting: with preload_app the app (and its
+# multiprocess gauges, which open their files at import) is loaded first.
+# The marker keeps a config reload (HUP) from wiping live workers' files.
+_metrics_dir = os.getenv("PROMETHEUS_MULTIPROC_DIR")
+if _metrics_dir and not os.getenv("_PROMETHEUS_MULTIPROC_DIR_READY"):
+    shutil.rmtree(_metrics_dir, ignore_errors=True)
+    os.makedirs(_metrics_dir)
+    os.environ["_PROMETHEUS_MULTIPROC_DIR_READY"] = "1"
+
+
+def on_starting(server):
+    from app.verifier.warmup import preload_shared
+    preload_shared()
+    # Move everything loaded so far out of the collector's reach, so GC
+    # passes in the workers do not write to (and un-share) those pages
+    gc.freeze()
+
+
+def pre_fork(server, worker):
+    # Lowest CPU slot no live worker holds, so a replacement worker
+    # takes over the cores of the one it replaces
+    taken = {getattr(w, "cpu_slot", None) for w in server.WORKERS.values()}
+    worker.cpu_slot = next(slot for slot in range(len(taken) + 1) if slot not in taken)
+
+
+def post_fork(server, worker):
+    from app.config import CPU_AFFINITY
+    if CPU_AFFINITY == "worker":
+        from app.utils.resources import pin_worker
+        pin_worker(worker.cpu_slot)
+
+
+def child_exit(server, worker):
+    if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        from prometheus_client import multiprocess
+        multiprocess.mark_process_dead(worker.pid)
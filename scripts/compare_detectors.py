@@ -0,0 +1,172 @@
+"""
+Compare detector runtimes against the PyTorch baseline.
+
+Runs every image in a directory through the torch detector and each
+candidate backend (same weights, same working resolution as the
+pipeline's detection stage) and reports per-backend latency, detection
+agreement (same class, IoU >= 0.5) and how often the object_detector and
+human_only outcomes agree with the baseline.
+
+Usage:
+    python -m scripts.compare_detectors /path/to/images [--backends onnx openvino]
+        [--int8] [--threads N] [--imgsz 640] [--json out.json]
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+from app.verifier.detector_backends import make_detector
+from app.verifier.human_only_detector import check_human_only_ctx
+from app.verifier.image_context import ImageContext
+from app.verifier.object_detector import check_non_human_object_yolo_ctx
+from app.verifier.pipeline import VERIFICATION_GRAPH
+from app.verifier.response_builder import check_passed
+
+IMAGE_EXTS = (".jpg", ".jpeg", ".png")
+CONF = 0.4
+MATCH_IOU = 0.5
+
+
+def _iou(a, b):
+    x1, y1 = max(a[0], b[0]), max(a[1], b[1])
+    x2, y2 = min(a[2], b[2]), min(a[3], b[3])
+    inter = max(0.0, x2 - x1) * max(0.0, y2 - y1)
+    union = (a[2] - a[0]) * (a[3] - a[1]) + (b[2] - b[0]) * (b[3] - b[1]) - inter
+    return inter / union if union > 0 else 0.0
+
+
+def _matches(base, other):
+    """Greedy one-to-one matches of same-class boxes with IoU >= MATCH_IOU"""
+    used = set()
+    matched = 0
+    for i, name in enumerate(base.names):
+        best, best_iou = None, MATCH_IOU
+        for j, other_name in enumerate(other.names):
+            if j in used or other_name != name:
+                continue
+            iou = _iou(base.boxes[i], other.boxes[j])
+            if iou >= best_iou:
+                best, best_iou = j, iou
+        if best is not None:
+            used.add(best)
+            matched += 1
+    return matched
+
+
+def _outcomes(ctx, detections):
+    return (
+        check_passed("object_detector", check_non_human_object_yolo_ctx(ctx, CONF, detections=detections)),
+        check_passed("human_only", check_human_only_ctx(ctx, CONF, detections=detections)),
+    )
+
+
+def _timed(detector, frame):
+    started = time.perf_counter()
+    detections = detector.predict([frame], CONF)[0]
+    return detections, (time.perf_counter() - started) * 1000
+
+
+def compare(paths, backends, imgsz, threads, int8):
+    detectors = {"torch": make_detector("torch", imgsz=imgsz, threads=threads)}
+    for name in backends:
+        detectors[name] = make_detector(name, imgsz=imgsz, threads=threads, int8=int8 and name == "onnx")
+
+    max_side = VERIFICATION_GRAPH.stages["detections"].max_side
+    frames = []
+    for path in paths:
+        with open(path, "rb") as f:
+            ctx = ImageContext(f.read()).at(max_side)
+        if ctx.bgr is not None:
+            frames.append((os.path.basename(path), ctx))
+
+    # One warm-up call each, so model loading is not timed
+    for detector in detectors.values():
+        detector.predict([frames[0][1].bgr], CONF)
+
+    latency = {name: [] for name in detectors}
+    stats = {name: {"matched": 0, "base": 0, "candidate": 0, "object_detector": 0, "human_only": 0}
+             for name in backends}
+    mismatches = []
+
+    for image, ctx in frames:
+        base, elapsed = _timed(detectors["torch"], ctx.bgr)
+        latency["torch"].append(elapsed)
+        base_outcomes = _outcomes(ctx, base)
+
+        for name in backends:
+            detections, elapsed = _timed(detectors[name], ctx.bgr)
+            latency[name].append(elapsed)
+
+            s = stats[name]
+            s["matched"] += _matches(base, detections)
+            s["base"] += len(base)
+            s["candidate"] += len(detections)
+
+            outcomes = _outcomes(ctx, detections)
+            s["object_detector"] += outcomes[0] == base_outcomes[0]
+            s["human_only"] += outcomes[1] == base_outcomes[1]
+            if outcomes != base_outcomes:
+                mismatches.append({"image": image, "backend": name,
+                                   "torch": sorted(base.names), name: sorted(detections.names)})
+
+    n = len(frames)
+    return {
+        "images": n,
+        "imgsz": imgsz,
+        "threads": threads,
+        "int8": int8,
+        "latency_ms": {
+            name: {
+                "mean": round(float(np.mean(values)), 1),
+                "p50": round(float(np.percentile(values, 50)), 1),
+                "p95": round(float(np.percentile(values, 95)), 1),
+            }
+            for name, values in latency.items()
+        },
+        "agreement": {
+            name: {
+                # Share of baseline detections the backend reproduced, and
+                # share of the backend's detections present in the baseline
+                "recall": round(s["matched"] / s["base"], 4) if s["base"] else 1.0,
+                "precision": round(s["matched"] / s["candidate"], 4) if s["candidate"] else 1.0,
+                "object_detector": round(s["object_detector"] / n, 4),
+                "human_only": round(s["human_only"] / n, 4),
+            }
+            for name, s in stats.items()
+        },
+        "mismatches": mismatches
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("image_dir")
+    parser.add_argument("--backends", nargs="+", default=["onnx"], choices=["onnx", "openvino"])
+    parser.add_argument("--imgsz", type=int, default=640)
+    parser.add_argument("--threads", type=int, default=0, help="intra-op threads (0: runtime default)")
+    parser.add_argument("--int8", action="store_true", help="dynamic int8 weights for the onnx backend")
+    parser.add_argument("--json", help="also write the report to this file")
+    args = parser.parse_args()
+
+    paths = sorted(
+        os.path.join(args.image_dir, name)
+        for name in os.listdir(args.image_dir)
+        if name.lower().endswith(IMAGE_EXTS)
+    )
+    if not paths:
+        sys.exit(f"No JPG/PNG images in {args.image_dir}")
+
+    report = compare(paths, args.backends, args.imgsz, args.threads, args.int8)
+    print(json.dumps(report, indent=2))
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""
+A/B check for resolution-aware decoding.
+
+Runs every image in a directory through the verification graph twice,
+once with per-check working resolutions and once at full resolution,
+and reports how often each check's pass/fail outcome and the final
+verdict agree, plus the mean pipeline latency of both variants.
+
+Usage:
+    python -m scripts.compare_resolution /path/to/reference/images [--json out.json]
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+
+from app.verifier.image_context import ImageContext
+from app.verifier.pipeline import CheckGraph, STAGES, CHECK_ORDER
+from app.verifier.response_builder import build_response, check_passed
+
+IMAGE_EXTS = (".jpg", ".jpeg", ".png")
+
+
+async def _verify(graph, data):
+    ctx = ImageContext(data)
+    started = time.perf_counter()
+    results = await graph.run(ctx, CHECK_ORDER)
+    elapsed = time.perf_counter() - started
+    return build_response(results), elapsed
+
+
+async def compare(paths):
+    reduced = CheckGraph(STAGES, resolution_aware=True)
+    full = CheckGraph(STAGES, resolution_aware=False)
+
+    agree = {name: 0 for name in CHECK_ORDER}
+    verdict_agree = 0
+    latency = {"reduced": 0.0, "full": 0.0}
+    mismatches = []
+
+    for path in paths:
+        with open(path, "rb") as f:
+            data = f.read()
+
+        a, ta = await _verify(reduced, data)
+        b, tb = await _verify(full, data)
+        latency["reduced"] += ta
+        latency["full"] += tb
+
+        differing = []
+        for name in CHECK_ORDER:
+            if check_passed(name, a["details"][name]) == check_passed(name, b["details"][name]):
+                agree[name] += 1
+            else:
+                differing.append(name)
+
+        if a["image_status"] == b["image_status"]:
+            verdict_agree += 1
+        if differing or a["image_status"] != b["image_status"]:
+            mismatches.append({
+                "image": os.path.basename(path),
+                "checks": differing,
+                "verdict": {"reduced": a["image_status"], "full": b["image_status"]}
+            })
+
+    n = len(paths)
+    return {
+        "images": n,
+        "verdict_agreement": round(verdict_agree / n, 4),
+        "check_agreement": {name: round(count / n, 4) for name, count in agree.items()},
+        "mean_latency_ms": {k: round(v / n * 1000, 1) for k, v in latency.items()},
+        "mismatches": mismatches
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("image_dir")
+    parser.add_argument("--json", help="also write the report to this file")
+    args = parser.parse_args()
+
+    paths = sorted(
+        os.path.join(args.image_dir, name)
+        for name in os.listdir(args.image_dir)
+        if name.lower().endswith(IMAGE_EXTS)
+    )
+    if not paths:
+        sys.exit(f"No JPG/PNG images in {args.image_dir}")
+
+    report = asyncio.run(compare(paths))
+    print(json.dumps(report, indent=2))
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()